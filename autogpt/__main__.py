@@ -6,10 +6,8 @@ from autogpt.args import parse_arguments
 from autogpt.config import Config, check_openai_api_key
 from autogpt.logs import logger
 from autogpt.memory import get_memory
+from autogpt.memory.local import read_cache_entries
 from autogpt.prompt import construct_prompt
-import orjson
-import os
-import numpy as np
 
 def main() -> None:
     """Main function for the script"""
@@ -39,41 +37,38 @@ def main() -> None:
     logger.typewriter_log(f"Using Browser:", Fore.GREEN, cfg.selenium_web_browser)
 
     # ------------------ Resume in-progress tasks ------------------
-    memory_file = getattr(cfg, "memory_index_file", "auto-gpt.json")
     in_progress_prompt = ""
-    if os.path.exists(memory_file):
-        try:
-            with open(memory_file, "rb") as f:
-                memory_data = orjson.loads(f.read())
-        except Exception as e:
-            logger.error(f"Failed to read memory file: {e}")
-            memory_data = {"texts": [], "embeddings": np.zeros((0, 1536), dtype=np.float32)}
+    try:
+        memory_entries = read_cache_entries(cfg.memory_index)
+    except Exception as e:
+        logger.error(f"Failed to read memory file: {e}")
+        memory_entries = []
 
-        # Gather all in-progress memory entries
-        # Gather all in-progress memory entries
-        in_progress_entries = [
-            entry
-            for entry in memory_data.get("texts", [])
-            if "in-progress" in entry.get("tags", [])
-        ]
+    # Gather all in-progress memory entries
+    # Gather all in-progress memory entries
+    in_progress_entries = [
+        entry
+        for entry in memory_entries
+        if "in-progress" in entry.get("tags", [])
+    ]
 
-        # Keep only the most recent 5 entries
-        in_progress_entries = in_progress_entries[-5:]
+    # Keep only the most recent 5 entries
+    in_progress_entries = in_progress_entries[-5:]
 
-        # Merge into a single prompt section with truncation
-        in_progress_prompt = ""
-        for entry in in_progress_entries:
-            content = entry['content'][:500]  # only take first 500 characters
-            in_progress_prompt += f"\n---\nPrevious progress (truncated):\n{content}"
+    # Merge into a single prompt section with truncation
+    in_progress_prompt = ""
+    for entry in in_progress_entries:
+        content = entry['content'][:500]  # only take first 500 characters
+        in_progress_prompt += f"\n---\nPrevious progress (truncated):\n{content}"
 
-        if in_progress_prompt:
-            logger.typewriter_log(
-                "Resuming in-progress tasks from memory...",
-                Fore.MAGENTA,
-                f"{len(in_progress_entries)} entries found",
-            )
-            # Append to base prompt
-            prompt = prompt + "\n" + in_progress_prompt
+    if in_progress_prompt:
+        logger.typewriter_log(
+            "Resuming in-progress tasks from memory...",
+            Fore.MAGENTA,
+            f"{len(in_progress_entries)} entries found",
+        )
+        # Append to base prompt
+        prompt = prompt + "\n" + in_progress_prompt
 
     # -------------------------------------------------------------------
 
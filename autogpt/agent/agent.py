@@ -193,12 +193,7 @@ class Agent:
             # ------------------ Mark done if task finished ------------------
             task_finished = command_name == "task_complete" or self.user_input.lower() in ["essay complete", "finish task"]
             if task_finished and getattr(self.cfg, "memory_settings", {}).get("auto_tag_done", True):
-                for entry in self.memory.search(["in-progress"]):
-                    if "in-progress" in entry["tags"]:
-                        entry["tags"].remove("in-progress")
-                        entry["tags"].append("done")
-                if getattr(self.memory, "save_on_every_action", True):
-                    self.memory.save()
+                self.memory.mark_done(["in-progress"])
 
             # ------------------ Append result to message history ------------------
             if result is not None:
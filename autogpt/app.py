@@ -177,7 +177,8 @@ def execute_command(command_name: str, arguments, user_input=""):
             if urls:
                 memory.add(
                     text=f"Search results for '{arguments['input']}':\n" + "\n".join(urls),
-                    tags=["action", "search"]
+                    tags=["action", "search"],
+                    touch=True,
                 )
             return urls
         elif command_name == "memory_add":
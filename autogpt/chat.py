@@ -6,6 +6,7 @@ from autogpt import token_counter
 from autogpt.config import Config
 from autogpt.llm_utils import create_chat_completion
 from autogpt.logs import logger
+from autogpt.memory.base import embedding_cache, query_embedding_cache
 
 cfg = Config()
 
@@ -94,6 +95,9 @@ def chat_with_ai(
 
 
             logger.debug(f"Memory Stats: {permanent_memory.get_stats()}")
+            logger.debug(f"Query embedding cache: {query_embedding_cache.stats()}")
+            if embedding_cache is not None:
+                logger.debug(f"Embedding cache: {embedding_cache.stats()}")
 
             (
                 next_message_to_add_index,
@@ -65,10 +65,20 @@ class Config(metaclass=Singleton):
 
         self.pinecone_api_key = os.getenv("PINECONE_API_KEY")
         self.pinecone_region = os.getenv("PINECONE_ENV")
+        self.pinecone_host = os.getenv("PINECONE_HOST", "")
+        self.pinecone_namespace = os.getenv("PINECONE_NAMESPACE", "")
+        self.pinecone_concurrency = int(os.getenv("PINECONE_CONCURRENCY", "4"))
 
         # milvus configuration, e.g., localhost:19530.
         self.milvus_addr = os.getenv("MILVUS_ADDR", "localhost:19530")
         self.milvus_collection = os.getenv("MILVUS_COLLECTION", "autogpt")
+        self.milvus_index_type = os.getenv("MILVUS_INDEX_TYPE", "HNSW")
+        self.milvus_hnsw_m = int(os.getenv("MILVUS_HNSW_M", "16"))
+        self.milvus_hnsw_ef = int(os.getenv("MILVUS_HNSW_EF", "64"))
+        self.milvus_nlist = int(os.getenv("MILVUS_NLIST", "128"))
+        self.milvus_nprobe = int(os.getenv("MILVUS_NPROBE", "8"))
+        self.milvus_consistency = os.getenv("MILVUS_CONSISTENCY", "Bounded")
+        self.milvus_flush_every = int(os.getenv("MILVUS_FLUSH_EVERY", "0"))
 
         self.image_provider = os.getenv("IMAGE_PROVIDER")
         self.huggingface_api_token = os.getenv("HUGGINGFACE_API_TOKEN")
@@ -85,10 +95,50 @@ class Config(metaclass=Singleton):
         self.redis_port = os.getenv("REDIS_PORT", "6379")
         self.redis_password = os.getenv("REDIS_PASSWORD", "")
         self.wipe_redis_on_start = os.getenv("WIPE_REDIS_ON_START", "True") == "True"
+        self.redis_hnsw_m = int(os.getenv("REDIS_HNSW_M", "16"))
+        self.redis_hnsw_ef_runtime = int(os.getenv("REDIS_HNSW_EF_RUNTIME", "10"))
+        self.redis_ttl_seconds = int(os.getenv("REDIS_TTL_SECONDS", "0"))
         self.memory_index = os.getenv("MEMORY_INDEX", "auto-gpt")
         # Note that indexes must be created on db 0 in redis, this is not configurable.
 
         self.memory_backend = os.getenv("MEMORY_BACKEND", "local")
+        self.embedding_provider = os.getenv("EMBEDDING_PROVIDER", "openai")
+        self.embedding_dimension = int(os.getenv("EMBEDDING_DIMENSION", "384"))
+        self.embedding_pool_chunks = (
+            os.getenv("EMBEDDING_POOL_CHUNKS", "False") == "True"
+        )
+        self.memory_max_items = int(os.getenv("MEMORY_MAX_ITEMS", "200"))
+        self.memory_max_bytes = int(os.getenv("MEMORY_MAX_BYTES", "2000000"))
+        self.memory_ann_index = os.getenv("MEMORY_ANN_INDEX", "none")
+        self.memory_ivf_nprobe = int(os.getenv("MEMORY_IVF_NPROBE", "8"))
+        self.memory_pq_subspaces = int(os.getenv("MEMORY_PQ_SUBSPACES", "96"))
+        self.memory_pq_rerank = int(os.getenv("MEMORY_PQ_RERANK", "400"))
+        self.memory_compression = os.getenv("MEMORY_COMPRESSION", "none")
+        self.memory_query_cache_size = int(os.getenv("MEMORY_QUERY_CACHE_SIZE", "256"))
+        self.embedding_cache_path = os.getenv(
+            "EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3"
+        )
+        self.embedding_cache_max_bytes = int(
+            os.getenv("EMBEDDING_CACHE_MAX_BYTES", "200000000")
+        )
+        self.embedding_batch_wait_ms = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+        self.embedding_batch_tokens = int(os.getenv("EMBEDDING_BATCH_TOKENS", "100000"))
+        self.embedding_concurrency = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+        self.memory_concurrency = int(os.getenv("MEMORY_CONCURRENCY", "8"))
+        self.memory_search_mode = os.getenv("MEMORY_SEARCH_MODE", "vector")
+        self.memory_hybrid_weight = float(os.getenv("MEMORY_HYBRID_WEIGHT", "0.3"))
+        self.memory_eviction_policy = os.getenv("MEMORY_EVICTION_POLICY", "fifo")
+        self.memory_pinned_tags = [
+            tag.strip()
+            for tag in os.getenv("MEMORY_PINNED_TAGS", "in-progress").split(",")
+            if tag.strip()
+        ]
+        self.memory_decay_half_life = float(
+            os.getenv("MEMORY_DECAY_HALF_LIFE", "86400")
+        )
+        self.memory_flush_interval_ms = int(os.getenv("MEMORY_FLUSH_INTERVAL_MS", "0"))
+        self.memory_flush_batch = int(os.getenv("MEMORY_FLUSH_BATCH", "64"))
+        self.memory_shared = os.getenv("MEMORY_SHARED", "False") == "True"
         # Initialize the OpenAI API client
         openai.api_key = self.openai_api_key
 
@@ -4,6 +4,7 @@ import logging
 from autogpt.config import Config
 from autogpt.commands.file_operations import ingest_file, search_files
 from autogpt.memory import get_memory
+from autogpt.memory.base import memory_executor
 
 cfg = Config()
 
@@ -22,14 +23,20 @@ def configure_logging():
 def ingest_directory(directory, memory, args):
     """
     Ingest all files in a directory by calling the ingest_file function for each file.
+    Up to MEMORY_CONCURRENCY files are ingested at once, their embeddings batched
+    into shared requests.
 
     :param directory: The directory containing the files to ingest
     :param memory: An object with an add() method to store the chunks in memory
     """
     try:
         files = search_files(directory)
-        for file in files:
-            ingest_file(file, memory, args.max_length, args.overlap)
+        list(
+            memory_executor.map(
+                lambda file: ingest_file(file, memory, args.max_length, args.overlap),
+                files,
+            )
+        )
     except Exception as e:
         print(f"Error while ingesting directory '{directory}': {str(e)}")
 
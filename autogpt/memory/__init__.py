@@ -22,7 +22,9 @@ except ImportError:
     PineconeMemory = None
 
 try:
-    from memory.milvus import MilvusMemory
+    from autogpt.memory.milvus import MilvusMemory
+
+    supported_memory.append("milvus")
 except ImportError:
     print("pymilvus not installed. Skipping import.")
     MilvusMemory = None
@@ -52,14 +54,17 @@ def get_memory(cfg, init=False):
         memory = NoMemory(cfg)
     elif cfg.memory_backend == "milvus":
         if not MilvusMemory:
-            print("Error: Milvus sdk is not installed."
-                  "Please install pymilvus to use Milvus as memory backend.")
+            print(
+                "Error: Milvus sdk is not installed. "
+                "Please install pymilvus to use Milvus as memory backend."
+            )
         else:
             memory = MilvusMemory(cfg)
 
     if memory is None:
         memory = LocalCache(cfg)
-        if init:
+        # A shared index holds other agents' memories too, so keep it.
+        if init and not memory.shared:
             memory.clear()
     return memory
 
@@ -68,4 +73,11 @@ def get_supported_memory_backends():
     return supported_memory
 
 
-__all__ = ["get_memory", "LocalCache", "RedisMemory", "PineconeMemory", "NoMemory", "MilvusMemory"]
+__all__ = [
+    "get_memory",
+    "LocalCache",
+    "RedisMemory",
+    "PineconeMemory",
+    "NoMemory",
+    "MilvusMemory",
+]
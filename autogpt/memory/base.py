@@ -1,53 +1,194 @@
 """Base class for memory providers."""
+
 import abc
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
 
-import openai
+import numpy as np
 
 from autogpt.config import AbstractSingleton, Config
+from autogpt.memory.batcher import EmbeddingBatcher
+from autogpt.memory.embedding_cache import EmbeddingCache, embedding_key
+from autogpt.memory.embeddings import get_embedding_provider
+from autogpt.memory.query_cache import QueryEmbeddingCache
 
 cfg = Config()
 
-def get_ada_embedding(text):
+# Source of every embedding; backends size their indexes by its dimension
+embedding_provider = get_embedding_provider(cfg)
+# Inputs per embedding request; the API accepts up to 2048
+EMBED_BATCH_SIZE = 256
+# Records per batch streamed by export_records
+EXPORT_BATCH_SIZE = 500
+# Embed texts over the provider's token limit window by window and average the
+# vectors, instead of cutting them off at the limit
+pool_chunks = bool(getattr(cfg, "embedding_pool_chunks", False))
+# Embeddings of recent retrieval queries; MEMORY_QUERY_CACHE_SIZE=0 disables it
+query_embedding_cache = QueryEmbeddingCache(
+    int(getattr(cfg, "memory_query_cache_size", 256))
+)
+# Embeddings of every text embedded so far, kept on disk across runs;
+# an empty EMBEDDING_CACHE_PATH disables it
+embedding_cache = (
+    EmbeddingCache(
+        cfg.embedding_cache_path,
+        int(getattr(cfg, "embedding_cache_max_bytes", 200_000_000)),
+    )
+    if getattr(cfg, "embedding_cache_path", "")
+    else None
+)
+
+
+def _prepare_embedding_input(text):
     # Normalize whitespace
     text = text.replace("\n", " ")
+    if pool_chunks:
+        return text
+    # Keep what fits in one input of the provider
+    return embedding_provider.split(text, pieces=1)[0][0]
+
+
+def get_ada_embedding(text):
+    """
+    Embed one text.
+
+    Concurrent calls, from other threads or async tasks, are sent together in
+    one request by `embedding_batcher`.
+    """
+    return get_ada_embeddings([text])[0]
+
+
+def get_ada_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Embed many texts, in order.
+
+    A text over the provider's token limit is cut at the limit. With
+    EMBEDDING_POOL_CHUNKS, it is instead split into windows that go out in
+    the same requests as everything else, and its embedding is the
+    token-weighted mean of theirs.
+    """
+    splits = _split_inputs(texts)
+    return _pool(
+        splits, _embed_inputs([window for windows, _ in splits for window in windows])
+    )
+
+
+async def aget_ada_embedding(text) -> List[float]:
+    """Awaitable get_ada_embedding."""
+    return (await aget_ada_embeddings([text]))[0]
+
+
+async def aget_ada_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Awaitable get_ada_embeddings.
+
+    The requests go through the same batcher as the synchronous calls, so
+    concurrent tasks share API calls and the EMBEDDING_CONCURRENCY limit.
+    """
+    splits = _split_inputs(texts)
+    windows = [window for windows, _ in splits for window in windows]
+    return _pool(splits, await _aembed_inputs(windows))
+
+
+def _split_inputs(texts: List[str]) -> List[Tuple[List[str], List[int]]]:
+    texts = [_prepare_embedding_input(text) for text in texts]
+    if not pool_chunks:
+        return [([text], [1]) for text in texts]
+    return [embedding_provider.split(text) for text in texts]
 
-    # 1 token ≈ 4 characters
-    MAX_SAFE_CHARS = 24000
 
-    if len(text) > MAX_SAFE_CHARS:
-        text = text[:MAX_SAFE_CHARS]
+def _pool(splits, vectors: List[List[float]]) -> List[List[float]]:
+    """One vector per split text: the weighted mean of its windows' vectors."""
+    pooled, start = [], 0
+    for windows, weights in splits:
+        if len(windows) == 1:
+            pooled.append(vectors[start])
+        else:
+            mean = np.average(
+                vectors[start : start + len(windows)], axis=0, weights=weights
+            )
+            pooled.append((mean / np.linalg.norm(mean)).tolist())
+        start += len(windows)
+    return pooled
 
-    # Use modern embedding model
-    response = openai.Embedding.create(
-        model="text-embedding-ada-002",
-        input=text
+
+def _embed_inputs(texts: List[str]) -> List[List[float]]:
+    """
+    Embed texts the provider accepts as they are.
+
+    Texts found in the embedding cache cost nothing; the rest are sent
+    through the batcher and then cached. Local providers skip the cache:
+    computing a vector is cheaper than looking it up.
+    """
+    if not embedding_provider.remote:
+        return embedding_provider.embed_many(texts)
+    keys, found, missing = _lookup(texts)
+    if missing:
+        _remember(found, missing, embedding_batcher.embed_many([t for _, t in missing]))
+    return [found[key] for key in keys]
+
+
+async def _aembed_inputs(texts: List[str]) -> List[List[float]]:
+    if not embedding_provider.remote:
+        return embedding_provider.embed_many(texts)
+    keys, found, missing = _lookup(texts)
+    if missing:
+        _remember(
+            found, missing, await embedding_batcher.aembed_many([t for _, t in missing])
+        )
+    return [found[key] for key in keys]
+
+
+def _lookup(texts: List[str]):
+    """Cache keys of the texts, their cached vectors, and the distinct misses."""
+    keys = [embedding_key(embedding_provider.model, text) for text in texts]
+    found = embedding_cache.get_many(keys) if embedding_cache is not None else {}
+    missing = list(
+        {key: text for key, text in zip(keys, texts) if key not in found}.items()
     )
+    return keys, found, missing
+
+
+def _remember(found: dict, missing: List[Tuple[str, str]], vectors: List[List[float]]):
+    vectors = [(key, vector) for (key, _), vector in zip(missing, vectors)]
+    found.update(vectors)
+    if embedding_cache is not None:
+        embedding_cache.put_many(vectors)
 
-    return response["data"][0]["embedding"]
 
+def _request_embeddings(texts: List[str]) -> List[List[float]]:
+    return embedding_provider.embed_many(texts)
 
-#def get_ada_embedding(text):
-#    # Normalize whitespace
-#    text = text.replace("\n", " ")
 
-    # 1 token ≈ 4 characters
-    # Model max = 8192 tokens
-    # Keep well below that to prevent overflow
-#    MAX_SAFE_CHARS = 24000  # ~6000 tokens
+# Coalesces embedding requests from every thread and task: waits up to
+# EMBEDDING_BATCH_WAIT_MS for company (0 sends right away) and keeps at most
+# EMBEDDING_CONCURRENCY requests in flight
+embedding_batcher = EmbeddingBatcher(
+    _request_embeddings,
+    max_batch=EMBED_BATCH_SIZE,
+    max_tokens=int(getattr(cfg, "embedding_batch_tokens", 100_000)),
+    max_wait=float(getattr(cfg, "embedding_batch_wait_ms", 5)) / 1000,
+    concurrency=int(getattr(cfg, "embedding_concurrency", 4)),
+)
+# Threads that run the async memory methods; at most this many run at once
+memory_executor = ThreadPoolExecutor(
+    int(getattr(cfg, "memory_concurrency", 8)), thread_name_prefix="memory"
+)
 
-#    if len(text) > MAX_SAFE_CHARS:
-#        text = text[:MAX_SAFE_CHARS]
 
-#    if cfg.use_azure:
-#        return openai.Embedding.create(
-#            input=[text],
-#            engine=cfg.get_azure_deployment_id_for_model("text-embedding-ada-002"),
-#        )["data"][0]["embedding"]
-#    else:
-#        return openai.Embedding.create(
-#            input=[text],
-#            model="text-embedding-ada-002"
-#        )["data"][0]["embedding"]
+def get_query_embedding(text, embed=None) -> List[float]:
+    """
+    Embed a retrieval query, reusing the embedding of a recent identical one.
+
+    `embed` computes the embedding on a cache miss; get_ada_embedding by default.
+    """
+    return query_embedding_cache.get(
+        embedding_provider.model,
+        _prepare_embedding_input(text),
+        embed or get_ada_embedding,
+    )
 
 
 class MemoryProviderSingleton(AbstractSingleton):
@@ -55,6 +196,55 @@ class MemoryProviderSingleton(AbstractSingleton):
     def add(self, data):
         pass
 
+    async def _in_executor(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            memory_executor, functools.partial(method, *args, **kwargs)
+        )
+
+    async def aadd(self, data, *args, **kwargs):
+        """
+        Awaitable add.
+
+        Runs `add` on one of the `memory_executor` threads, so many adds can
+        be awaited together; their embeddings are batched into shared requests.
+        """
+        return await self._in_executor(self.add, data, *args, **kwargs)
+
+    async def aadd_many(self, texts: List[str], *args, **kwargs) -> list:
+        """Awaitable add_many, see aadd."""
+        return await self._in_executor(self.add_many, texts, *args, **kwargs)
+
+    async def aget_relevant(self, data, *args, **kwargs):
+        """Awaitable get_relevant, see aadd."""
+        return await self._in_executor(self.get_relevant, data, *args, **kwargs)
+
+    def add_many(self, texts: List[str], tags: List[str] = None) -> list:
+        """
+        Add several texts at once and return what `add` returns for each.
+
+        Providers override this to embed every text in one request and store
+        them in one write; this fallback just adds them one by one.
+        """
+        return [self.add(text, tags=tags) for text in texts]
+
+    def export_records(self, cursor=None, batch_size: int = EXPORT_BATCH_SIZE):
+        """
+        Stream the stored memories out in batches, without re-embedding them.
+
+        Yields `(records, cursor)` pairs. Each record is a dict with `text`,
+        `vector` (a list of floats), `tags`, `task_id` and `timestamp` (UNIX
+        seconds). Passing a yielded cursor back in resumes after its batch.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot export its memories.")
+
+    def import_records(self, records: List[dict]) -> int:
+        """
+        Store records shaped like those of `export_records`, keeping their
+        vectors and metadata. Returns the number of records written.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot import memories.")
+
     @abc.abstractmethod
     def get(self, data):
         pass
@@ -0,0 +1,170 @@
+"""Micro-batching front end for the embeddings API."""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+# 1 token ≈ 4 characters, as in _prepare_embedding_input
+CHARS_PER_TOKEN = 4
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces single-text embedding requests into batched API calls.
+
+    Callers on any thread (or asyncio task, via `aembed`) enqueue a text and
+    get a future back. A worker thread sends everything queued as one
+    `embed_many` call once `max_batch` texts or `max_tokens` estimated tokens
+    are waiting, or once the oldest has waited `max_wait` seconds, then hands
+    each caller its own vector. A request then costs one round trip per batch
+    instead of one per text. Up to `concurrency` batches are in flight at once;
+    while they all are, new requests keep queueing and go out together in the
+    next one. With `max_wait` at 0, `embed` and `embed_many` call the function
+    directly, one batch after another.
+    """
+
+    def __init__(
+        self,
+        embed_many: Callable[[List[str]], List[List[float]]],
+        max_batch: int = 256,
+        max_tokens: int = 100_000,
+        max_wait: float = 0.005,
+        concurrency: int = 4,
+    ) -> None:
+        self.embed_many_fn = embed_many
+        self.max_batch = max_batch
+        self.max_tokens = max_tokens
+        self.max_wait = max_wait
+        self.concurrency = concurrency
+        self.requests = 0
+        self.batches = 0
+        self._reset()
+
+    def _reset(self):
+        # Queued (text, future, enqueue time, estimated tokens)
+        self._queue: List[Tuple[str, Future, float, int]] = []
+        self._tokens = 0
+        self._cond = threading.Condition()
+        self._closing = False
+        self._worker = None
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._pid = os.getpid()
+
+    def submit(self, text: str) -> Future:
+        """Queue a text and return the future of its embedding."""
+        return self.submit_many([text])[0]
+
+    def submit_many(self, texts: List[str]) -> List[Future]:
+        """Queue texts back to back and return the future of each embedding."""
+        if self._pid != os.getpid():
+            # A forked child doesn't inherit the worker thread.
+            self._reset()
+        futures = [Future() for _ in texts]
+        now = time.monotonic()
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("The embedding batcher is closed.")
+            if self._worker is None:
+                self._pool = ThreadPoolExecutor(self.concurrency)
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+            was_empty = not self._queue
+            for text, future in zip(texts, futures):
+                tokens = len(text) // CHARS_PER_TOKEN + 1
+                self._queue.append((text, future, now, tokens))
+                self._tokens += tokens
+            self.requests += len(texts)
+            if was_empty or self._full():
+                self._cond.notify()
+        return futures
+
+    def embed(self, text: str) -> List[float]:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts, batched together with whatever else is queued."""
+        if self.max_wait <= 0:
+            vectors = []
+            for start in range(0, len(texts), self.max_batch):
+                self.requests += len(texts[start : start + self.max_batch])
+                self.batches += 1
+                vectors.extend(
+                    self.embed_many_fn(texts[start : start + self.max_batch])
+                )
+            return vectors
+        return [future.result() for future in self.submit_many(texts)]
+
+    async def aembed(self, text: str) -> List[float]:
+        return (await self.aembed_many([text]))[0]
+
+    async def aembed_many(self, texts: List[str]) -> List[List[float]]:
+        """Awaitable embed_many; the event loop keeps running while batches are out."""
+        futures = self.submit_many(texts)
+        return list(await asyncio.gather(*(asyncio.wrap_future(f) for f in futures)))
+
+    def _full(self) -> bool:
+        return len(self._queue) >= self.max_batch or self._tokens >= self.max_tokens
+
+    def _take(self) -> List[Tuple[str, Future, float, int]]:
+        """Pop the next batch: at least one text, then as many as the limits allow."""
+        count, tokens = 0, 0
+        for _, _, _, cost in self._queue:
+            if count and (count >= self.max_batch or tokens + cost > self.max_tokens):
+                break
+            count += 1
+            tokens += cost
+        batch, self._queue = self._queue[:count], self._queue[count:]
+        self._tokens -= tokens
+        return batch
+
+    def _run(self):
+        """Worker loop: wait for a full batch or the oldest request's deadline."""
+        while True:
+            self._slots.acquire()
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if not self._queue:
+                    self._slots.release()
+                    return
+                while not self._closing and not self._full():
+                    remaining = self._queue[0][2] + self.max_wait - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take()
+                self.batches += 1
+            self._pool.submit(self._send, batch)
+
+    def _send(self, batch: List[Tuple[str, Future, float, int]]):
+        try:
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                return
+            try:
+                vectors = self.embed_many_fn([text for text, _, _, _ in batch])
+            except Exception as e:
+                for _, future, _, _ in batch:
+                    future.set_exception(e)
+                return
+            for (_, future, _, _), vector in zip(batch, vectors):
+                future.set_result(vector)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Send whatever is still queued, then stop the worker."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+            worker = self._worker
+        if worker is not None:
+            worker.join()
+            self._pool.shutdown()
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "batches": self.batches}
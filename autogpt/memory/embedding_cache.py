@@ -0,0 +1,181 @@
+"""Persistent content-addressed cache of embeddings, shared by every memory backend."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Cache key of an embedding: sha256 of the model name and the text sent to it."""
+    return hashlib.sha256(
+        f"{model}\0{text}".encode("utf-8", errors="ignore")
+    ).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite table of float32 embedding blobs keyed by `embedding_key`.
+
+    Memory is wiped at every start and the same workspace files get ingested
+    again, so vectors are looked up here before paying for a request, across
+    runs and across backends. Each hit refreshes the row's last-use time, and
+    once the blobs outgrow `max_bytes` the least recently used rows go.
+
+    The database is opened on first use, and in WAL mode so that several
+    Auto-GPT processes can share it.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 200_000_000) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, used REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used)"
+            )
+            with db:
+                # Running total of the blob sizes, kept up to date by triggers so
+                # every process sharing the file sees the same figure without a
+                # scan; only a database made before it existed is summed once.
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS meta"
+                    " (name TEXT PRIMARY KEY, value INTEGER)"
+                )
+                db.execute(
+                    "INSERT OR IGNORE INTO meta (name, value) SELECT 'bytes',"
+                    " COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+                )
+                db.execute(
+                    "CREATE TRIGGER IF NOT EXISTS embeddings_insert"
+                    " AFTER INSERT ON embeddings BEGIN"
+                    " UPDATE meta SET value = value + LENGTH(new.vector)"
+                    " WHERE name = 'bytes'; END"
+                )
+                db.execute(
+                    "CREATE TRIGGER IF NOT EXISTS embeddings_delete"
+                    " AFTER DELETE ON embeddings BEGIN"
+                    " UPDATE meta SET value = value - LENGTH(old.vector)"
+                    " WHERE name = 'bytes'; END"
+                )
+                db.execute(
+                    "CREATE TRIGGER IF NOT EXISTS embeddings_update"
+                    " AFTER UPDATE OF vector ON embeddings BEGIN"
+                    " UPDATE meta SET value = value + LENGTH(new.vector)"
+                    " - LENGTH(old.vector) WHERE name = 'bytes'; END"
+                )
+            self._db = db
+        return self._db
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Return the cached embeddings among `keys`, marking them as just used."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            db = self._connect()
+            for start in range(0, len(keys), 500):  # SQLite caps bound parameters
+                chunk = keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = db.execute(
+                    "SELECT key, vector FROM embeddings"
+                    f" WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                found.update(
+                    (key, np.frombuffer(vector, dtype=np.float32).tolist())
+                    for key, vector in rows
+                )
+            if found:
+                now = time.time()
+                with db:
+                    db.executemany(
+                        "UPDATE embeddings SET used = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, List[float]]]):
+        """Store embeddings, then evict least recently used ones over the size cap."""
+        now = time.time()
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            db = self._connect()
+            with db:
+                # An upsert rather than INSERT OR REPLACE: the rows REPLACE deletes
+                # don't fire delete triggers, which would leave the total too high.
+                db.executemany(
+                    "INSERT INTO embeddings (key, vector, used) VALUES (?, ?, ?)"
+                    " ON CONFLICT (key) DO UPDATE"
+                    " SET vector = excluded.vector, used = excluded.used",
+                    rows,
+                )
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection):
+        excess = self._bytes(db) - self.max_bytes
+        if excess <= 0:
+            return
+        # Rows are about the same size, so drop roughly as many as the excess needs.
+        row_bytes = max(
+            1, db.execute("SELECT AVG(LENGTH(vector)) FROM embeddings").fetchone()[0]
+        )
+        db.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY used LIMIT ?)",
+            (int(np.ceil(excess / row_bytes)),),
+        )
+
+    @staticmethod
+    def _bytes(db: sqlite3.Connection) -> int:
+        return db.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute("DELETE FROM embeddings")
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            if self._db is None:
+                entries, nbytes = 0, 0
+            else:
+                entries = self._db.execute(
+                    "SELECT COUNT(*) FROM embeddings"
+                ).fetchone()[0]
+                nbytes = self._bytes(self._db)
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": entries,
+                "bytes": nbytes,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,179 @@
+"""Embedding providers: where the vectors of every memory backend come from."""
+
+import abc
+import functools
+import hashlib
+import math
+from collections import Counter
+from typing import List, Optional, Tuple
+
+import numpy as np
+import openai
+import tiktoken
+
+from autogpt.memory.lexical import _WORD, tokenize
+
+OPENAI_EMBEDDING_MODEL = "text-embedding-ada-002"
+# Characters per input when the tokenizer can't be loaded; 1 token ≈ 4 characters,
+# so this stays well below an 8191-token limit for English text
+MAX_SAFE_CHARS = 24000
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(name: str) -> Optional["tiktoken.Encoding"]:
+    """The tiktoken encoding `name`, loaded once; None if it can't be (e.g. offline)."""
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        print(
+            f"Warning: Could not load the {name} tokenizer, cutting embedding inputs"
+            f" at {MAX_SAFE_CHARS} characters instead: {e}"
+        )
+        return None
+
+
+class EmbeddingProvider(abc.ABC):
+    """
+    Turns texts into fixed-size vectors.
+
+    `model` names the vector space: embeddings cached under one name are never
+    served for another. `dimension` is the length of every vector; backends
+    size their indexes with it. `remote` providers are worth the embedding
+    cache and request batching; local ones are cheaper to just recompute.
+    Inputs longer than `max_tokens` tokens of the `encoding` tokenizer are
+    rejected by the provider, so callers `split` them first.
+    """
+
+    model: str
+    dimension: int
+    remote = True
+    max_tokens: Optional[int] = None
+    encoding: Optional[str] = None
+
+    @abc.abstractmethod
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, in order, with as few requests as the provider allows."""
+
+    def embed(self, text: str) -> List[float]:
+        return self.embed_many([text])[0]
+
+    def split(
+        self, text: str, pieces: Optional[int] = None
+    ) -> Tuple[List[str], List[int]]:
+        """
+        Cut text into consecutive inputs the provider accepts.
+
+        Returns at most `pieces` of them (all by default), along with the
+        length of each in tokens, or in characters without a tokenizer.
+        """
+        # No token is shorter than a byte
+        if self.max_tokens is None or len(text.encode("utf-8")) <= self.max_tokens:
+            return [text], [len(text)]
+        encoding = get_encoding(self.encoding) if self.encoding else None
+        if encoding is None:
+            size, units = MAX_SAFE_CHARS, text
+            decode = "".join
+        else:
+            size, units = self.max_tokens, encoding.encode(text, disallowed_special=())
+            decode = encoding.decode
+        starts = range(0, len(units), size)[:pieces]
+        windows = [units[start : start + size] for start in starts]
+        return [decode(window) for window in windows], [
+            len(window) for window in windows
+        ]
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """text-embedding-ada-002 through the OpenAI API."""
+
+    model = OPENAI_EMBEDDING_MODEL
+    dimension = 1536
+    max_tokens = 8191
+    encoding = "cl100k_base"
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        response = openai.Embedding.create(model=self.model, input=texts)
+        data = sorted(response["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _feature_slots(
+    feature: str, seed: int, nonzeros: int, dimension: int
+) -> Tuple[tuple, tuple]:
+    """The coordinates a feature is projected onto, and the sign at each."""
+    digest = hashlib.blake2b(
+        f"{seed}\0{feature}".encode("utf-8", errors="ignore"), digest_size=4 * nonzeros
+    ).digest()
+    values = np.frombuffer(digest, dtype=np.uint32)
+    signs = np.where(values >> 31, 1.0, -1.0)
+    return tuple((values % dimension).tolist()), tuple(signs.tolist())
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Offline embeddings from hashed word and character n-gram counts.
+
+    A text's features are its search terms (see `lexical.tokenize`) plus the
+    character `ngram`-grams of each word, so related spellings and identifiers
+    share features. Each feature count is damped to 1 + log(count), then
+    projected to `dimension` with a very sparse random projection: every
+    feature adds its weight to `nonzeros` hashed coordinates with hashed signs,
+    which approximately preserves cosine similarity between texts. Nothing is
+    learned, so vectors are deterministic across runs and machines, and no
+    corpus statistics (IDF) are needed to keep stored vectors comparable.
+
+    It ranks by shared vocabulary, not meaning: good enough for tests,
+    air-gapped deployments and runs where retrieval quality matters little.
+    """
+
+    remote = False
+
+    def __init__(
+        self, dimension: int = 384, ngram: int = 3, nonzeros: int = 4, seed: int = 0
+    ) -> None:
+        self.dimension = dimension
+        self.ngram = ngram
+        self.nonzeros = nonzeros
+        self.seed = seed
+        self.model = f"local-hashing-{dimension}-n{ngram}-s{seed}"
+
+    def _features(self, text: str) -> Counter:
+        features = Counter(f"t:{term}" for term in tokenize(text))
+        for word in _WORD.findall(text.lower()):
+            word = f"<{word}>"
+            features.update(
+                f"c:{word[i : i + self.ngram]}"
+                for i in range(len(word) - self.ngram + 1)
+            )
+        return features or Counter({"<empty>": 1})
+
+    def embed(self, text: str) -> List[float]:
+        indices, weights = [], []
+        for feature, count in self._features(text).items():
+            slots, signs = _feature_slots(
+                feature, self.seed, self.nonzeros, self.dimension
+            )
+            weight = 1.0 + math.log(count)
+            indices.extend(slots)
+            weights.extend(sign * weight for sign in signs)
+        vector = np.bincount(indices, weights=weights, minlength=self.dimension)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.astype(np.float32).tolist()
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed(text) for text in texts]
+
+
+def get_embedding_provider(cfg) -> EmbeddingProvider:
+    """Return the provider named by EMBEDDING_PROVIDER, falling back to OpenAI."""
+    name = getattr(cfg, "embedding_provider", "openai")
+    if name == "local":
+        return HashingEmbeddingProvider(int(getattr(cfg, "embedding_dimension", 384)))
+    if name != "openai":
+        print(f"Warning: Unknown embedding provider '{name}', using openai.")
+    return OpenAIEmbeddingProvider()
@@ -0,0 +1,174 @@
+"""Eviction policies for the local memory backend."""
+
+import abc
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Type
+
+import numpy as np
+
+from autogpt.logs import logger
+
+
+class AccessStats:
+    """
+    Per-slot retrieval counters: how often each entry was returned by a
+    similarity search and when it was last returned (or stored).
+    """
+
+    def __init__(self, hits: np.ndarray = None, last: np.ndarray = None) -> None:
+        self.hits = (
+            np.zeros(16, dtype=np.int64) if hits is None else hits.astype(np.int64)
+        )
+        self.last = (
+            np.zeros(16, dtype=np.float64) if last is None else last.astype(np.float64)
+        )
+
+    def _grow(self, size: int):
+        if size <= len(self.hits):
+            return
+        capacity = max(size, 2 * len(self.hits))
+        hits = np.zeros(capacity, dtype=np.int64)
+        hits[: len(self.hits)] = self.hits
+        last = np.zeros(capacity, dtype=np.float64)
+        last[: len(self.last)] = self.last
+        self.hits, self.last = hits, last
+
+    def reset(self, slot: int, when: float):
+        """Start a freshly stored entry with no hits."""
+        self._grow(slot + 1)
+        self.hits[slot] = 0
+        self.last[slot] = when
+
+    def record(self, slots: np.ndarray, when: Optional[float] = None):
+        """Count one retrieval of each slot."""
+        if len(slots) == 0:
+            return
+        self._grow(int(np.max(slots)) + 1)
+        np.add.at(self.hits, slots, 1)
+        self.last[slots] = time.time() if when is None else when
+
+    def export(self, size: int):
+        """Copy of the counters for slots [0, size)."""
+        self._grow(size)
+        return self.hits[:size].copy(), self.last[:size].copy()
+
+
+class EvictionPolicy(abc.ABC):
+    """
+    Decides which entries LocalCache drops when it hits its item or byte cap.
+
+    A policy only assigns each live slot a priority; entries with the lowest
+    priority go first. Entries carrying a pinned tag are only evicted once
+    nothing else is left.
+    """
+
+    name = ""
+
+    @abc.abstractmethod
+    def priority(self, cache, slots: np.ndarray) -> np.ndarray:
+        pass
+
+    def ranked(self, cache, slots: np.ndarray) -> Iterator[int]:
+        """
+        Yield slots from first to last to evict.
+
+        Only as much of the order as the caller consumes gets sorted: batches
+        of growing size are pulled out with argpartition.
+        """
+        priority = np.array(self.priority(cache, slots), dtype=np.float64)
+        left, batch = len(slots), 8
+        while left:
+            k = min(batch, left)
+            idx = np.argpartition(priority, k - 1)[:k]
+            idx = idx[np.argsort(priority[idx], kind="stable")]
+            yield from (int(slot) for slot in slots[idx])
+            priority[idx] = np.inf
+            left -= k
+            batch *= 4
+
+    def victims(
+        self, cache, count: int = 0, nbytes: int = 0, pinned_tags: Iterable[str] = ()
+    ) -> List[int]:
+        """Pick at least `count` entries that together free at least `nbytes`."""
+        matrix = cache.embeddings
+        live = np.flatnonzero(matrix.live)
+        pinned_tags = list(pinned_tags)
+        pinned = (
+            cache.tags.match(pinned_tags, matrix.size)[live]
+            if pinned_tags
+            else np.zeros(len(live), dtype=bool)
+        )
+        slots, freed = [], 0
+        for group in (live[~pinned], live[pinned]):
+            for slot in self.ranked(cache, group):
+                if len(slots) >= count and freed >= nbytes:
+                    return slots
+                slots.append(slot)
+                freed += cache.sizes[slot]
+        return slots
+
+
+class FIFOPolicy(EvictionPolicy):
+    """Evict the oldest stored (or touched) entries."""
+
+    name = "fifo"
+
+    def priority(self, cache, slots):
+        return cache.embeddings.stamps[slots]
+
+
+class LRUPolicy(EvictionPolicy):
+    """Evict the entries that were least recently returned by a search."""
+
+    name = "lru"
+
+    def priority(self, cache, slots):
+        cache.access._grow(cache.embeddings.size)
+        return cache.access.last[slots]
+
+
+class LFUPolicy(EvictionPolicy):
+    """Evict the entries returned by the fewest searches, oldest first on ties."""
+
+    name = "lfu"
+
+    def priority(self, cache, slots):
+        matrix = cache.embeddings
+        cache.access._grow(matrix.size)
+        # Stamps are below the clock, so they only break ties between counts.
+        return cache.access.hits[slots] + matrix.stamps[slots] / (matrix._clock + 1)
+
+
+class DecayPolicy(EvictionPolicy):
+    """
+    Evict the entries with the lowest time-decayed importance.
+
+    Importance is one plus the number of retrievals, halved for every
+    `half_life` seconds since the entry was last retrieved or stored.
+    """
+
+    name = "decay"
+
+    def __init__(self, half_life: float = 86400.0) -> None:
+        self.half_life = half_life
+
+    def priority(self, cache, slots):
+        cache.access._grow(cache.embeddings.size)
+        age = time.time() - cache.access.last[slots]
+        # log2 of the importance, which stays finite for very old entries
+        return np.log2(1 + cache.access.hits[slots]) - age / self.half_life
+
+
+POLICIES: Dict[str, Type[EvictionPolicy]] = {
+    policy.name: policy for policy in (FIFOPolicy, LRUPolicy, LFUPolicy, DecayPolicy)
+}
+
+
+def get_eviction_policy(name: str, half_life: float = 86400.0) -> EvictionPolicy:
+    """Return the named policy, falling back to FIFO for unknown names."""
+    if name == DecayPolicy.name:
+        return DecayPolicy(half_life)
+    if name not in POLICIES:
+        logger.warn(f"Warning: Unknown eviction policy '{name}', using fifo.")
+        name = FIFOPolicy.name
+    return POLICIES[name]()
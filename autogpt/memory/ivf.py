@@ -0,0 +1,155 @@
+"""Inverted-file approximate nearest neighbour index for the local memory backend."""
+
+from typing import List, Optional
+
+import numpy as np
+
+from autogpt.memory.matrix import EmbeddingMatrix
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def spherical_kmeans(
+    vectors: np.ndarray, k: int, iterations: int = 8, seed: int = 0
+) -> np.ndarray:
+    """
+    Cluster unit vectors by cosine similarity and return k unit centroids.
+
+    Plain Lloyd iterations in numpy: one GEMM to assign points, a sort plus
+    `np.add.reduceat` to sum each cluster. Empty clusters keep their centroid.
+    """
+    vectors = _normalize(vectors.astype(np.float32, copy=False))
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        sorted_assign = assign[order]
+        starts = np.flatnonzero(np.r_[True, sorted_assign[1:] != sorted_assign[:-1]])
+        sums = np.add.reduceat(vectors[order], starts, axis=0)
+        centroids[sorted_assign[starts]] = _normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Coarse-quantized inverted file over EmbeddingMatrix slots.
+
+    Vectors are bucketed under their nearest k-means centroid; a query only
+    scores the posting lists of its `nprobe` nearest centroids. Training is
+    redone whenever the store has grown by `retrain_factor` since the last
+    run, so the number of lists tracks sqrt(n) as memory grows. Vectors added
+    in between are assigned to the existing centroids on the way in.
+    """
+
+    def __init__(
+        self,
+        nprobe: int = 8,
+        min_train_rows: int = 4096,
+        retrain_factor: float = 2.0,
+        seed: int = 0,
+    ) -> None:
+        self.nprobe = nprobe
+        self.min_train_rows = min_train_rows
+        self.retrain_factor = retrain_factor
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_rows = 0
+        self._lists: List[np.ndarray] = []
+        self._counts = np.zeros(0, dtype=np.int64)
+        # Per slot: posting list it sits in (-1 for none) and its position there
+        self._list_of = np.full(16, -1, dtype=np.int64)
+        self._pos_of = np.zeros(16, dtype=np.int64)
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def nlist(self) -> int:
+        return 0 if self.centroids is None else len(self.centroids)
+
+    def needs_training(self, rows: int) -> bool:
+        if rows < self.min_train_rows:
+            return False
+        return not self.trained or rows >= self.retrain_factor * self.trained_rows
+
+    def train(self, matrix: EmbeddingMatrix):
+        """Fit centroids on a sample of the live rows and rebuild every list."""
+        slots = np.flatnonzero(matrix.live)
+        nlist = max(1, int(np.sqrt(len(slots))))
+        rng = np.random.default_rng(self.seed)
+        sample = slots
+        if len(slots) > 64 * nlist:
+            sample = rng.choice(slots, size=64 * nlist, replace=False)
+        centroids = spherical_kmeans(matrix.rows(sample), nlist, seed=self.seed)
+
+        self.reset()
+        self.centroids = centroids
+        self.trained_rows = len(slots)
+        self._grow_slots(matrix.capacity)
+        assign = np.empty(len(slots), dtype=np.int64)
+        for start in range(0, len(slots), 8192):  # bound the GEMM's memory
+            chunk = slots[start : start + 8192]
+            assign[start : start + len(chunk)] = np.argmax(
+                matrix.rows(chunk) @ centroids.T, axis=1
+            )
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=nlist)
+        bounds = np.r_[0, np.cumsum(counts)]
+        self._counts = counts.astype(np.int64)
+        self._lists = []
+        for i in range(nlist):
+            members = slots[order[bounds[i] : bounds[i + 1]]]
+            posting = np.zeros(max(16, 2 * len(members)), dtype=np.int64)
+            posting[: len(members)] = members
+            self._lists.append(posting)
+            self._list_of[members] = i
+            self._pos_of[members] = np.arange(len(members))
+
+    def _grow_slots(self, capacity: int):
+        if capacity <= len(self._list_of):
+            return
+        capacity = max(capacity, 2 * len(self._list_of))
+        list_of = np.full(capacity, -1, dtype=np.int64)
+        list_of[: len(self._list_of)] = self._list_of
+        pos_of = np.zeros(capacity, dtype=np.int64)
+        pos_of[: len(self._pos_of)] = self._pos_of
+        self._list_of, self._pos_of = list_of, pos_of
+
+    def add(self, slot: int, vector: np.ndarray):
+        if not self.trained:
+            return
+        self._grow_slots(slot + 1)
+        i = int(np.argmax(self.centroids @ vector))
+        posting, count = self._lists[i], self._counts[i]
+        if count == len(posting):
+            posting = np.concatenate([posting, np.zeros(len(posting), dtype=np.int64)])
+            self._lists[i] = posting
+        posting[count] = slot
+        self._list_of[slot], self._pos_of[slot] = i, count
+        self._counts[i] += 1
+
+    def remove(self, slot: int):
+        if not self.trained or slot >= len(self._list_of) or self._list_of[slot] < 0:
+            return
+        i, pos = self._list_of[slot], self._pos_of[slot]
+        last = self._counts[i] - 1
+        moved = self._lists[i][last]
+        self._lists[i][pos] = moved
+        self._pos_of[moved] = pos
+        self._counts[i] = last
+        self._list_of[slot] = -1
+
+    def candidates(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Slots in the posting lists of the query's nprobe nearest centroids."""
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        scores = self.centroids @ query
+        probe = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        return np.concatenate([self._lists[i][: self._counts[i]] for i in probe])
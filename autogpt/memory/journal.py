@@ -0,0 +1,133 @@
+"""Append-only write-ahead journal for the local memory backend."""
+
+import base64
+import os
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+
+def encode_vector(vector: np.ndarray) -> str:
+    """Encode a float32 vector as base64 so it fits in a JSON record."""
+    return base64.b64encode(np.ascontiguousarray(vector, np.float32).tobytes()).decode()
+
+
+def decode_vector(encoded: str) -> np.ndarray:
+    """Decode a vector produced by `encode_vector`."""
+    return np.frombuffer(base64.b64decode(encoded), dtype=np.float32)
+
+
+class Journal:
+    """
+    A JSONL log of memory mutations.
+
+    Every record carries a monotonically increasing `seq`. A snapshot stores
+    the last `seq` it contains, so replaying a journal on top of a snapshot
+    skips everything the snapshot already covers and stays idempotent even if
+    a crash interrupted compaction.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = None
+
+    def replay(self, after_seq: int = 0, repair: bool = True) -> Iterator[dict]:
+        """
+        Yield the records newer than `after_seq` in the order they were written.
+
+        A torn final line (the process died mid-append) ends the replay. With
+        `repair` set, the file is truncated back to the last complete record
+        so later appends don't land behind garbage.
+        """
+        if not os.path.exists(self.path):
+            return
+        good_offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    break
+                good_offset += len(line)
+                if record.get("seq", 0) > after_seq:
+                    yield record
+        if repair and good_offset < os.path.getsize(self.path):
+            self.close()
+            with open(self.path, "r+b") as f:
+                f.truncate(good_offset)
+
+    def read_from(self, offset: int) -> Tuple[List[dict], int]:
+        """
+        Return the complete records starting at byte `offset`, plus the offset
+        just past the last of them. A torn tail is left alone for its writer.
+        """
+        records = []
+        if not os.path.exists(self.path):
+            return records, offset
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    break
+                offset += len(line)
+        return records, offset
+
+    def version(self) -> Optional[Tuple[int, int]]:
+        """
+        Cheap change stamp for the journal file: `(inode, size)`.
+
+        The size grows with every append, and compaction swaps in a new file
+        and so a new inode. None if there is no journal yet.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size
+
+    def append(self, records: List[dict]) -> None:
+        """Append records and flush them to the OS."""
+        if not records:
+            return
+        if self._file is not None and self._replaced():
+            # Another process compacted the journal; write to the new file.
+            self.close()
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self._file.write(b"".join(orjson.dumps(r) + b"\n" for r in records))
+        self._file.flush()
+
+    def offset(self) -> int:
+        """Return the current end of the journal in bytes."""
+        if self._file is not None and not self._replaced():
+            return self._file.tell()
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def truncate_before(self, offset: int) -> None:
+        """Drop everything before `offset`, keeping records appended after it."""
+        self.close()
+        if not os.path.exists(self.path):
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+            src.seek(offset)
+            dst.write(src.read())
+        os.replace(tmp_path, self.path)
+
+    def _replaced(self) -> bool:
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,105 @@
+"""Incremental BM25 keyword index for the local memory backend."""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+# Runs of word characters joined by path, URL or version punctuation
+_TERM = re.compile(r"\w(?:[\w./:@-]*\w)?")
+# Words too common to tell entries apart; identifiers containing them are
+# still indexed whole
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can did do does for from had has have i"
+    " if in into is it its me my no not of on or our so that the their then"
+    " there these they this to was we were what when which who will with would"
+    " you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms.
+
+    Identifiers such as `main.py`, `src/app.py` or URLs are kept whole, so an
+    exact match outranks entries that merely share their parts, and they are
+    also split into words, so a query for `main` still finds them. Stopwords
+    are dropped.
+    """
+    tokens = []
+    for term in _TERM.findall(text.lower()):
+        if term not in STOPWORDS:
+            tokens.append(term)
+        parts = _WORD.findall(term)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part not in STOPWORDS)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 over embedding slots, kept up to date entry by entry.
+
+    Each term maps to its postings (slot -> term frequency), so adding or
+    removing an entry only touches that entry's own terms, and a query only
+    visits the postings of its terms instead of every stored text.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._terms: Dict[int, Counter] = {}
+        self._lengths = np.zeros(16, dtype=np.float32)
+        self._total = 0
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, slot: int, text: str):
+        """Index `text` under `slot`, replacing whatever the slot held."""
+        self.remove(slot)
+        counts = Counter(tokenize(text))
+        if slot >= len(self._lengths):
+            grown = np.zeros(max(slot + 1, 2 * len(self._lengths)), dtype=np.float32)
+            grown[: len(self._lengths)] = self._lengths
+            self._lengths = grown
+        length = sum(counts.values())
+        self._terms[slot] = counts
+        self._lengths[slot] = length
+        self._total += length
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[slot] = tf
+
+    def remove(self, slot: int):
+        counts = self._terms.pop(slot, None)
+        if counts is None:
+            return
+        self._total -= int(self._lengths[slot])
+        self._lengths[slot] = 0
+        for term in counts:
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+
+    def scores(self, text: str, size: int) -> np.ndarray:
+        """BM25 score of the query against slots [0, size); 0 where no term matches."""
+        scores = np.zeros(size, dtype=np.float32)
+        count = len(self._terms)
+        if count == 0:
+            return scores
+        avg_length = max(self._total / count, 1.0)
+        for term in set(tokenize(text)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            slots = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            tf = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[slots] / avg_length)
+            scores[slots] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
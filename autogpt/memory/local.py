@@ -1,46 +1,624 @@
+import atexit
+import contextlib
 import dataclasses
+import hashlib
+import json
 import os
-from typing import Any, List, Optional, Tuple
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
 import numpy as np
 import orjson
-import json
-import hashlib
-from autogpt.memory.base import MemoryProviderSingleton, get_ada_embedding
 
-EMBED_DIM = 1536
-SAVE_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SERIALIZE_DATACLASS
+from autogpt.memory.base import (
+    EXPORT_BATCH_SIZE,
+    MemoryProviderSingleton,
+    embedding_provider,
+    get_ada_embedding,
+    get_ada_embeddings,
+    get_query_embedding,
+)
+from autogpt.memory.eviction import AccessStats, get_eviction_policy
+from autogpt.memory.ivf import IVFIndex
+from autogpt.memory.journal import Journal, decode_vector, encode_vector
+from autogpt.memory.lexical import BM25Index
+from autogpt.memory.locking import FileLock
+from autogpt.memory.matrix import EmbeddingMatrix, top_k
+from autogpt.memory.pq import PQIndex
+from autogpt.memory.tags import TagIndex
+
+EMBED_DIM = embedding_provider.dimension
 # Memory discipline caps
-MAX_MEMORY_ITEMS = 200           # Keep newest N entries
-MAX_ENTRY_CHARS = 4000           # Trim each entry's content
-MAX_MEMORY_BYTES = 2_000_000     # ~2MB cap for the json file
+# (defaults; MEMORY_MAX_ITEMS / MEMORY_MAX_BYTES override the item and byte caps)
+MAX_MEMORY_ITEMS = 200  # Keep newest N entries
+MAX_ENTRY_CHARS = 4000  # Trim each entry's content
+MAX_MEMORY_BYTES = 2_000_000  # ~2MB cap for the .npy + .jsonl snapshot
+# get_relevant prefers entries at least this similar (tweak between 0.1-0.2)
+RELEVANCE_THRESHOLD = 0.15
+# Fold the journal into a fresh snapshot once it holds this many records
+WAL_COMPACT_RECORDS = 256
+ROW_BYTES = EMBED_DIM * np.dtype(np.float32).itemsize
+# MEMORY_COMPRESSION setting -> storage dtype of the embedding rows
+COMPRESSION_DTYPES = {"none": np.float32, "float16": np.float16, "int8": np.int8}
+# How get_relevant ranks entries: by embedding only, by embedding and BM25
+# keyword score together, or by BM25 alone without an embedding call
+SEARCH_MODES = ("vector", "hybrid", "lexical")
+# BM25 scores are divided by the best one, but by no less than this, so a
+# query that only shares a few common terms with the cache doesn't give its
+# best match the full keyword weight
+LEXICAL_SCORE_FLOOR = 5.0
+
 
 def _trim_text(s: str, limit: int) -> str:
     s = "" if s is None else str(s)
     return s if len(s) <= limit else (s[:limit] + "\n...[trimmed]")
 
+
 def _hash_text(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8", errors="ignore")).hexdigest()
 
-def _enforce_caps(cache: "CacheContent"):
-    """Keep texts and embeddings aligned while trimming."""
-    # 1) Max items
-    if len(cache.texts) > MAX_MEMORY_ITEMS:
-        drop = len(cache.texts) - MAX_MEMORY_ITEMS
-        cache.texts = cache.texts[drop:]
-        if cache.embeddings.shape[0] >= drop:
-            cache.embeddings = cache.embeddings[drop:, :]
-        else:
-            cache.embeddings = create_default_embeddings()
 
-def create_default_embeddings():
-    return np.zeros((0, EMBED_DIM)).astype(np.float32)
+def _entry_bytes(entry: dict, row_bytes: int = ROW_BYTES) -> int:
+    """Snapshot footprint of one entry: its JSONL line plus its vector row."""
+    return len(orjson.dumps(entry)) + 1 + row_bytes
+
+
+def _entry_time(entry: dict) -> float:
+    """The entry's timestamp as epoch seconds, or now if it has none."""
+    try:
+        stamp = datetime.fromisoformat(entry["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return stamp.timestamp()
 
 
 @dataclasses.dataclass
 class CacheContent:
-    texts: List[dict] = dataclasses.field(default_factory=list)
-    embeddings: np.ndarray = dataclasses.field(default_factory=create_default_embeddings)
+    # Entries indexed by embedding slot; None marks a free slot
+    texts: List[Optional[dict]] = dataclasses.field(default_factory=list)
+    embeddings: EmbeddingMatrix = dataclasses.field(
+        default_factory=lambda: EmbeddingMatrix(EMBED_DIM)
+    )
+    # Sequence number of the last journal record folded into this content
+    seq: int = 0
+    # Snapshot footprint of the live entries and of each slot's entry, see
+    # `_entry_bytes`; kept up to date as entries come and go
+    nbytes: int = 0
+    sizes: List[int] = dataclasses.field(default_factory=list)
+    tags: TagIndex = dataclasses.field(default_factory=TagIndex)
+    # Content hash -> slot over the whole store, rebuilt from entries on load
+    hashes: Dict[str, int] = dataclasses.field(default_factory=dict)
+    # Optional approximate nearest neighbour index over the slots
+    ann: Optional[Union[IVFIndex, PQIndex]] = None
+    # Optional BM25 keyword index over the slots' content
+    lexical: Optional[BM25Index] = None
+    # Retrieval counts and times that drive the eviction policies
+    access: AccessStats = dataclasses.field(default_factory=AccessStats)
+
+    def entries(self) -> List[dict]:
+        """Live entries from oldest to newest."""
+        return [self.texts[slot] for slot in self.embeddings.order()]
+
+    def place(self, slot: int, entry: dict):
+        if slot >= len(self.texts):
+            self.texts.extend([None] * (slot + 1 - len(self.texts)))
+            self.sizes.extend([0] * (slot + 1 - len(self.sizes)))
+        self.texts[slot] = entry
+        self.sizes[slot] = _entry_bytes(entry, self.embeddings.row_bytes)
+        self.nbytes += self.sizes[slot]
+        self.tags.add(slot, entry.get("tags", []))
+        if "hash" in entry:
+            self.hashes[entry["hash"]] = slot
+
+    def drop(self, slot: int):
+        entry, self.texts[slot] = self.texts[slot], None
+        if entry is not None:
+            self.nbytes -= self.sizes[slot]
+            self.sizes[slot] = 0
+            self.tags.discard(slot, entry.get("tags", []))
+            if self.hashes.get(entry.get("hash")) == slot:
+                del self.hashes[entry["hash"]]
+
+    def set_dtype(self, dtype):
+        """Store the embedding rows in another dtype and re-measure the entries."""
+        self.embeddings.set_dtype(dtype)
+        for slot in self.embeddings.order():
+            self.nbytes -= self.sizes[slot]
+            self.sizes[slot] = _entry_bytes(self.texts[slot], self.embeddings.row_bytes)
+            self.nbytes += self.sizes[slot]
+
+    def tagged(self, tags: List[str], match_all: bool = False) -> np.ndarray:
+        """Slots of entries with any (or all) of the tags, oldest first."""
+        mask = self.tags.match(tags, self.embeddings.size, match_all)
+        return self.embeddings.sort_slots(np.flatnonzero(mask))
+
+    def export(self) -> Tuple[dict, List[Optional[dict]], np.ndarray]:
+        """Copy out what a snapshot needs: header, per-slot entries, slot rows."""
+        vectors, order = self.embeddings.state()
+        header = {
+            "seq": self.seq,
+            "order": order,
+            "max_rows": self.embeddings.max_rows,
+            "model": embedding_provider.model,
+            "dim": self.embeddings.dim,
+        }
+        # Entries are replaced rather than mutated, so a shallow copy is enough.
+        return header, self.texts[: len(vectors)], vectors
+
+
+def _apply_record(cache: CacheContent, record: dict):
+    """
+    Apply one journal record to the cache.
+
+    Live mutations and crash-recovery replay both go through here, so a
+    replayed journal reproduces exactly the state the writer had, down to
+    which slot each entry occupies.
+    """
+    op = record["op"]
+    if op == "add":
+        vector = decode_vector(record["vector"])
+        slot, evicted = cache.embeddings.append(vector)
+        if evicted is not None:
+            _release(cache, evicted)
+        cache.place(slot, record["entry"])
+        cache.access.reset(slot, _entry_time(record["entry"]))
+        if cache.ann is not None:
+            cache.ann.add(slot, vector)
+        if cache.lexical is not None:
+            cache.lexical.add(slot, record["entry"]["content"])
+    elif op == "tags":
+        for slot, tags in zip(record["rows"], record["tags"]):
+            entry = cache.texts[slot]
+            cache.drop(slot)
+            cache.place(slot, dict(entry, tags=tags))
+    elif op == "touch":
+        for slot in record["rows"]:
+            entry = cache.texts[slot]
+            cache.drop(slot)
+            cache.place(slot, dict(entry, timestamp=record["timestamp"]))
+            cache.embeddings.touch(slot)
+        cache.access.record(record["rows"], _entry_time(record))
+    elif op == "evict":
+        for slot in record["rows"]:
+            cache.embeddings.release(slot)
+            _release(cache, slot)
+    elif op == "limit":
+        for slot in cache.embeddings.set_max_rows(record["max_rows"]):
+            _release(cache, slot)
+    elif op == "clear":
+        cache.texts = []
+        cache.sizes = []
+        cache.access = AccessStats()
+        cache.embeddings = EmbeddingMatrix(
+            EMBED_DIM, max_rows=cache.embeddings.max_rows, dtype=cache.embeddings.dtype
+        )
+        cache.nbytes = 0
+        cache.tags = TagIndex()
+        cache.hashes = {}
+        if cache.ann is not None:
+            cache.ann.reset()
+        if cache.lexical is not None:
+            cache.lexical = BM25Index()
+    cache.seq = record["seq"]
+
+
+def _release(cache: CacheContent, slot: int):
+    """Forget an entry whose embedding row has been released."""
+    cache.drop(slot)
+    if cache.ann is not None:
+        cache.ann.remove(slot)
+    if cache.lexical is not None:
+        cache.lexical.remove(slot)
+
+
+# On-disk layout: `<index>.npy` holds the raw float32 embedding slots and is
+# memory-mapped on load, `<index>.jsonl` holds a header line (slot order, ring
+# size, journal seq, embedding model and dimension) followed by one metadata
+# entry per slot, and `<index>.wal` journals every mutation made since that
+# snapshot, each add with the model of its vector. `<index>.stats.npz` keeps
+# the per-slot retrieval counters as of the last snapshot; they only steer
+# eviction, so it is written on a best-effort basis. `<index>.json` is the
+# legacy single-document orjson format.
+def _snapshot_paths(index: str) -> Tuple[str, str]:
+    return f"{index}.npy", f"{index}.jsonl"
+
+
+def _index_paths(index: str) -> List[str]:
+    """Every file holding the data of an index."""
+    return [
+        *_snapshot_paths(index),
+        _journal_path(index),
+        _stats_path(index),
+        f"{index}.json",
+    ]
+
+
+def _check_provider(path: str, model: Optional[str], dim: int):
+    """
+    Refuse vectors made by another embedding provider than the configured
+    one; `model` is None for files written before it was recorded.
+    """
+    if (
+        model or embedding_provider.model
+    ) != embedding_provider.model or dim != EMBED_DIM:
+        raise ValueError(
+            f"'{path}' holds {model or 'unknown'} embeddings of {dim} dimensions, but"
+            f" EMBEDDING_PROVIDER makes {embedding_provider.model} ones of {EMBED_DIM}."
+        )
+
+
+def _check_records(path: str, records: List[dict]):
+    """`_check_provider` for the adds among journal records, before any is applied."""
+    for record in records:
+        if record["op"] == "add":
+            _check_provider(
+                path, record.get("model"), len(decode_vector(record["vector"]))
+            )
+
+
+def _set_aside(index: str) -> str:
+    """Rename the files of an index to a new, unused index and return its name."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    aside, attempt = f"{index}-{stamp}", 1
+    while any(os.path.exists(path) for path in _index_paths(aside)):
+        attempt += 1
+        aside = f"{index}-{stamp}-{attempt}"
+    for path, moved in zip(_index_paths(index), _index_paths(aside)):
+        if os.path.exists(path):
+            os.replace(path, moved)
+    return aside
+
+
+def _stats_path(index: str) -> str:
+    return f"{index}.stats.npz"
+
+
+def _write_access_stats(index: str, hits: np.ndarray, last: np.ndarray):
+    tmp_path = f"{_stats_path(index)}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, hits=hits, last=last)
+        os.replace(tmp_path, _stats_path(index))
+    except OSError as e:
+        print(f"Warning: Could not save memory access stats: {e}")
+
+
+def _read_access_stats(index: str, size: int) -> Optional[AccessStats]:
+    """Load the retrieval counters if they still line up with the snapshot."""
+    path = _stats_path(index)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as stats:
+            hits, last = stats["hits"], stats["last"]
+    except (ValueError, OSError, KeyError):
+        return None
+    if len(hits) != size or len(last) != size:
+        return None
+    return AccessStats(hits, last)
+
+
+def _journal_path(index: str) -> str:
+    return f"{index}.wal"
+
+
+def _lock_paths(index: str) -> Tuple[str, str]:
+    """Lock files for journal access and for compaction, see `LocalCache.shared`."""
+    return f"{index}.lock", f"{index}.compact.lock"
+
+
+def _read_entries(path: str) -> Tuple[dict, List[Optional[dict]]]:
+    """Return the snapshot header and the per-slot entries of a sidecar."""
+    header, entries = {}, []
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = orjson.loads(line)
+            if isinstance(item, dict) and "__snapshot__" in item:
+                header = item["__snapshot__"]
+            else:
+                entries.append(item)
+    return header, entries
+
+
+def _write_snapshot(
+    index: str, header: dict, texts: List[Optional[dict]], vectors: np.ndarray
+):
+    """
+    Write the embedding slots and the metadata sidecar as one unit.
+
+    Both files are fully written and synced under temporary names before
+    either is renamed into place. If the process dies between the two renames,
+    `_recover_snapshot` finishes the job on the next load.
+    """
+    _stage_snapshot(index, header, texts, vectors)
+    _publish_snapshot(index)
+
+
+def _stage_snapshot(
+    index: str, header: dict, texts: List[Optional[dict]], vectors: np.ndarray
+):
+    """Write and sync both snapshot files under their temporary names."""
+    vectors_path, entries_path = _snapshot_paths(index)
+    tmp_vectors, tmp_entries = f"{vectors_path}.tmp", f"{entries_path}.tmp"
+    with open(tmp_vectors, "wb") as f:
+        np.save(f, vectors)
+        f.flush()
+        os.fsync(f.fileno())
+    with open(tmp_entries, "wb") as f:
+        f.write(orjson.dumps({"__snapshot__": header}) + b"\n")
+        f.writelines(orjson.dumps(entry) + b"\n" for entry in texts)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _publish_snapshot(index: str):
+    """Rename a staged snapshot into place, vectors first."""
+    vectors_path, entries_path = _snapshot_paths(index)
+    tmp_vectors, tmp_entries = f"{vectors_path}.tmp", f"{entries_path}.tmp"
+    os.replace(tmp_vectors, vectors_path)
+    os.replace(tmp_entries, entries_path)
+
+
+def _recover_snapshot(index: str):
+    """Complete or discard a snapshot write that was interrupted by a crash."""
+    vectors_path, entries_path = _snapshot_paths(index)
+    tmp_vectors, tmp_entries = f"{vectors_path}.tmp", f"{entries_path}.tmp"
+    if os.path.exists(tmp_entries) and not os.path.exists(tmp_vectors):
+        # Vectors were already renamed into place; the sidecar must follow.
+        os.replace(tmp_entries, entries_path)
+    for path in (tmp_vectors, tmp_entries):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _migrate_legacy(index: str) -> Optional[CacheContent]:
+    """Convert a legacy `<index>.json` file to the binary layout."""
+    legacy_path = f"{index}.json"
+    if not os.path.exists(legacy_path):
+        return None
+    try:
+        with open(legacy_path, "rb") as f:
+            file_content = f.read()
+        loaded = orjson.loads(file_content) if file_content.strip() else {}
+    except orjson.JSONDecodeError:
+        print(f"Error: The file '{legacy_path}' is not valid JSON.")
+        return None
+
+    embeddings = np.asarray(loaded.get("embeddings", []), dtype=np.float32)
+    if embeddings.ndim == 2:
+        _check_provider(legacy_path, None, embeddings.shape[1])
+    cache = _build_cache(loaded.get("texts", []), embeddings.reshape(-1, EMBED_DIM))
+    _write_snapshot(index, *cache.export())
+    os.replace(legacy_path, f"{legacy_path}.bak")
+    print(f"Migrated '{legacy_path}' to the binary memory format.")
+    return cache
+
+
+def _build_cache(
+    texts: List[Optional[dict]], vectors: np.ndarray, header: Optional[dict] = None
+) -> CacheContent:
+    header = header or {}
+    order = header.get("order")
+    if order is None:
+        order = [slot for slot, entry in enumerate(texts) if entry is not None]
+    matrix = EmbeddingMatrix.from_state(vectors, order, header.get("max_rows"))
+    cache = CacheContent(
+        texts=[None] * len(texts),
+        embeddings=matrix,
+        seq=header.get("seq", 0),
+        sizes=[0] * len(texts),
+    )
+    for slot in order:
+        cache.place(slot, texts[slot])
+        cache.access.reset(slot, _entry_time(texts[slot]))
+    return cache
+
+
+def open_snapshot(index: str) -> Tuple[dict, List[Optional[dict]], np.ndarray]:
+    """
+    Open the latest snapshot read-only: its header, per-slot entries and rows.
+
+    The rows are a read-only memory map rather than a copy, so any number of
+    processes can scan the same snapshot while sharing one page cache. They
+    are float32, float16 or int8, depending on MEMORY_COMPRESSION; int8 rows
+    are scaled per row (see `encode_rows`).
+    Journal records newer than the header's `seq` are not applied.
+
+    Raises:
+        FileNotFoundError: if there is no snapshot yet
+        ValueError: if the snapshot is unreadable, its files disagree, or
+            its vectors come from another embedding provider
+    """
+    vectors_path, entries_path = _snapshot_paths(index)
+    try:
+        vectors = np.load(vectors_path, mmap_mode="r")
+        header, texts = (
+            _read_entries(entries_path) if os.path.exists(entries_path) else ({}, [])
+        )
+    except FileNotFoundError:
+        raise
+    except (OSError, orjson.JSONDecodeError) as e:
+        raise ValueError(f"Could not read memory snapshot '{vectors_path}': {e}") from e
+
+    if vectors.ndim != 2:
+        raise ValueError(f"'{vectors_path}' has unexpected shape {vectors.shape}.")
+    _check_provider(vectors_path, header.get("model"), vectors.shape[1])
+    if vectors.shape[0] != len(texts):
+        raise ValueError(
+            f"'{vectors_path}' and '{entries_path}' disagree on row count."
+        )
+    return header, texts, vectors
+
+
+def _read_snapshot_header(index: str) -> dict:
+    """Read just the header line of the snapshot sidecar."""
+    _, entries_path = _snapshot_paths(index)
+    try:
+        with open(entries_path, "rb") as f:
+            item = orjson.loads(f.readline() or b"{}")
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+    return item.get("__snapshot__", {}) if isinstance(item, dict) else {}
+
+
+def _load_snapshot(index: str) -> CacheContent:
+    vectors_path, _ = _snapshot_paths(index)
+    if not os.path.exists(vectors_path):
+        migrated = _migrate_legacy(index)
+        if migrated is not None:
+            return migrated
+        print(
+            f"Warning: The file '{vectors_path}' does not exist."
+            " Memory will be initialized empty."
+        )
+        return CacheContent()
+
+    header, texts, vectors = open_snapshot(index)
+    # The mapped slots are copied straight into the growable buffer, so load
+    # costs one pass over the raw vector bytes and the file stays unlocked.
+    cache = _build_cache(texts, vectors, header)
+    cache.access = _read_access_stats(index, len(texts)) or cache.access
+    return cache
+
+
+def load_cache_content(index: str, repair: bool = True) -> CacheContent:
+    """
+    Load a LocalCache: the latest snapshot plus a replay of its journal.
+
+    The embedding slots are read through a memory map, so cold start costs
+    roughly the raw vector bytes instead of a JSON decode. Legacy JSON caches
+    are migrated on the way in.
+
+    A memory that can't be read, or whose vectors another embedding provider
+    made, is moved aside to a new index name, and an empty one is returned;
+    it is neither mixed with new vectors nor overwritten by the next
+    compaction. Without `repair`, which writes nothing, a ValueError is
+    raised instead.
+    """
+    if repair:
+        _recover_snapshot(index)
+    try:
+        cache = _load_snapshot(index)
+        records = list(Journal(_journal_path(index)).replay(cache.seq, repair=repair))
+        _check_records(_journal_path(index), records)
+    except ValueError as e:
+        if not repair:
+            raise
+        aside = _set_aside(index)
+        print(
+            f"Error: {e} Moved that memory to the index '{aside}' and starting empty."
+            " Set MEMORY_INDEX to it, with the EMBEDDING_PROVIDER that made it,"
+            " to use it."
+        )
+        return CacheContent()
+    for record in records:
+        _apply_record(cache, record)
+    return cache
+
+
+class _EntryLedger:
+    """
+    The per-slot entries of a LocalCache without their vectors.
+
+    Journal adds don't record the slot they land in, so this repeats the
+    slot assignment of `EmbeddingMatrix` (ring recycling of the oldest slot,
+    reuse of released slots, touch order) on plain lists.
+    """
+
+    def __init__(self, texts: List[Optional[dict]], header: dict) -> None:
+        self.texts = list(texts)
+        order = header.get("order")
+        if order is None:
+            order = [slot for slot, entry in enumerate(texts) if entry is not None]
+        # Live slots from oldest to newest, and released slots in reuse order
+        self.order: "OrderedDict[int, None]" = OrderedDict.fromkeys(
+            int(s) for s in order
+        )
+        self.free = [
+            slot for slot in range(len(texts) - 1, -1, -1) if slot not in self.order
+        ]
+        self.limit(header.get("max_rows"))
+
+    def release(self, slot: int):
+        if slot in self.order:
+            del self.order[slot]
+            self.texts[slot] = None
+            self.free.append(slot)
+
+    def limit(self, max_rows: Optional[int]):
+        self.max_rows = max_rows
+        while max_rows is not None and len(self.order) > max_rows:
+            self.release(next(iter(self.order)))
+
+    def apply(self, record: dict):
+        """Apply one journal record, as `_apply_record` does."""
+        op = record["op"]
+        if op == "add":
+            if self.max_rows is not None and len(self.order) >= self.max_rows:
+                self.release(next(iter(self.order)))
+            if self.free:
+                slot = self.free.pop()
+            else:
+                slot = len(self.texts)
+                self.texts.append(None)
+            self.texts[slot] = record["entry"]
+            self.order[slot] = None
+        elif op == "tags":
+            for slot, tags in zip(record["rows"], record["tags"]):
+                self.texts[slot] = dict(self.texts[slot], tags=tags)
+        elif op == "touch":
+            for slot in record["rows"]:
+                self.texts[slot] = dict(self.texts[slot], timestamp=record["timestamp"])
+                self.order.move_to_end(slot)
+        elif op == "evict":
+            for slot in record["rows"]:
+                self.release(slot)
+        elif op == "limit":
+            self.limit(record["max_rows"])
+        elif op == "clear":
+            self.texts, self.order, self.free = [], OrderedDict(), []
+
+    def entries(self) -> List[dict]:
+        return [self.texts[slot] for slot in self.order]
+
+
+def read_cache_entries(index: str) -> List[dict]:
+    """
+    Read the current metadata entries of a LocalCache, oldest first.
+
+    Only the snapshot sidecar and the journal are read; no vector is loaded
+    and nothing is repaired or migrated, so no file is written. A legacy
+    `<index>.json` is read as it is.
+    """
+    vectors_path, entries_path = _snapshot_paths(index)
+    if os.path.exists(f"{entries_path}.tmp") and not os.path.exists(
+        f"{vectors_path}.tmp"
+    ):
+        # A compaction died between its renames; this is the sidecar
+        # `_recover_snapshot` will publish.
+        entries_path = f"{entries_path}.tmp"
+    header, texts = {}, []
+    if os.path.exists(entries_path):
+        header, texts = _read_entries(entries_path)
+    elif os.path.exists(f"{index}.json"):
+        with open(f"{index}.json", "rb") as f:
+            file_content = f.read()
+        texts = (
+            orjson.loads(file_content).get("texts", []) if file_content.strip() else []
+        )
+    ledger = _EntryLedger(texts, header)
+    for record in Journal(_journal_path(index)).replay(
+        header.get("seq", 0), repair=False
+    ):
+        ledger.apply(record)
+    return ledger.entries()
 
 
 class LocalCache(MemoryProviderSingleton):
@@ -49,158 +627,732 @@ class LocalCache(MemoryProviderSingleton):
     def __init__(self, cfg) -> None:
         """Initialize the memory instance."""
         self.cfg = cfg
-        self.filename = f"{cfg.memory_index}.json"
+        self.filename, _ = _snapshot_paths(cfg.memory_index)
         self.save_on_every_action = getattr(cfg, "MEMORY_SAVE_ON_EVERY_ACTION", True)
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, "rb") as f:
-                    file_content = f.read()
-                    if not file_content.strip():
-                        file_content = b"{}"
-
-                    loaded = orjson.loads(file_content)
-                    self.data = CacheContent(**loaded)
-            except orjson.JSONDecodeError:
-                print(f"Error: The file '{self.filename}' is not valid JSON.")
-                self.data = CacheContent()
-        else:
+
+        # Several processes may share one index. Each then journals every
+        # mutation at once under an exclusive file lock, after folding in
+        # whatever the others appended since it last looked (see `_sync`).
+        self.shared = bool(getattr(cfg, "memory_shared", False))
+        lock_path, compact_lock_path = _lock_paths(cfg.memory_index)
+        self._file_lock = (
+            FileLock(lock_path) if self.shared else contextlib.nullcontext()
+        )
+        self._compact_file_lock = FileLock(compact_lock_path) if self.shared else None
+        # Crash recovery touches staged snapshot files, so it must not run
+        # while another process is compacting.
+        with self._compact_file_lock or contextlib.nullcontext(), self._file_lock:
+            self.data = load_cache_content(cfg.memory_index)
+            self._journal = Journal(_journal_path(cfg.memory_index))
+            # Journal stamp as of the last record folded into `data`
+            self._journal_version = self._journal.version()
+
+        # Embedding rows can be kept as float16 or int8 to shrink memory and
+        # the snapshot 2x or 4x. A snapshot in another format is converted
+        # here and written in the new one at the next compaction.
+        compression = getattr(cfg, "memory_compression", "none")
+        if compression not in COMPRESSION_DTYPES:
+            print(f"Warning: Unknown memory compression '{compression}', using none.")
+            compression = "none"
+        self.storage_dtype = np.dtype(COMPRESSION_DTYPES[compression])
+        self.data.set_dtype(self.storage_dtype)
+
+        # Mutations are applied in memory at once and journaled either right
+        # away, by the background writer, or, without save_on_every_action,
+        # on the next save().
+        self._journal_records = 0
+        self._pending: List[dict] = []
+        self._pending_since = 0.0
+        self._lock = threading.RLock()
+        self._dirty = threading.Condition(self._lock)
+        self._compact_lock = threading.Lock()
+        self._compactor = None
+
+        # With a flush interval set, journal writes move to a background
+        # thread that batches them: it writes once `flush_batch` records are
+        # waiting or the oldest has waited `flush_interval` seconds.
+        self.flush_interval = float(getattr(cfg, "memory_flush_interval_ms", 0)) / 1000
+        self.flush_batch = int(getattr(cfg, "memory_flush_batch", 64))
+        self._closing = False
+        self._writer = None
+        if self.flush_interval > 0 and self.shared:
             print(
-                f"Warning: The file '{self.filename}' does not exist. Memory will be initialized empty."
+                "Warning: MEMORY_FLUSH_INTERVAL_MS is ignored"
+                " for a shared memory index."
             )
-            self.data = CacheContent()
+        elif self.flush_interval > 0:
+            self._writer = threading.Thread(target=self._write_behind, daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+        # Which entries go when a cap is hit; pinned tags are evicted last.
+        self.eviction = get_eviction_policy(
+            getattr(cfg, "memory_eviction_policy", "fifo"),
+            float(getattr(cfg, "memory_decay_half_life", 86400.0)),
+        )
+        self.pinned_tags = list(getattr(cfg, "memory_pinned_tags", ["in-progress"]))
+
+        # The item cap is the ring size of the embedding matrix. Changing it
+        # is journaled too, so replay recycles the same slots.
+        self.max_items = int(getattr(cfg, "memory_max_items", MAX_MEMORY_ITEMS))
+        self.max_bytes = int(getattr(cfg, "memory_max_bytes", MAX_MEMORY_BYTES))
+        with self._lock, self._file_lock:
+            self._sync()
+            if self.data.embeddings.max_rows != self.max_items:
+                self._evict(count=len(self.data.embeddings) - self.max_items)
+                self._commit({"op": "limit", "max_rows": self.max_items})
+
+        # Large stores can trade exact search for an IVF index, or for a scan
+        # over product-quantized codes whose best candidates are re-ranked
+        # exactly. Either is rebuilt from the vectors on load rather than
+        # persisted.
+        ann_index = getattr(cfg, "memory_ann_index", "none")
+        if ann_index == "ivf":
+            self.data.ann = IVFIndex(nprobe=int(getattr(cfg, "memory_ivf_nprobe", 8)))
+        elif ann_index == "pq":
+            self.data.ann = PQIndex(
+                subspaces=int(getattr(cfg, "memory_pq_subspaces", 96)),
+                rerank=int(getattr(cfg, "memory_pq_rerank", 400)),
+            )
+        self._train_ann()
+
+        # Embeddings match meaning but blur exact identifiers (file names,
+        # URLs, error strings), so hybrid mode blends in a BM25 keyword score
+        # with weight `hybrid_weight`. The keyword index is also rebuilt from
+        # the entries on load.
+        self.search_mode = getattr(cfg, "memory_search_mode", "vector")
+        if self.search_mode not in SEARCH_MODES:
+            print(
+                f"Warning: Unknown memory search mode '{self.search_mode}',"
+                " using vector."
+            )
+            self.search_mode = "vector"
+        self.hybrid_weight = min(
+            max(float(getattr(cfg, "memory_hybrid_weight", 0.3)), 0.0), 1.0
+        )
+        if self.search_mode != "vector":
+            self._index_lexical()
+
+    def _commit(self, record: dict):
+        """Apply a mutation, then journal it."""
+        self._commit_many([record])
 
-    def add(self, text: str, tags: list = None, task_id: str = None):
+    def _commit_many(self, records: List[dict]):
+        """Apply mutations in order, then journal them in one write."""
+        if not records:
+            return
+        with self._lock, self._file_lock:
+            self._sync()
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            for record in records:
+                record["seq"] = self.data.seq + 1
+                _apply_record(self.data, record)
+                self._pending.append(record)
+            if self._writer is not None:
+                self._dirty.notify()
+            elif self.save_on_every_action or self.shared:
+                self._flush_journal()
+
+    def _sync(self):
         """
-        Add structured text entry to memory with embedding.
+        Fold in journal records that other processes appended to a shared index.
 
-        Args:
-            text (str): the text content
-            tags (list): optional tags for search/context
-            task_id (str): optional unique identifier for this task
+        The journal's `(inode, size)` stamp tells whether anything changed for
+        the price of one stat. A new inode means another process compacted:
+        if its snapshot is ahead of us we reload, otherwise the new journal
+        holds only records from around our position onwards.
         """
+        if not self.shared:
+            return
+        with self._lock, self._file_lock:
+            version = self._journal.version()
+            if version == self._journal_version or version is None:
+                return
+            offset = 0
+            if (
+                self._journal_version is not None
+                and version[0] == self._journal_version[0]
+            ):
+                offset = self._journal_version[1]
+            elif (
+                _read_snapshot_header(self.cfg.memory_index).get("seq", 0)
+                > self.data.seq
+            ):
+                self._reload()
+                return
+            records, offset = self._journal.read_from(offset)
+            _check_records(self._journal.path, records)
+            for record in records:
+                if record["seq"] > self.data.seq:
+                    _apply_record(self.data, record)
+            self._journal_records += len(records)
+            self._journal_version = (version[0], offset)
+
+    def _reload(self):
+        """Replace the in-memory state with the latest snapshot and journal."""
+        ann, lexical = self.data.ann, self.data.lexical
+        self.data = load_cache_content(self.cfg.memory_index, repair=False)
+        self.data.set_dtype(self.storage_dtype)
+        self._journal_version = self._journal.version()
+        if ann is not None:
+            ann.reset()
+            self.data.ann = ann
+            self._train_ann()
+        if lexical is not None:
+            self._index_lexical()
+
+    def _write_behind(self):
+        """Background writer loop: journal pending records in batches."""
+        with self._dirty:
+            while not self._closing:
+                if not self._pending:
+                    self._dirty.wait()
+                    continue
+                deadline = self._pending_since + self.flush_interval
+                while not self._closing and len(self._pending) < self.flush_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._dirty.wait(remaining)
+                self._flush_journal()
+
+    def close(self):
+        """Stop the background writer and journal everything still pending."""
+        with self._dirty:
+            self._closing = True
+            self._dirty.notify()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+            atexit.unregister(self.close)
+        self._flush_journal()
+        if self._compactor is not None:
+            self._compactor.join()
+        self._journal.close()
+        if self.shared:
+            self._file_lock.close()
+            self._compact_file_lock.close()
+
+    def _flush_journal(self):
+        with self._lock, self._file_lock:
+            records, self._pending = self._pending, []
+            self._journal.append(records)
+            self._journal_records += len(records)
+            if self.shared and records:
+                self._journal_version = self._journal.version()
+            compact = self._journal_records >= WAL_COMPACT_RECORDS or any(
+                r["op"] == "clear" for r in records
+            )
+        if compact and not self._compact_lock.locked():
+            self._compactor = threading.Thread(target=self.compact, daemon=True)
+            self._compactor.start()
+
+    def _evict(self, count: int = 0, nbytes: int = 0):
+        """Evict at least `count` entries and `nbytes` bytes, in the policy's order."""
+        if count <= 0 and nbytes <= 0:
+            return
+        with self._lock, self._file_lock:
+            self._sync()
+            slots = self.eviction.victims(self.data, count, nbytes, self.pinned_tags)
+            if slots:
+                self._commit({"op": "evict", "rows": slots})
+
+    def _make_room(self, rows: int = 1):
+        """Free slots for the next adds unless plain FIFO recycling will do."""
+        if self.eviction.name == "fifo" and not self.pinned_tags:
+            return
+        self._evict(count=len(self.data.embeddings) + rows - self.max_items)
+
+    def _enforce_byte_cap(self):
+        """Evict entries until the byte cap holds."""
+        self._evict(nbytes=self.data.nbytes - self.max_bytes)
+
+    def _train_ann(self):
+        """(Re)train the ANN index once the store has outgrown its last training."""
+        ann = self.data.ann
+        with self._lock:
+            if ann is not None and ann.needs_training(len(self.data.embeddings)):
+                ann.train(self.data.embeddings)
+
+    def _index_lexical(self):
+        """Build the BM25 index over the live entries."""
+        with self._lock:
+            lexical = BM25Index()
+            for slot in self.data.embeddings.order():
+                lexical.add(int(slot), self.data.texts[slot]["content"])
+            self.data.lexical = lexical
+
+    def _new_entry(self, text: str, tags: list, task_id: str = None, offset: int = 0):
+        """Build the entry stored for a text, or None if the text is skipped."""
         if "Command Error:" in text:
-            return ""
+            return None
         text = _trim_text(text, MAX_ENTRY_CHARS)
-        tags = tags or []
+        tags = list(tags or [])
 
         # Auto-add "in-progress" if essay or long task
-        if "in-progress" not in tags and getattr(self.cfg, "memory_settings", {}).get("auto_tag_in_progress", True):
-            if any(word in text.lower() for word in ["essay", "report", "article", "story"]):
+        if "in-progress" not in tags and getattr(self.cfg, "memory_settings", {}).get(
+            "auto_tag_in_progress", True
+        ):
+            if any(
+                word in text.lower() for word in ["essay", "report", "article", "story"]
+            ):
                 tags.append("in-progress")
 
-        content_hash = _hash_text(text)
-        memory_entry = {
-            "id": task_id or f"action_{len(self.data.texts)}_{int(datetime.utcnow().timestamp())}",
+        position = len(self.data.embeddings) + offset
+        return {
+            "id": task_id or f"action_{position}_{int(datetime.utcnow().timestamp())}",
             "tags": tags,
             "timestamp": datetime.utcnow().isoformat(),
             "content": text,
-            "hash": content_hash,
+            "hash": _hash_text(text),
         }
 
-        # Dedupe: if we've already stored this exact content, skip
-        for e in self.data.texts[-50:]:  # scan recent entries only (cheap)
-            if e.get("hash") == content_hash:
-                return e
-        self.data.texts.append(memory_entry)
+    def add(
+        self, text: str, tags: list = None, task_id: str = None, touch: bool = False
+    ):
+        """
+        Add structured text entry to memory with embedding.
+
+        Args:
+            text (str): the text content
+            tags (list): optional tags for search/context
+            task_id (str): optional unique identifier for this task
+            touch (bool): if the content is already stored, refresh that
+                entry's timestamp and make it the newest for eviction
+        """
+        memory_entry = self._new_entry(text, tags, task_id)
+        if memory_entry is None:
+            return ""
+        return self._store([memory_entry], touch)[0]
+
+    def add_many(self, texts: List[str], tags: list = None, touch: bool = False):
+        """
+        Add several texts with one embedding request and one journal write.
 
-        # Embedding
-        embedding = get_ada_embedding(text)
-        vector = np.array(embedding).astype(np.float32)
-        vector = vector[np.newaxis, :]
-        self.data.embeddings = np.concatenate([self.data.embeddings, vector], axis=0)
-        _enforce_caps(self.data)
+        Args:
+            texts (List[str]): the text contents
+            tags (list): optional tags given to every entry
+            touch (bool): refresh the entries whose content is already stored
 
-        # Save immediately if enabled
-        if self.save_on_every_action:
-            self.save()
+        Returns:
+            The stored entry for each text, or "" where the text was skipped
+        """
+        entries = [
+            self._new_entry(text, tags, offset=i) for i, text in enumerate(texts)
+        ]
+        stored = iter(
+            self._store([entry for entry in entries if entry is not None], touch)
+        )
+        return [next(stored) if entry is not None else "" for entry in entries]
 
-        return memory_entry
+    def _store(
+        self, entries: List[dict], touch: bool, vectors: Optional[np.ndarray] = None
+    ) -> List[dict]:
+        """
+        Dedupe, embed and commit new entries; return the stored entry for each.
+
+        Entries that come with their `vectors` (one row per entry) are not
+        embedded again.
+        """
+        # Dedupe across the whole store (and the batch) before paying for embeddings
+        found: Dict[str, dict] = {}
+        with self._lock, self._file_lock:
+            self._sync()
+            touched = []
+            for entry in entries:
+                slot = self.data.hashes.get(entry["hash"])
+                if slot is not None and entry["hash"] not in found:
+                    found[entry["hash"]] = self.data.texts[slot]
+                    touched.append(slot)
+            if touch and touched:
+                self._commit(
+                    {
+                        "op": "touch",
+                        "rows": touched,
+                        "timestamp": entries[0]["timestamp"],
+                    }
+                )
+        fresh, given = [], []
+        for i, entry in enumerate(entries):
+            if entry["hash"] not in found:
+                found[entry["hash"]] = entry
+                fresh.append(entry)
+                given.append(i)
+
+        if fresh:
+            # Embedding; once the ring is full the eviction policy picks the
+            # entries to drop, or the ring recycles the oldest slots for plain FIFO
+            if vectors is not None:
+                vectors = np.asarray(vectors, np.float32)[given]
+            else:
+                vectors = np.asarray(
+                    self._embed([entry["content"] for entry in fresh]), np.float32
+                )
+            with self._lock, self._file_lock:
+                self._sync()
+                # Another process may have stored some of them meanwhile
+                records = [
+                    {
+                        "op": "add",
+                        "model": embedding_provider.model,
+                        "entry": entry,
+                        "vector": encode_vector(vector),
+                    }
+                    for entry, vector in zip(fresh, vectors)
+                    if entry["hash"] not in self.data.hashes
+                ]
+                self._make_room(len(records))
+                self._commit_many(records)
+                self._enforce_byte_cap()
+            self._train_ann()
+
+        return [found[entry["hash"]] for entry in entries]
+
+    def export_records(self, cursor=None, batch_size: int = EXPORT_BATCH_SIZE):
+        """
+        Stream the live entries oldest first, see
+        `MemoryProviderSingleton.export_records`.
+
+        The cursor is a position in that order, so resuming assumes the
+        store was not changed in between.
+        """
+        position = int(cursor or 0)
+        with self._lock:
+            self._sync()
+            order = self.data.embeddings.order()
+        while position < len(order):
+            slots = order[position : position + batch_size]
+            with self._lock:
+                vectors = self.data.embeddings.rows(slots)
+                entries = [self.data.texts[slot] for slot in slots]
+            # int8 rows lose their scale (see `encode_rows`); embeddings are
+            # unit length, so normalizing gives the original vectors back
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = np.divide(
+                vectors, norms, out=np.zeros_like(vectors), where=norms > 0
+            )
+            position += len(slots)
+            yield [
+                {
+                    "text": entry["content"],
+                    "vector": vector.tolist(),
+                    "tags": list(entry.get("tags", [])),
+                    "task_id": entry.get("id"),
+                    "timestamp": _entry_time(entry),
+                }
+                for entry, vector in zip(entries, vectors)
+            ], position
+
+    def import_records(self, records: List[dict]) -> int:
+        """
+        Store exported records with their vectors; content already stored is
+        skipped as in `add`.
+
+        Raises:
+            ValueError: if the new entries don't fit under MEMORY_MAX_ITEMS and
+                MEMORY_MAX_BYTES; they would evict others, which a migration
+                must not do behind the caller's back
+        """
+        if not records:
+            return 0
+        entries = []
+        for record in records:
+            text = _trim_text(record["text"], MAX_ENTRY_CHARS)
+            stamp = datetime.fromtimestamp(record["timestamp"], timezone.utc)
+            position = len(self.data.embeddings) + len(entries)
+            entries.append(
+                {
+                    "id": record.get("task_id")
+                    or f"action_{position}_{int(stamp.timestamp())}",
+                    "tags": list(record.get("tags") or []),
+                    "timestamp": stamp.replace(tzinfo=None).isoformat(),
+                    "content": text,
+                    "hash": _hash_text(text),
+                }
+            )
+        with self._lock, self._file_lock:
+            self._sync()
+            fresh = {
+                entry["hash"]: entry
+                for entry in entries
+                if entry["hash"] not in self.data.hashes
+            }
+            items = len(self.data.embeddings) + len(fresh)
+            nbytes = self.data.nbytes + sum(
+                _entry_bytes(entry, self.data.embeddings.row_bytes)
+                for entry in fresh.values()
+            )
+        if items > self.max_items or nbytes > self.max_bytes:
+            raise ValueError(
+                f"{len(fresh)} more entries would take the local memory to"
+                f" {items} entries"
+                f" and {nbytes} bytes, over MEMORY_MAX_ITEMS={self.max_items} or"
+                f" MEMORY_MAX_BYTES={self.max_bytes}, and evict others. Raise them to"
+                " import everything."
+            )
+        self._store(
+            entries, touch=False, vectors=[record["vector"] for record in records]
+        )
+        return len(entries)
+
+    @staticmethod
+    def _embed(texts: List[str]) -> List[List[float]]:
+        if len(texts) == 1:
+            return [get_ada_embedding(texts[0])]
+        return get_ada_embeddings(texts)
 
     def mark_done(self, task_tags: list = None):
         """Mark all matching tasks as done by replacing 'in-progress' with 'done'."""
         task_tags = task_tags or ["in-progress"]
-        updated = 0
-        for entry in self.data.texts:
-            if any(tag in entry.get("tags", []) for tag in task_tags):
-                if "in-progress" in entry["tags"]:
-                    entry["tags"].remove("in-progress")
-                if "done" not in entry["tags"]:
-                    entry["tags"].append("done")
-                updated += 1
-        if updated > 0 and self.save_on_every_action:
-            self.save()
-        return updated
+        slots, new_tags = [], []
+        with self._lock, self._file_lock:
+            self._sync()
+            for slot in self.data.tagged(task_tags):
+                tags = [
+                    tag for tag in self.data.texts[slot]["tags"] if tag != "in-progress"
+                ]
+                if "done" not in tags:
+                    tags.append("done")
+                slots.append(int(slot))
+                new_tags.append(tags)
+            if slots:
+                self._commit({"op": "tags", "rows": slots, "tags": new_tags})
+        return len(slots)
 
     def save(self):
-        """Save memory to disk with size caps."""
-        # Always enforce entry caps first
-        _enforce_caps(self.data)
-
-        # Enforce file-size cap by dropping oldest until it fits
-        out = orjson.dumps(self.data, option=SAVE_OPTIONS)
-        while len(out) > MAX_MEMORY_BYTES and len(self.data.texts) > 0:
-            # drop 10 oldest at a time for speed
-            drop = min(10, len(self.data.texts))
-            self.data.texts = self.data.texts[drop:]
-            if self.data.embeddings.shape[0] >= drop:
-                self.data.embeddings = self.data.embeddings[drop:, :]
-            else:
-                self.data.embeddings = create_default_embeddings()
-            out = orjson.dumps(self.data, option=SAVE_OPTIONS)
+        """Write any journal records that are still buffered in memory."""
+        self._flush_journal()
 
-        with open(self.filename, "wb") as f:
-            f.write(out)
+    def compact(self):
+        """
+        Fold the journal into a fresh snapshot.
 
-    def search(self, query_tags: list):
-        """Return all entries that match any of the given tags."""
-        results = [e for e in self.data.texts if any(tag in e.get("tags", []) for tag in query_tags)]
-        return results
+        The state is copied under the lock, written without it, and then only
+        the journal prefix the snapshot covers is dropped, so records appended
+        in the meantime survive. On a shared index, one process compacts at a
+        time and the others skip their turn.
+        """
+        with self._compact_lock:
+            shared_lock = self._compact_file_lock
+            if shared_lock is not None and not shared_lock.acquire(blocking=False):
+                return
+            try:
+                with self._lock, self._file_lock:
+                    self._sync()
+                    records, self._pending = self._pending, []
+                    self._journal.append(records)
+                    self._journal_records += len(records)
+                    snapshot = self.data.export()
+                    stats = self.data.access.export(len(snapshot[1]))
+                    offset = self._journal.offset()
+                    covered = self._journal_records
+                # Staging is the slow part and needs no lock; readers of a
+                # shared index must see the new snapshot and the truncated
+                # journal together, so both happen under the file lock.
+                _stage_snapshot(self.cfg.memory_index, *snapshot)
+                with self._lock, self._file_lock:
+                    _publish_snapshot(self.cfg.memory_index)
+                    _write_access_stats(self.cfg.memory_index, *stats)
+                    self._journal.truncate_before(offset)
+                    self._journal_records -= covered
+                    if self.shared:
+                        # Records past `offset` moved to the start of the new
+                        # file; `_sync` skips the ones already applied.
+                        self._journal_version = (self._journal.version()[0], 0)
+            finally:
+                if shared_lock is not None:
+                    shared_lock.release()
+
+    def search(self, query_tags: list, match_all: bool = False):
+        """
+        Return all entries that match any (or, with match_all, every one) of
+        the given tags.
+        """
+        self._sync()
+        return [
+            self.data.texts[slot] for slot in self.data.tagged(query_tags, match_all)
+        ]
 
     def clear(self) -> str:
         """Clear all memory."""
-        self.data = CacheContent()
+        if self.shared:
+            self._commit({"op": "clear"})
+            return "Memory cleared."
+        # Persisted with the next journal write, like any other mutation.
+        with self._lock:
+            record = {"op": "clear", "seq": self.data.seq + 1}
+            _apply_record(self.data, record)
+            self._pending.append(record)
         return "Memory cleared."
 
     def get(self, data: str) -> Optional[List[Any]]:
         """Return the most relevant entry for the given data."""
         return self.get_relevant(data, 1)
 
-    def get_relevant(self, text: str, k: int) -> List[Any]:
+    def get_relevant(
+        self,
+        text: str,
+        k: int,
+        tags: list = None,
+        match_all: bool = False,
+        mode: str = None,
+    ) -> List[Any]:
         """
-        Compute similarity scores and return top-k entries, with a minimum similarity threshold.
+        Compute similarity scores and return top-k entries, with a minimum
+        similarity threshold.
 
         Args:
             text: str
             k: int
+            tags: optional tags; only entries carrying any of them are ranked
+            match_all: require every tag instead of any
+            mode: "vector", "hybrid" or "lexical"; defaults to MEMORY_SEARCH_MODE.
+                "lexical" ranks by keywords alone and makes no embedding call
         """
-        if len(self.data.texts) == 0:
-            return []
+        return self.get_relevant_many([text], k, tags, match_all, mode)[0]
 
-        embedding = get_ada_embedding(text)
-        scores = np.dot(self.data.embeddings, embedding)
+    def get_relevant_many(
+        self,
+        texts: List[str],
+        k: int,
+        tags: list = None,
+        match_all: bool = False,
+        mode: str = None,
+    ) -> List[List[Any]]:
+        """
+        Return the top-k entries for each of several queries.
 
-        # Sort indices by similarity (highest first)
-        top_k_indices = np.argsort(scores)[-k:][::-1]
+        All queries are scored against the store in a single matrix product.
 
-        # Optional: filter by threshold but always return up to k results
-        THRESHOLD = 0.15  # tweak this between 0.1-0.2 as needed
-        filtered = [self.data.texts[i] for i in top_k_indices if scores[i] >= THRESHOLD]
+        Args:
+            texts: List[str]
+            k: int
+            tags: optional tags; only entries carrying any of them are ranked
+            match_all: require every tag instead of any
+            mode: "vector", "hybrid" or "lexical", see get_relevant
+        """
+        self._sync()
+        if len(self.data.embeddings) == 0 or not texts:
+            return [[] for _ in texts]
+
+        mode = mode or self.search_mode
+        lexical = [None] * len(texts)
+        if mode != "vector":
+            lexical = [self._lexical_scores(text) for text in texts]
+        if mode == "lexical":
+            # Entries sharing no term with the query are left out entirely.
+            return [
+                self._rank(
+                    self._filter(np.where(row > 0, row, -np.inf), tags, match_all), k
+                )
+                for row in lexical
+            ]
+
+        queries = np.array(
+            [get_query_embedding(text, get_ada_embedding) for text in texts],
+            dtype=np.float32,
+        )
+        if self.data.ann is not None and self.data.ann.trained:
+            return [
+                self._search_ann(query, row, k, tags, match_all)
+                for query, row in zip(queries, lexical)
+            ]
+        scores = self.data.embeddings.cosine(queries)
+        if mode == "hybrid":
+            scores = self._fuse(scores, np.stack(lexical))
+        scores = self._filter(scores, tags, match_all)
+        return [self._rank(row, k) for row in scores]
+
+    def _lexical_scores(self, text: str) -> np.ndarray:
+        """
+        BM25 scores of every slot for the query, scaled into [0, 1]: divided by
+        the best score, or by LEXICAL_SCORE_FLOOR if the best is below it.
+        """
+        if self.data.lexical is None:
+            self._index_lexical()
+        scores = self.data.lexical.scores(text, self.data.embeddings.size)
+        return scores / max(scores.max(initial=0.0), LEXICAL_SCORE_FLOOR)
 
-        # If filtering removed too many, return at least top-k closest
-        if len(filtered) < k:
-            for i in top_k_indices:
-                if self.data.texts[i] not in filtered:
-                    filtered.append(self.data.texts[i])
-                if len(filtered) >= k:
-                    break
+    def _fuse(self, scores: np.ndarray, lexical: np.ndarray) -> np.ndarray:
+        """Blend cosine scores with scaled BM25 scores; released slots stay -inf."""
+        weight = self.hybrid_weight
+        live = np.isfinite(scores)
+        scores[live] = (1 - weight) * scores[live] + weight * lexical[live]
+        return scores
+
+    def _search_ann(
+        self,
+        query: np.ndarray,
+        lexical: Optional[np.ndarray],
+        k: int,
+        tags: list,
+        match_all: bool,
+    ) -> List[Any]:
+        """
+        Rank only the ANN index's candidates: the entries in the IVF lists
+        closest to the query, or the best entries by PQ code.
+
+        With keyword scores, entries matching the query's terms are ranked
+        too, wherever their vectors sit.
+        """
+        matrix = self.data.embeddings
+        slots = self.data.ann.candidates(query)
+        if lexical is not None:
+            slots = np.union1d(slots, np.flatnonzero(lexical > 0))
+        if tags:
+            slots = slots[self.data.tags.match(tags, matrix.size, match_all)[slots]]
+        if len(slots) < min(k, len(matrix)):
+            # The candidates can't fill k places (or the tag filter is very
+            # selective), so fall back to scoring every entry.
+            scores = matrix.cosine(query)
+            if lexical is not None:
+                scores = self._fuse(scores, lexical)
+            return self._rank(self._filter(scores, tags, match_all), k)
+        scores = matrix.cosine(query, slots)
+        if lexical is not None:
+            scores = self._fuse(scores, lexical[slots])
+        return self._rank(scores, k, slots)
+
+    def _filter(self, scores: np.ndarray, tags: list, match_all: bool) -> np.ndarray:
+        """Score entries without the requested tags -inf."""
+        if tags:
+            scores[..., ~self.data.tags.match(tags, scores.shape[-1], match_all)] = (
+                -np.inf
+            )
+        return scores
+
+    def _rank(self, scores: np.ndarray, k: int, slots: np.ndarray = None) -> List[Any]:
+        """
+        Turn one row of scores into the result list for get_relevant.
+
+        Scores are per slot, or per entry of `slots` when only those were scored.
+        """
+        k = min(k, int(np.isfinite(scores).sum()))
+        top_k_indices = top_k(scores, k)
 
-        return filtered
+        # Optional: filter by threshold but always return up to k results;
+        # the closest entries below the threshold fill any remaining places.
+        above = scores[top_k_indices] >= RELEVANCE_THRESHOLD
+        ranked = np.concatenate([top_k_indices[above], top_k_indices[~above]])
+        if slots is not None:
+            ranked = slots[ranked]
+        self.data.access.record(ranked)
+        return [self.data.texts[i] for i in ranked]
 
     def get_stats(self) -> Tuple[int, Tuple[int, ...]]:
         """Return memory statistics."""
-        return len(self.data.texts), self.data.embeddings.shape
+        self._sync()
+        return len(self.data.embeddings), self.data.embeddings.shape
 
-    def add_web_summary(self, source: str, question: str, summary: str, links: list | None = None, tags: list | None = None):
+    def add_web_summary(
+        self,
+        source: str,
+        question: str,
+        summary: str,
+        links: list | None = None,
+        tags: list | None = None,
+    ):
         tags = (tags or []) + ["web_summary"]
         payload = {
             "source": source,
@@ -0,0 +1,60 @@
+"""Cross-process advisory file locking for the local memory backend."""
+
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; locks then only cover threads
+    fcntl = None
+
+
+class FileLock:
+    """
+    A reentrant exclusive lock shared by every process that opens `path`.
+
+    Threads of one process serialize on an RLock and only the outermost
+    acquire takes the `flock`, so nested sections don't deadlock themselves.
+    The lock is advisory: it only excludes processes that also use it.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._threads = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if not self._threads.acquire(blocking):
+            return False
+        if self._depth == 0 and fcntl is not None:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(
+                    self._fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+                )
+            except BlockingIOError:
+                self._threads.release()
+                return False
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._threads.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def close(self):
+        with self._threads:
+            if self._fd is not None and self._depth == 0:
+                os.close(self._fd)
+                self._fd = None
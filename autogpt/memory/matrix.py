@@ -0,0 +1,341 @@
+"""Growable embedding matrix for the local memory backend."""
+
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Compressed rows are converted to float32 in blocks of this many, small
+# enough for the block to stay in cache while it is scored
+BLOCK_ROWS = 1024
+
+
+def encode_rows(vectors: np.ndarray, dtype) -> np.ndarray:
+    """
+    Convert float32 rows to the storage dtype.
+
+    int8 rows are scaled so their largest component maps to +-127. The scale
+    is not kept: cosine similarity doesn't depend on a row's length, and row
+    norms are taken from the stored values.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if np.dtype(dtype) == np.int8:
+        peak = np.max(np.abs(vectors), axis=-1, keepdims=True)
+        scale = np.divide(127.0, peak, out=np.zeros_like(peak), where=peak > 0)
+        return np.rint(vectors * scale).astype(np.int8)
+    return vectors.astype(dtype, copy=False)
+
+
+class EmbeddingMatrix:
+    """
+    A preallocated float32 matrix that rows are appended to in place.
+
+    Capacity doubles whenever it runs out, so n appends cost O(n) copying in
+    total instead of the O(n^2) of concatenating a new array each time. Every
+    row lives in a fixed slot until it is released, and released slots are
+    reused by later appends, so callers can key their own indexes by slot.
+
+    With `max_rows` set the matrix is a ring buffer: once full, appending
+    recycles the oldest row's slot, so FIFO eviction moves no data at all.
+
+    `vectors`, `norms` and `live` are views over slots [0, size) and include
+    released slots, which are zeroed and flagged False in `live`. Row norms
+    are computed once per append so cosine scoring never recomputes them.
+
+    Rows can be stored as float16 or int8 instead of float32 (see
+    `encode_rows`) to cut memory 2x or 4x; they are then scored in float32
+    blocks, and `rows()` returns them converted back, up to a per-row scale.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        max_rows: Optional[int] = None,
+        capacity: int = 16,
+        dtype=np.float32,
+    ):
+        self.dim = dim
+        self.max_rows = max_rows
+        self.dtype = np.dtype(dtype)
+        capacity = max(1, capacity if max_rows is None else min(capacity, max_rows))
+        self._buf = np.zeros((capacity, dim), dtype=self.dtype)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._norms = np.zeros(capacity, dtype=np.float32)
+        # Insertion (or last touch) counter per slot; sorts slots like `order`
+        self._stamps = np.zeros(capacity, dtype=np.int64)
+        self._clock = 0
+        self._size = 0
+        self._free: List[int] = []
+        # Live slots from oldest to newest insertion
+        self._order: "OrderedDict[int, None]" = OrderedDict()
+
+    @classmethod
+    def from_state(
+        cls,
+        vectors: np.ndarray,
+        order: Optional[Sequence[int]] = None,
+        max_rows: Optional[int] = None,
+    ) -> "EmbeddingMatrix":
+        """Rebuild a matrix from `state()`: slot rows plus live slots in order."""
+        size, dim = vectors.shape
+        order = range(size) if order is None else order
+        matrix = cls(dim, capacity=max(size, 16), dtype=vectors.dtype)
+        matrix._buf[:size] = vectors
+        matrix._size = size
+        matrix._order = OrderedDict.fromkeys(int(slot) for slot in order)
+        matrix._live[list(matrix._order)] = True
+        matrix._free = [
+            slot for slot in range(size - 1, -1, -1) if not matrix._live[slot]
+        ]
+        matrix._buf[:size][~matrix._live[:size]] = 0
+        matrix._update_norms(0, size)
+        for slot in matrix._order:
+            matrix._tick(slot)
+        matrix.set_max_rows(max_rows)
+        return matrix
+
+    def state(self) -> Tuple[np.ndarray, List[int]]:
+        """Copy out slots [0, size) as stored, and the live slots oldest first."""
+        return self._buf[: self._size].copy(), list(self._order)
+
+    def set_dtype(self, dtype):
+        """Re-encode every row in another storage dtype."""
+        dtype = np.dtype(dtype)
+        if dtype == self.dtype:
+            return
+        buf = np.zeros(self._buf.shape, dtype=dtype)
+        for start in range(0, self._size, BLOCK_ROWS):
+            stop = min(self._size, start + BLOCK_ROWS)
+            buf[start:stop] = encode_rows(self.rows(np.arange(start, stop)), dtype)
+        self._buf, self.dtype = buf, dtype
+        self._update_norms(0, self._size)
+
+    def _update_norms(self, start: int, stop: int):
+        for block in range(start, stop, BLOCK_ROWS):
+            end = min(stop, block + BLOCK_ROWS)
+            self._norms[block:end] = np.linalg.norm(
+                self._buf[block:end].astype(np.float32, copy=False), axis=1
+            )
+
+    def rows(self, slots: np.ndarray) -> np.ndarray:
+        """The given slots' rows as float32; int8 rows keep their storage scale."""
+        return self._buf[slots].astype(np.float32, copy=False)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @property
+    def capacity(self) -> int:
+        return self._buf.shape[0]
+
+    @property
+    def row_bytes(self) -> int:
+        """Bytes one stored row takes."""
+        return self.dim * self.dtype.itemsize
+
+    @property
+    def size(self) -> int:
+        """Number of slots ever handed out; live rows are a subset of these."""
+        return self._size
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self), self.dim
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._buf[: self._size]
+
+    @property
+    def norms(self) -> np.ndarray:
+        return self._norms[: self._size]
+
+    @property
+    def live(self) -> np.ndarray:
+        return self._live[: self._size]
+
+    @property
+    def stamps(self) -> np.ndarray:
+        """Per-slot insertion (or last touch) counter; higher is newer."""
+        return self._stamps[: self._size]
+
+    def sort_slots(self, slots: np.ndarray) -> np.ndarray:
+        """Sort a subset of live slots from oldest to newest."""
+        return slots[np.argsort(self._stamps[slots], kind="stable")]
+
+    def _tick(self, slot: int):
+        self._clock += 1
+        self._stamps[slot] = self._clock
+
+    def order(self) -> np.ndarray:
+        """Live slots from oldest to newest."""
+        return np.fromiter(self._order, dtype=np.int64, count=len(self._order))
+
+    def oldest(self) -> Optional[int]:
+        return next(iter(self._order), None)
+
+    def _reserve(self, rows: int):
+        """Make room for `rows` more slots beyond `size`, doubling capacity."""
+        needed = self._size + rows
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, 2 * self.capacity)
+        if self.max_rows is not None:
+            capacity = max(needed, min(capacity, self.max_rows))
+        buf = np.zeros((capacity, self.dim), dtype=self.dtype)
+        buf[: self._size] = self._buf[: self._size]
+        live = np.zeros(capacity, dtype=bool)
+        live[: self._size] = self._live[: self._size]
+        norms = np.zeros(capacity, dtype=np.float32)
+        norms[: self._size] = self._norms[: self._size]
+        stamps = np.zeros(capacity, dtype=np.int64)
+        stamps[: self._size] = self._stamps[: self._size]
+        self._buf, self._live, self._norms, self._stamps = buf, live, norms, stamps
+
+    def _claim(self) -> Tuple[int, Optional[int]]:
+        """Pick the slot for the next row, evicting the oldest row if full."""
+        evicted = None
+        if self.max_rows is not None and len(self) >= self.max_rows:
+            evicted = self.popleft()
+        if self._free:
+            slot = self._free.pop()
+        else:
+            self._reserve(1)
+            slot = self._size
+            self._size += 1
+        return slot, evicted
+
+    def append(self, vector: np.ndarray) -> Tuple[int, Optional[int]]:
+        """
+        Store a row and return `(slot, evicted_slot)`.
+
+        `evicted_slot` is only set in ring-buffer mode when the oldest row had
+        to make room; it is then the same slot the new row went into.
+        """
+        slot, evicted = self._claim()
+        self._buf[slot] = encode_rows(vector, self.dtype)
+        self._update_norms(slot, slot + 1)
+        self._live[slot] = True
+        self._order[slot] = None
+        self._tick(slot)
+        return slot, evicted
+
+    def extend(self, vectors: np.ndarray) -> Tuple[List[int], List[int]]:
+        """
+        Store many rows, copying runs of fresh slots as one block.
+
+        Returns the slots the rows went into and the slots evicted to make room.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        slots, evicted = [], []
+        i = 0
+        while i < len(vectors):
+            room = len(vectors) - i
+            if self.max_rows is not None:
+                room = min(room, self.max_rows - len(self))
+            if self._free or room <= 0:
+                slot, dropped = self.append(vectors[i])
+                slots.append(slot)
+                if dropped is not None:
+                    evicted.append(dropped)
+                i += 1
+                continue
+            self._reserve(room)
+            start, stop = self._size, self._size + room
+            self._buf[start:stop] = encode_rows(vectors[i : i + room], self.dtype)
+            self._update_norms(start, stop)
+            self._live[start:stop] = True
+            self._order.update(dict.fromkeys(range(start, stop)))
+            self._stamps[start:stop] = np.arange(
+                self._clock + 1, self._clock + 1 + room
+            )
+            self._clock += room
+            self._size = stop
+            slots.extend(range(start, stop))
+            i += room
+        return slots, evicted
+
+    def release(self, slot: int):
+        """Drop a row; its slot is reused by a later append."""
+        if not self._live[slot]:
+            return
+        del self._order[slot]
+        self._live[slot] = False
+        self._buf[slot] = 0
+        self._norms[slot] = 0
+        self._free.append(slot)
+
+    def popleft(self) -> Optional[int]:
+        """Release the oldest row and return its slot."""
+        slot = self.oldest()
+        if slot is not None:
+            self.release(slot)
+        return slot
+
+    def touch(self, slot: int):
+        """Move a row to the newest end of the eviction order."""
+        self._order.move_to_end(slot)
+        self._tick(slot)
+
+    def set_max_rows(self, max_rows: Optional[int]) -> List[int]:
+        """Change the ring size, releasing the oldest rows that no longer fit."""
+        self.max_rows = max_rows
+        evicted = []
+        while max_rows is not None and len(self) > max_rows:
+            evicted.append(self.popleft())
+        if max_rows is not None and self._size <= max_rows < self.capacity:
+            self._buf = self._buf[:max_rows].copy()
+            self._live = self._live[:max_rows].copy()
+            self._norms = self._norms[:max_rows].copy()
+            self._stamps = self._stamps[:max_rows].copy()
+        return evicted
+
+    def cosine(
+        self, queries: np.ndarray, slots: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Score queries against every slot in one matrix product.
+
+        `queries` is (dim,) or (m, dim); the result is (size,) or (m, size),
+        with released slots scored -inf. Given `slots`, only those rows are
+        scored and the last axis follows `slots` instead.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        query_norms = np.linalg.norm(queries, axis=-1, keepdims=True)
+        if slots is None:
+            vectors, norms, live = self.vectors, self.norms, self.live
+        else:
+            vectors, norms, live = (
+                self._buf[slots],
+                self._norms[slots],
+                self._live[slots],
+            )
+        if vectors.dtype == np.float32:
+            scores = queries @ vectors.T
+        else:
+            scores = np.empty(queries.shape[:-1] + (len(vectors),), dtype=np.float32)
+            for start in range(0, len(vectors), BLOCK_ROWS):
+                block = vectors[start : start + BLOCK_ROWS].astype(np.float32)
+                scores[..., start : start + len(block)] = queries @ block.T
+        denom = query_norms * norms
+        np.divide(scores, denom, out=scores, where=denom > 0)
+        scores[..., ~live] = -np.inf
+        return scores
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores along the last axis, highest first.
+
+    Uses argpartition, so only the k winners get sorted: O(n + k log k).
+    """
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros(scores.shape[:-1] + (0,), dtype=np.int64)
+    if k < n:
+        idx = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        idx = np.broadcast_to(np.arange(n), scores.shape).copy()
+    best = np.take_along_axis(scores, idx, axis=-1)
+    return np.take_along_axis(idx, np.argsort(-best, axis=-1, kind="stable"), axis=-1)
@@ -0,0 +1,187 @@
+"""
+Copy memories from one backend to another without re-embedding them.
+
+    python -m autogpt.memory.migrate --from local --to redis
+    python -m autogpt.memory.migrate --from redis --from-index old \
+        --to redis --to-index new
+
+Records stream through in batches: each is read from the source with its
+vector and metadata, written to the target, and recorded in a checkpoint
+file, so an interrupted run picks up after the last batch written. Only
+one batch is held at a time besides whatever the source backend itself
+keeps in memory. Both backends take their settings from the environment,
+as Auto-GPT does; WIPE_REDIS_ON_START is ignored. A local target stops the
+run rather than evict memories once MEMORY_MAX_ITEMS or MEMORY_MAX_BYTES
+would be exceeded; raise them and run again to resume.
+"""
+
+import argparse
+import os
+import time
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+import orjson
+
+from autogpt.config import Config
+from autogpt.config.singleton import Singleton
+from autogpt.memory import LocalCache, MilvusMemory, PineconeMemory, RedisMemory
+from autogpt.memory.base import (
+    EXPORT_BATCH_SIZE,
+    MemoryProviderSingleton,
+    embedding_provider,
+)
+
+BACKENDS = {
+    "local": LocalCache,
+    "redis": RedisMemory,
+    "pinecone": PineconeMemory,
+    "milvus": MilvusMemory,
+}
+# The setting that names the index, collection or namespace of each backend
+INDEX_SETTINGS = {
+    "local": "memory_index",
+    "redis": "memory_index",
+    "pinecone": "pinecone_namespace",
+    "milvus": "milvus_collection",
+}
+
+
+def backend_config(cfg, backend: str, index: Optional[str] = None) -> SimpleNamespace:
+    """A copy of the config for one side of a migration, pointed at `index`."""
+    settings = dict(vars(cfg))
+    # Flushing the server on connect would wipe the very data being moved
+    settings["wipe_redis_on_start"] = False
+    if index:
+        settings[INDEX_SETTINGS[backend]] = index
+    return SimpleNamespace(**settings)
+
+
+def open_backend(backend: str, cfg) -> MemoryProviderSingleton:
+    """
+    A fresh instance of the backend. Memory providers are singletons, so the
+    previous instance is dropped first; a migration between two indexes of
+    one backend needs two.
+    """
+    provider = BACKENDS.get(backend)
+    if provider is None:
+        raise ValueError(f"The {backend} memory backend is unknown or not installed.")
+    Singleton._instances.pop(provider, None)
+    return provider(cfg)
+
+
+def read_checkpoint(path: str) -> dict:
+    try:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return {}
+
+
+def write_checkpoint(path: str, state: dict):
+    """Replace the checkpoint atomically, so a crash leaves the old one intact."""
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(orjson.dumps(state))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+
+
+def migrate(
+    source: MemoryProviderSingleton,
+    target: MemoryProviderSingleton,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    checkpoint: Optional[str] = None,
+    log: Callable[[str], None] = print,
+) -> int:
+    """
+    Stream every record of `source` into `target` and return how many were
+    copied in total, counting those of earlier runs resumed from `checkpoint`.
+
+    Raises:
+        ValueError: if the source's vectors don't fit the target's dimension,
+            or the target can't hold them all without evicting some (a
+            local target past its caps); the batches written before stay
+            checkpointed, so raising the caps and running again resumes
+    """
+    state = read_checkpoint(checkpoint) if checkpoint else {}
+    if state.get("done"):
+        log(f"Checkpoint {checkpoint} is of a finished migration; nothing to do.")
+        return state["migrated"]
+    cursor, migrated = state.get("cursor"), state.get("migrated", 0)
+    if cursor is not None:
+        log(f"Resuming after {migrated} records.")
+
+    copied, start = 0, time.perf_counter()
+    for records, cursor in source.export_records(cursor, batch_size):
+        for record in records:
+            if len(record["vector"]) != embedding_provider.dimension:
+                raise ValueError(
+                    f"The source holds {len(record['vector'])}-dimensional vectors but"
+                    f" {embedding_provider.model} makes {embedding_provider.dimension};"
+                    " set EMBEDDING_PROVIDER to the one that produced them."
+                )
+        target.import_records(records)
+        copied += len(records)
+        migrated += len(records)
+        if checkpoint:
+            write_checkpoint(checkpoint, {"cursor": cursor, "migrated": migrated})
+        elapsed = time.perf_counter() - start
+        log(
+            f"{migrated} records migrated ({copied / max(elapsed, 1e-9):.1f} records/s)"
+        )
+
+    if checkpoint:
+        write_checkpoint(
+            checkpoint, {"cursor": cursor, "migrated": migrated, "done": True}
+        )
+    return migrated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--from", dest="source", required=True, choices=sorted(BACKENDS)
+    )
+    parser.add_argument("--to", dest="target", required=True, choices=sorted(BACKENDS))
+    parser.add_argument("--from-index", help="source index, collection or namespace")
+    parser.add_argument("--to-index", help="target index, collection or namespace")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    parser.add_argument(
+        "--checkpoint",
+        help="resume file; defaults to one named after the source and target",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore the checkpoint and start over"
+    )
+    args = parser.parse_args()
+
+    cfg = Config()
+    source_cfg = backend_config(cfg, args.source, args.from_index)
+    target_cfg = backend_config(cfg, args.target, args.to_index)
+    source_index = getattr(source_cfg, INDEX_SETTINGS[args.source])
+    target_index = getattr(target_cfg, INDEX_SETTINGS[args.target])
+    if (args.source, source_index) == (args.target, target_index):
+        parser.error("the source and the target are the same index")
+    checkpoint = args.checkpoint or (
+        f"migrate-{args.source}-{os.path.basename(source_index or 'default')}"
+        f"-to-{args.target}-{os.path.basename(target_index or 'default')}.json"
+    )
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    source = open_backend(args.source, source_cfg)
+    target = open_backend(args.target, target_cfg)
+    start = time.perf_counter()
+    try:
+        migrated = migrate(source, target, args.batch_size, checkpoint)
+    finally:
+        for memory in (source, target):
+            close = getattr(memory, "close", None)
+            if close is not None:
+                close()
+    print(f"Done: {migrated} records in {time.perf_counter() - start:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
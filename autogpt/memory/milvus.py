@@ -0,0 +1,378 @@
+"""Milvus memory provider."""
+
+import json
+import threading
+import time
+from typing import List, Optional
+
+from pymilvus import (
+    Collection,
+    CollectionSchema,
+    DataType,
+    FieldSchema,
+    MilvusException,
+    connections,
+    utility,
+)
+
+from autogpt.memory.base import (
+    EXPORT_BATCH_SIZE,
+    MemoryProviderSingleton,
+    embedding_provider,
+    get_ada_embedding,
+    get_ada_embeddings,
+    get_query_embedding,
+)
+
+# Rows sent per insert request by add_many
+INSERT_BATCH = 1000
+# Tags kept per entry, and the longest tag or task id stored
+MAX_TAGS = 32
+MAX_TAG_LENGTH = 256
+# Build-time HNSW candidate list; the search-time one is MILVUS_HNSW_EF
+HNSW_EF_CONSTRUCTION = 200
+# Milvus Lite (a local .db file) builds only these and ignores the rest
+LITE_INDEX_TYPES = {"FLAT", "IVF_FLAT", "AUTOINDEX"}
+
+
+def is_lite(address: str) -> bool:
+    """Whether MILVUS_ADDR names a Milvus Lite database file rather than a server."""
+    return address.endswith(".db")
+
+
+def pq_segments(dimension: int) -> int:
+    """IVF_PQ sub-vector count: 8 dimensions per code where the dimension allows."""
+    for width in (8, 4, 2):
+        if dimension % width == 0:
+            return dimension // width
+    return dimension
+
+
+def index_params(index_type: str, cfg) -> dict:
+    """
+    create_index parameters for the embeddings field; the index type comes
+    from MILVUS_INDEX_TYPE and its build settings from MILVUS_HNSW_M /
+    MILVUS_NLIST.
+    """
+    if index_type == "HNSW":
+        params = {
+            "M": int(getattr(cfg, "milvus_hnsw_m", 16)),
+            "efConstruction": HNSW_EF_CONSTRUCTION,
+        }
+    elif index_type == "IVF_FLAT":
+        params = {"nlist": int(getattr(cfg, "milvus_nlist", 128))}
+    elif index_type == "IVF_PQ":
+        params = {
+            "nlist": int(getattr(cfg, "milvus_nlist", 128)),
+            "m": pq_segments(embedding_provider.dimension),
+            "nbits": 8,
+        }
+    else:
+        params = {}
+    return {"index_type": index_type, "metric_type": "IP", "params": params}
+
+
+def search_params(index_type: str, cfg, num_relevant: int) -> dict:
+    """Search parameters: MILVUS_HNSW_EF for HNSW, MILVUS_NPROBE for IVF indexes."""
+    if index_type == "HNSW":
+        # HNSW rejects an ef below the number of results asked for
+        params = {"ef": max(int(getattr(cfg, "milvus_hnsw_ef", 64)), num_relevant)}
+    elif index_type.startswith("IVF"):
+        params = {"nprobe": int(getattr(cfg, "milvus_nprobe", 8))}
+    else:
+        params = {}
+    return {"metric_type": "IP", "params": params}
+
+
+def filter_expr(
+    tags: List[str] = None, match_all: bool = False, since: float = None
+) -> str:
+    """
+    Boolean expression restricting a search to entries carrying any of the
+    tags (every one with `match_all`) and added at or after `since`, or "".
+    """
+    clauses = []
+    if tags:
+        function = "array_contains_all" if match_all else "array_contains_any"
+        clauses.append(f"{function}(tags, {json.dumps(list(tags))})")
+    if since is not None:
+        clauses.append(f"timestamp >= {float(since)}")
+    return " and ".join(clauses)
+
+
+class MilvusMemory(MemoryProviderSingleton):
+    def __init__(self, cfg):
+        """Construct a milvus memory storage connection.
+
+        MILVUS_ADDR is either a server address (host:port) or the path of a
+        Milvus Lite database file ending in .db.
+
+        Args:
+            cfg (Config): Auto-GPT global config.
+        """
+        self.cfg = cfg
+        self.lite = is_lite(cfg.milvus_addr)
+        # connect to milvus server, or start milvus lite on the file.
+        if self.lite:
+            connections.connect(uri=cfg.milvus_addr)
+        else:
+            connections.connect(address=cfg.milvus_addr)
+
+        self.index_type = getattr(cfg, "milvus_index_type", "HNSW").upper()
+        if self.lite and self.index_type not in LITE_INDEX_TYPES:
+            print(
+                f"Warning: Milvus Lite cannot build {self.index_type} indexes."
+                " Using FLAT instead."
+            )
+            self.index_type = "FLAT"
+        self.consistency_level = getattr(cfg, "milvus_consistency", "Bounded")
+        # 0 leaves flushing to the server's own segment sealing policy
+        self.flush_every = int(getattr(cfg, "milvus_flush_every", 0))
+        self._unflushed = 0
+        self._flush_lock = threading.Lock()
+        self._init_collection()
+
+    def _init_collection(self):
+        """Create the collection and its index if missing, and load it."""
+        fields = [
+            FieldSchema(name="pk", dtype=DataType.INT64, is_primary=True, auto_id=True),
+            FieldSchema(
+                name="embeddings",
+                dtype=DataType.FLOAT_VECTOR,
+                dim=embedding_provider.dimension,
+            ),
+            FieldSchema(name="raw_text", dtype=DataType.VARCHAR, max_length=65535),
+            FieldSchema(
+                name="tags",
+                dtype=DataType.ARRAY,
+                element_type=DataType.VARCHAR,
+                max_capacity=MAX_TAGS,
+                max_length=MAX_TAG_LENGTH,
+            ),
+            FieldSchema(
+                name="task_id", dtype=DataType.VARCHAR, max_length=MAX_TAG_LENGTH
+            ),
+            FieldSchema(name="timestamp", dtype=DataType.DOUBLE),
+        ]
+
+        # create collection if not exist and load it.
+        schema = CollectionSchema(fields, "auto-gpt memory storage")
+        # the level given at creation is only a default; searches pass their own.
+        settings = {}
+        if not utility.has_collection(self.cfg.milvus_collection):
+            settings["consistency_level"] = self.consistency_level
+        try:
+            self.collection = Collection(self.cfg.milvus_collection, schema, **settings)
+        except MilvusException:
+            print(
+                f"Error: the Milvus collection {self.cfg.milvus_collection} was created"
+                " without the tags, task_id and timestamp fields. Set MILVUS_COLLECTION"
+                " to a new name to start a memory with them."
+            )
+            raise
+
+        # rebuild the index when MILVUS_INDEX_TYPE changed since it was built.
+        current = next(
+            (
+                index
+                for index in self.collection.indexes
+                if index.field_name == "embeddings"
+            ),
+            None,
+        )
+        if current is not None and current.params.get("index_type") != self.index_type:
+            self.collection.release()
+            self.collection.drop_index(index_name="embeddings")
+            current = None
+        if current is None:
+            self.collection.create_index(
+                "embeddings",
+                index_params(self.index_type, self.cfg),
+                index_name="embeddings",
+            )
+        self.collection.load()
+
+    def add(self, data, tags=None, task_id=None, touch=False):
+        """Add a embedding of data into memory.
+
+        Args:
+            data (str): The raw text to construct embedding index.
+            tags (list[str], optional): Tags to filter searches by.
+            task_id (str, optional): Identifier of the task the text belongs to.
+            touch (bool, optional): Accepted for compatibility with the local
+                backend; a repeated text is inserted again.
+
+        Returns:
+            str: log.
+        """
+        return self.add_many([data], tags, task_id=task_id)[0]
+
+    def add_many(self, texts, tags=None, touch=False, task_id=None):
+        """Add the embeddings of several texts with one embedding request and
+        inserts of up to INSERT_BATCH rows.
+
+        Args:
+            texts (list[str]): The raw texts to construct embedding index.
+            tags (list[str], optional): Tags stored with every text.
+            touch (bool, optional): See `add`.
+            task_id (str, optional): Task identifier stored with every text.
+
+        Returns:
+            list[str]: log per text.
+        """
+        if not texts:
+            return []
+        if len(texts) == 1:
+            embeddings = [get_ada_embedding(texts[0])]
+        else:
+            embeddings = get_ada_embeddings(texts)
+        now = time.time()
+        primary_keys = self._insert(
+            [
+                {
+                    "text": data,
+                    "vector": vector,
+                    "tags": tags,
+                    "task_id": task_id,
+                    "timestamp": now,
+                }
+                for data, vector in zip(texts, embeddings)
+            ]
+        )
+        return [
+            f"Inserting data into memory at primary key: {pk}:\n data: {data}"
+            for pk, data in zip(primary_keys, texts)
+        ]
+
+    def _insert(self, records):
+        """Insert records shaped like those of `export_records`, INSERT_BATCH
+        rows per request, and return their primary keys.
+        """
+        primary_keys = []
+        for start in range(0, len(records), INSERT_BATCH):
+            chunk = records[start : start + INSERT_BATCH]
+            result = self.collection.insert(
+                [
+                    [list(record["vector"]) for record in chunk],
+                    [record["text"] for record in chunk],
+                    [
+                        [str(tag)[:MAX_TAG_LENGTH] for tag in record.get("tags") or []][
+                            :MAX_TAGS
+                        ]
+                        for record in chunk
+                    ],
+                    [
+                        (record.get("task_id") or "")[:MAX_TAG_LENGTH]
+                        for record in chunk
+                    ],
+                    [float(record["timestamp"]) for record in chunk],
+                ]
+            )
+            primary_keys.extend(result.primary_keys)
+        self._count_unflushed(len(records))
+        return primary_keys
+
+    def export_records(self, cursor=None, batch_size=EXPORT_BATCH_SIZE):
+        """Stream the collection's rows in primary key order, see
+        `MemoryProviderSingleton.export_records`. The cursor is the last
+        primary key exported.
+        """
+        iterator = self.collection.query_iterator(
+            batch_size=batch_size,
+            expr=f"pk > {int(cursor)}" if cursor is not None else "",
+            output_fields=[
+                "pk",
+                "embeddings",
+                "raw_text",
+                "tags",
+                "task_id",
+                "timestamp",
+            ],
+            consistency_level=self.consistency_level,
+        )
+        try:
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    return
+                yield [
+                    {
+                        "text": row["raw_text"],
+                        "vector": [float(value) for value in row["embeddings"]],
+                        "tags": list(row["tags"]),
+                        "task_id": row["task_id"] or None,
+                        "timestamp": row["timestamp"],
+                    }
+                    for row in rows
+                ], max(row["pk"] for row in rows)
+        finally:
+            iterator.close()
+
+    def import_records(self, records):
+        """Insert exported records with their vectors.
+
+        Returns:
+            int: the number of records inserted.
+        """
+        return len(self._insert(records)) if records else 0
+
+    def _count_unflushed(self, count):
+        """Flush once MILVUS_FLUSH_EVERY rows were inserted since the last flush."""
+        if not self.flush_every:
+            return
+        with self._flush_lock:
+            self._unflushed += count
+            if self._unflushed < self.flush_every:
+                return
+            self._unflushed = 0
+        self.collection.flush()
+
+    def get(self, data):
+        """Return the most relevant data in memory.
+        Args:
+            data: The data to compare to.
+        """
+        return self.get_relevant(data, 1)
+
+    def clear(self):
+        """Drop the collection and start an empty one in its place."""
+        self.collection.drop()
+        self._unflushed = 0
+        self._init_collection()
+        return "Obliviated"
+
+    def get_relevant(
+        self,
+        data,
+        num_relevant=5,
+        tags=None,
+        match_all=False,
+        since: Optional[float] = None,
+    ):
+        """Return the top-k relevant data in memory.
+        Args:
+            data: The data to compare to.
+            num_relevant (int, optional): The max number of relevant data.
+                Defaults to 5.
+            tags (list[str], optional): Only search texts carrying any of these tags.
+            match_all (bool, optional): Require every tag instead of any.
+            since (float, optional): Only search texts added at or after this UNIX time.
+        """
+        # search the embedding and return the most relevant text.
+        embedding = get_query_embedding(data)
+        result = self.collection.search(
+            [list(embedding)],
+            "embeddings",
+            search_params(self.index_type, self.cfg, num_relevant),
+            num_relevant,
+            expr=filter_expr(tags, match_all, since) or None,
+            output_fields=["raw_text"],
+            consistency_level=self.consistency_level,
+        )
+        return [item.entity.get("raw_text") for item in result[0]]
+
+    def get_stats(self):
+        """
+        Returns: The stats of the milvus cache.
+        """
+        return f"Entities num: {self.collection.num_entities}"
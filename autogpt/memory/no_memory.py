@@ -1,5 +1,6 @@
 """A class that does not store any data. This is the default memory provider."""
-from typing import Optional, List, Any
+
+from typing import Any, List, Optional
 
 from autogpt.memory.base import MemoryProviderSingleton
 
@@ -31,6 +32,18 @@ class NoMemory(MemoryProviderSingleton):
         """
         return ""
 
+    def add_many(self, texts: List[str], tags: List[str] = None) -> List[str]:
+        """
+        Adds several data points to the memory. No action is taken in NoMemory.
+
+        Args:
+            texts: The data to add.
+            tags: Tags for the data.
+
+        Returns: An empty string per data point.
+        """
+        return [""] * len(texts)
+
     def get(self, data: str) -> Optional[List[Any]]:
         """
         Gets the data from the memory that is most relevant to the given data.
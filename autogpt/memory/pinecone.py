@@ -1,74 +1,218 @@
+import hashlib
+import time
+from datetime import datetime
+from typing import List, Optional
+
 import pinecone
 from colorama import Fore, Style
 
 from autogpt.logs import logger
-from autogpt.memory.base import MemoryProviderSingleton, get_ada_embedding
+from autogpt.memory.base import (
+    MemoryProviderSingleton,
+    embedding_provider,
+    get_ada_embedding,
+    get_ada_embeddings,
+    get_query_embedding,
+)
+from autogpt.memory.pinecone_client import PineconeIndexClient
+
+
+def vector_id(text: str) -> str:
+    """Id of a memory: a hash of its text, so storing it again overwrites it."""
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()[:32]
+
+
+def metadata_filter(
+    tags: List[str] = None, match_all: bool = False, since: float = None
+):
+    """
+    Pinecone metadata filter for tags and a minimum timestamp, or None.
+
+    Entries must carry any of the tags, or every one with `match_all`.
+    """
+    clauses = []
+    if tags:
+        if match_all:
+            clauses.extend({"tags": {"$in": [tag]}} for tag in tags)
+        else:
+            clauses.append({"tags": {"$in": list(tags)}})
+    if since is not None:
+        clauses.append({"timestamp": {"$gte": since}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
 
 
 class PineconeMemory(MemoryProviderSingleton):
     def __init__(self, cfg):
         pinecone_api_key = cfg.pinecone_api_key
         pinecone_region = cfg.pinecone_region
-        pinecone.init(api_key=pinecone_api_key, environment=pinecone_region)
-        dimension = 1536
+        dimension = embedding_provider.dimension
         metric = "cosine"
         pod_type = "p1"
         table_name = "auto-gpt"
-        # this assumes we don't start with memory.
-        # for now this works.
-        # we'll need a more complicated and robust system if we want to start with
-        #  memory.
-        self.vec_num = 0
-
-        try:
-            pinecone.whoami()
-        except Exception as e:
-            logger.typewriter_log(
-                "FAILED TO CONNECT TO PINECONE",
-                Fore.RED,
-                Style.BRIGHT + str(e) + Style.RESET_ALL,
-            )
-            logger.double_check(
-                "Please ensure you have setup and configured Pinecone properly for use."
-                + f"You can check out {Fore.CYAN + Style.BRIGHT}"
-                "https://github.com/Torantulino/Auto-GPT#-pinecone-api-key-setup"
-                f"{Style.RESET_ALL} to ensure you've set up everything correctly."
+        # PINECONE_NAMESPACE may hold {session}, which becomes this run's start
+        # time, so every run writes to and clears only its own namespace
+        self.namespace = getattr(cfg, "pinecone_namespace", "").replace(
+            "{session}", datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        )
+        host = getattr(cfg, "pinecone_host", "")
+
+        # With PINECONE_HOST the index is used as is, without the control plane
+        if not host:
+            pinecone.init(api_key=pinecone_api_key, environment=pinecone_region)
+            try:
+                pinecone.whoami()
+            except Exception as e:
+                logger.typewriter_log(
+                    "FAILED TO CONNECT TO PINECONE",
+                    Fore.RED,
+                    Style.BRIGHT + str(e) + Style.RESET_ALL,
+                )
+                logger.double_check(
+                    "Please ensure you have setup and configured Pinecone properly"
+                    " for use." + f"You can check out {Fore.CYAN + Style.BRIGHT}"
+                    "https://github.com/Torantulino/Auto-GPT#-pinecone-api-key-setup"
+                    f"{Style.RESET_ALL} to ensure you've set up everything correctly."
+                )
+                exit(1)
+
+            if table_name not in pinecone.list_indexes():
+                pinecone.create_index(
+                    table_name, dimension=dimension, metric=metric, pod_type=pod_type
+                )
+            host = (
+                f"https://{table_name}-{pinecone.Config.PROJECT_NAME}"
+                f".svc.{pinecone_region}.pinecone.io"
             )
-            exit(1)
+        self.index = PineconeIndexClient(
+            host,
+            pinecone_api_key,
+            concurrency=int(getattr(cfg, "pinecone_concurrency", 4)),
+        )
 
-        if table_name not in pinecone.list_indexes():
-            pinecone.create_index(
-                table_name, dimension=dimension, metric=metric, pod_type=pod_type
+    def add(self, text, tags=None, task_id=None, touch=False):
+        """
+        Adds a text to the memory.
+        :param text: The text to add.
+        :param tags: Tags stored in the metadata, to filter queries by.
+        :param task_id: Identifier of the task the text belongs to.
+        :param touch: Accepted for compatibility with the local backend; a
+            repeated text is always upserted again with a fresh timestamp.
+        """
+        return self.add_many([text], tags, task_id=task_id)[0]
+
+    def add_many(self, texts, tags=None, touch=False, task_id=None):
+        """
+        Adds several texts with one embedding request and upserts of 100
+        vectors sent side by side.
+        :param texts: The texts to add.
+        :param tags: Tags stored in the metadata of every vector.
+        :param touch: See `add`.
+        :param task_id: Task identifier stored in the metadata of every vector.
+        """
+        if not texts:
+            return []
+        if len(texts) == 1:
+            vectors = [get_ada_embedding(texts[0])]
+        else:
+            vectors = get_ada_embeddings(texts)
+        now = time.time()
+        self._upsert(
+            [
+                {
+                    "text": data,
+                    "vector": vector,
+                    "tags": tags,
+                    "task_id": task_id,
+                    "timestamp": now,
+                }
+                for data, vector in zip(texts, vectors)
+            ]
+        )
+        return [
+            f"Inserting data into memory at index: {vector_id(data)}:\n data: {data}"
+            for data in texts
+        ]
+
+    def _upsert(self, records):
+        """Upsert records shaped like those of `export_records`, keyed by content."""
+        items = []
+        for record in records:
+            metadata = {"raw_text": record["text"], "timestamp": record["timestamp"]}
+            if record.get("tags"):
+                metadata["tags"] = list(record["tags"])
+            if record.get("task_id"):
+                metadata["task_id"] = record["task_id"]
+            items.append(
+                {
+                    "id": vector_id(record["text"]),
+                    "values": list(record["vector"]),
+                    "metadata": metadata,
+                }
             )
-        self.index = pinecone.Index(table_name)
+        self.index.upsert(items, self.namespace)
 
-    def add(self, data):
-        vector = get_ada_embedding(data)
-        # no metadata here. We may wish to change that long term.
-        self.index.upsert([(str(self.vec_num), vector, {"raw_text": data})])
-        _text = f"Inserting data into memory at index: {self.vec_num}:\n data: {data}"
-        self.vec_num += 1
-        return _text
+    def import_records(self, records):
+        """
+        Upsert exported records with their vectors. The index can't be listed
+        through its data plane, so it can be migrated to but not from.
+        """
+        if records:
+            self._upsert(records)
+        return len(records)
 
     def get(self, data):
         return self.get_relevant(data, 1)
 
     def clear(self):
-        self.index.delete(deleteAll=True)
+        self.index.delete_all(self.namespace)
         return "Obliviated"
 
-    def get_relevant(self, data, num_relevant=5):
+    def get_relevant(
+        self,
+        data,
+        num_relevant=5,
+        tags=None,
+        match_all=False,
+        since: Optional[float] = None,
+    ):
         """
         Returns all the data in the memory that is relevant to the given data.
         :param data: The data to compare to.
         :param num_relevant: The number of relevant data to return. Defaults to 5
+        :param tags: Only rank texts carrying any of these tags.
+        :param match_all: Require every tag instead of any.
+        :param since: Only rank texts added at or after this UNIX time.
+        """
+        return self.get_relevant_many([data], num_relevant, tags, match_all, since)[0]
+
+    def get_relevant_many(
+        self,
+        texts,
+        num_relevant=5,
+        tags=None,
+        match_all=False,
+        since: Optional[float] = None,
+    ):
+        """
+        Returns the relevant data for each of several texts; the queries run
+        side by side on the client's pool.
         """
-        query_embedding = get_ada_embedding(data)
-        results = self.index.query(
-            query_embedding, top_k=num_relevant, include_metadata=True
+        queries = [get_query_embedding(text) for text in texts]
+        results = self.index.query_many(
+            queries,
+            num_relevant,
+            self.namespace,
+            metadata_filter(tags, match_all, since),
         )
-        sorted_results = sorted(results.matches, key=lambda x: x.score)
-        return [str(item["metadata"]["raw_text"]) for item in sorted_results]
+        return [
+            [
+                str(item["metadata"]["raw_text"])
+                for item in sorted(matches, key=lambda x: x["score"])
+            ]
+            for matches in results
+        ]
 
     def get_stats(self):
         return self.index.describe_index_stats()
@@ -0,0 +1,98 @@
+"""Minimal client for the data plane of a Pinecone index, over its REST API."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Vectors per upsert request; Pinecone recommends batches of 100
+UPSERT_BATCH = 100
+
+
+class PineconeIndexClient:
+    """
+    Talks to one index at `host`, e.g.
+    https://auto-gpt-abc123.svc.us-west1-gcp.pinecone.io.
+
+    Requests go through one pooled HTTP session, and `concurrency` of them can
+    be in flight: `upsert` sends its batches side by side and `query_many`
+    runs its queries side by side. Any server that speaks the same JSON, such
+    as a local stand-in for tests, works as the host.
+    """
+
+    def __init__(
+        self, host: str, api_key: str = "", concurrency: int = 4, timeout: float = 30.0
+    ) -> None:
+        self.host = host.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(
+            {"Api-Key": api_key or "", "Accept": "application/json"}
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(concurrency, thread_name_prefix="pinecone")
+
+    def _post(self, path: str, body: dict) -> dict:
+        response = self.session.post(
+            f"{self.host}{path}", json=body, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    def upsert(self, vectors: List[dict], namespace: str = "") -> int:
+        """
+        Insert or overwrite vectors, given as {"id", "values", "metadata"}.
+
+        Returns the number of vectors the server reports as upserted.
+        """
+        batches = [
+            {"vectors": vectors[start : start + UPSERT_BATCH], "namespace": namespace}
+            for start in range(0, len(vectors), UPSERT_BATCH)
+        ]
+        responses = self.pool.map(
+            lambda body: self._post("/vectors/upsert", body), batches
+        )
+        return sum(response.get("upsertedCount", 0) for response in responses)
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[dict]:
+        """The `top_k` nearest matches, as {"id", "score", "metadata"}, best first."""
+        body = {
+            "vector": list(vector),
+            "topK": top_k,
+            "includeMetadata": True,
+            "namespace": namespace,
+        }
+        if filter:
+            body["filter"] = filter
+        return self._post("/query", body).get("matches", [])
+
+    def query_many(
+        self,
+        vectors: List[List[float]],
+        top_k: int,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[List[dict]]:
+        """Run several queries side by side; one list of matches per vector."""
+        return list(
+            self.pool.map(lambda v: self.query(v, top_k, namespace, filter), vectors)
+        )
+
+    def delete_all(self, namespace: str = ""):
+        self._post("/vectors/delete", {"deleteAll": True, "namespace": namespace})
+
+    def describe_index_stats(self) -> dict:
+        return self._post("/describe_index_stats", {})
+
+    def close(self):
+        self.pool.shutdown()
+        self.session.close()
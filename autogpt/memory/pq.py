@@ -0,0 +1,172 @@
+"""Product quantization index for the local memory backend."""
+
+from typing import Optional
+
+import numpy as np
+
+from autogpt.memory.ivf import _normalize
+from autogpt.memory.matrix import EmbeddingMatrix, top_k
+
+# Centroids per subspace, so that every code fits in one byte
+CODEBOOK_SIZE = 256
+
+
+def kmeans(
+    vectors: np.ndarray, k: int, iterations: int = 8, seed: int = 0
+) -> np.ndarray:
+    """
+    Cluster vectors by euclidean distance and return k centroids.
+
+    Same Lloyd loop as `spherical_kmeans`, minus the normalization: the
+    sub-vectors of a product quantizer are not unit length.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(vectors, centroids)
+        order = np.argsort(assign, kind="stable")
+        sorted_assign = assign[order]
+        starts = np.flatnonzero(np.r_[True, sorted_assign[1:] != sorted_assign[:-1]])
+        sums = np.add.reduceat(vectors[order], starts, axis=0)
+        counts = np.diff(np.r_[starts, len(vectors)])
+        centroids[sorted_assign[starts]] = sums / counts[:, np.newaxis]
+    return centroids
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of each vector's nearest centroid; |v|^2 is the same for all of them."""
+    distances = vectors @ centroids.T
+    distances *= -2
+    distances += (centroids**2).sum(axis=1)
+    return np.argmin(distances, axis=1)
+
+
+class PQIndex:
+    """
+    Product-quantized codes for every slot, scanned with lookup tables.
+
+    Each unit-normalized vector is cut into `subspaces` chunks and every chunk
+    is replaced by the id of its nearest of 256 trained centroids, so a
+    1536-dim float32 row (6 KB) becomes 96 one-byte codes. A query computes,
+    per subspace, its dot product with every centroid once (asymmetric
+    distance computation); a row's score is then the sum of the table entries
+    its codes point at, without decoding it. The `rerank` best candidates go
+    back to the caller to be scored exactly against the stored rows.
+
+    Like IVFIndex, the codebooks are retrained whenever the store has grown
+    by `retrain_factor`, and rebuilt from the rows on load.
+    """
+
+    def __init__(
+        self,
+        subspaces: int = 96,
+        rerank: int = 400,
+        min_train_rows: int = 4096,
+        retrain_factor: float = 2.0,
+        seed: int = 0,
+    ) -> None:
+        self.subspaces = subspaces
+        self.rerank = rerank
+        self.min_train_rows = min_train_rows
+        self.retrain_factor = retrain_factor
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        # (subspaces, CODEBOOK_SIZE, dim // subspaces) centroids
+        self.codebooks: Optional[np.ndarray] = None
+        self.trained_rows = 0
+        # One row of codes per subspace, so each scan step reads contiguous bytes
+        self._codes = np.zeros((1, 16), dtype=np.uint8)
+        self._coded = np.zeros(16, dtype=bool)
+
+    @property
+    def trained(self) -> bool:
+        return self.codebooks is not None
+
+    @property
+    def code_bytes(self) -> int:
+        """Bytes of code per stored row."""
+        return 0 if self.codebooks is None else len(self.codebooks)
+
+    def needs_training(self, rows: int) -> bool:
+        if rows < self.min_train_rows:
+            return False
+        return not self.trained or rows >= self.retrain_factor * self.trained_rows
+
+    def train(self, matrix: EmbeddingMatrix):
+        """Fit a codebook per subspace on a sample of live rows, then encode all."""
+        slots = np.flatnonzero(matrix.live)
+        # Subspaces must split the dimensions evenly
+        subspaces = max(1, min(self.subspaces, matrix.dim))
+        while matrix.dim % subspaces:
+            subspaces -= 1
+        rng = np.random.default_rng(self.seed)
+        sample = slots
+        if len(slots) > 32 * CODEBOOK_SIZE:
+            sample = rng.choice(slots, size=32 * CODEBOOK_SIZE, replace=False)
+        rows = _normalize(matrix.rows(sample)).reshape(len(sample), subspaces, -1)
+        size = min(CODEBOOK_SIZE, len(sample))
+        codebooks = np.stack(
+            [
+                kmeans(np.ascontiguousarray(rows[:, j]), size, seed=self.seed + j)
+                for j in range(subspaces)
+            ]
+        )
+
+        self.reset()
+        self.codebooks = codebooks
+        self.trained_rows = len(slots)
+        self._grow_slots(matrix.capacity)
+        for start in range(0, len(slots), 1024):  # bound the distance tables' memory
+            chunk = slots[start : start + 1024]
+            self._codes[:, chunk] = self._encode(matrix.rows(chunk)).T
+            self._coded[chunk] = True
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = _normalize(vectors).reshape(len(vectors), len(self.codebooks), -1)
+        codes = np.empty(vectors.shape[:2], dtype=np.uint8)
+        for j, codebook in enumerate(self.codebooks):
+            codes[:, j] = _nearest(np.ascontiguousarray(vectors[:, j]), codebook)
+        return codes
+
+    def _grow_slots(self, capacity: int):
+        width = len(self.codebooks)
+        if capacity <= len(self._coded) and len(self._codes) == width:
+            return
+        capacity = max(capacity, 2 * len(self._coded))
+        codes = np.zeros((width, capacity), dtype=np.uint8)
+        if len(self._codes) == width:
+            codes[:, : len(self._coded)] = self._codes
+        coded = np.zeros(capacity, dtype=bool)
+        coded[: len(self._coded)] = self._coded
+        self._codes, self._coded = codes, coded
+
+    def add(self, slot: int, vector: np.ndarray):
+        if not self.trained:
+            return
+        self._grow_slots(slot + 1)
+        self._codes[:, slot] = self._encode(vector[np.newaxis, :])[0]
+        self._coded[slot] = True
+
+    def remove(self, slot: int):
+        if slot < len(self._coded):
+            self._coded[slot] = False
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate cosine of the query with every coded slot; -inf elsewhere."""
+        query = _normalize(np.asarray(query, dtype=np.float32)).reshape(
+            len(self.codebooks), -1
+        )
+        tables = np.einsum("mkd,md->mk", self.codebooks, query)
+        scores = np.zeros(len(self._coded), dtype=np.float32)
+        for table, codes in zip(tables, self._codes):
+            scores += np.take(table, codes)
+        scores[~self._coded] = -np.inf
+        return scores
+
+    def candidates(self, query: np.ndarray, count: Optional[int] = None) -> np.ndarray:
+        """The `count` (default `rerank`) slots with the best approximate scores."""
+        scores = self.scores(query)
+        count = min(count or self.rerank, int(self._coded.sum()))
+        return top_k(scores, count)
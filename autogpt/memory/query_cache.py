@@ -0,0 +1,62 @@
+"""In-process LRU cache of query embeddings."""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+from autogpt.memory.embedding_cache import embedding_key
+
+
+class QueryEmbeddingCache:
+    """
+    Maps a hash of (model, query text) to its embedding, least recently used
+    first out.
+
+    The agent retrieves memories with the last few messages as the query, so
+    consecutive turns often ask with the very same text; those repeats are
+    answered from here instead of another embeddings request. The embedding
+    itself is computed outside the lock, so a slow request doesn't hold up
+    lookups from other threads.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, model: str, text: str, embed: Callable[[str], List[float]]
+    ) -> List[float]:
+        """Return the cached embedding of `text`, calling `embed(text)` on a miss."""
+        if self.max_entries <= 0:
+            return embed(text)
+        key = embedding_key(model, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(vector)
+            self.misses += 1
+        vector = list(embed(text))
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return list(vector)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
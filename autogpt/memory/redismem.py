@@ -1,24 +1,111 @@
 """Redis memory provider."""
-from typing import Any, List, Optional
+
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import redis
 from colorama import Fore, Style
-from redis.commands.search.field import TextField, VectorField
+from redis.commands.search.field import NumericField, TagField, TextField, VectorField
 from redis.commands.search.indexDefinition import IndexDefinition, IndexType
 from redis.commands.search.query import Query
 
 from autogpt.logs import logger
-from autogpt.memory.base import MemoryProviderSingleton, get_ada_embedding
-
-SCHEMA = [
-    TextField("data"),
-    VectorField(
-        "embedding",
-        "HNSW",
-        {"TYPE": "FLOAT32", "DIM": 1536, "DISTANCE_METRIC": "COSINE"},
-    ),
+from autogpt.memory.base import (
+    EXPORT_BATCH_SIZE,
+    MemoryProviderSingleton,
+    embedding_provider,
+    get_ada_embedding,
+    get_ada_embeddings,
+    get_query_embedding,
+)
+
+# Filter fields, also added to indexes created before they existed
+FILTER_FIELDS = [
+    TagField("tags", separator=","),
+    TagField("task_id"),
+    NumericField("timestamp", sortable=True),
 ]
+# HSETs sent per pipeline round trip by add_many
+PIPELINE_CHUNK = 1000
+# Entries fetched per round trip by search
+SEARCH_PAGE = 1000
+
+
+def build_schema(cfg) -> list:
+    """
+    Index fields; the HNSW graph settings come from REDIS_HNSW_M /
+    REDIS_HNSW_EF_RUNTIME.
+    """
+    return [
+        TextField("data"),
+        *FILTER_FIELDS,
+        VectorField(
+            "embedding",
+            "HNSW",
+            {
+                "TYPE": "FLOAT32",
+                "DIM": embedding_provider.dimension,
+                "DISTANCE_METRIC": "COSINE",
+                "M": int(getattr(cfg, "redis_hnsw_m", 16)),
+                "EF_RUNTIME": int(getattr(cfg, "redis_hnsw_ef_runtime", 10)),
+            },
+        ),
+    ]
+
+
+def _escape_tag(tag: str) -> str:
+    """
+    Backslash the punctuation RediSearch would read as query syntax, as in
+    `in\\-progress`.
+    """
+    return re.sub(r"(\W)", r"\\\1", tag)
+
+
+def filter_clause(
+    tags: List[str] = None, match_all: bool = False, since: float = None
+) -> str:
+    """
+    RediSearch pre-filter for tags and a minimum timestamp; `*` matches all.
+
+    Entries must carry any of the tags, or every one with `match_all`.
+    """
+    clauses = []
+    if tags:
+        escaped = [_escape_tag(tag) for tag in tags]
+        if match_all:
+            clauses.extend(f"@tags:{{{tag}}}" for tag in escaped)
+        else:
+            clauses.append(f"@tags:{{{' | '.join(escaped)}}}")
+    if since is not None:
+        clauses.append(f"@timestamp:[{since} +inf]")
+    return f"({' '.join(clauses)})" if clauses else "*"
+
+
+_pools: Dict[Tuple[str, int, str], redis.ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(cfg) -> redis.ConnectionPool:
+    """
+    The connection pool for the configured server, created on first use.
+
+    Every client of the same server shares it, so connections are reused
+    across memory instances and threads instead of opened per client.
+    """
+    key = (cfg.redis_host, int(cfg.redis_port), cfg.redis_password)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = redis.ConnectionPool(
+                host=cfg.redis_host,
+                port=int(cfg.redis_port),
+                password=cfg.redis_password,
+                db=0,  # Cannot be changed
+            )
+        return _pools[key]
 
 
 class RedisMemory(MemoryProviderSingleton):
@@ -31,16 +118,8 @@ class RedisMemory(MemoryProviderSingleton):
 
         Returns: None
         """
-        redis_host = cfg.redis_host
-        redis_port = cfg.redis_port
-        redis_password = cfg.redis_password
-        self.dimension = 1536
-        self.redis = redis.Redis(
-            host=redis_host,
-            port=redis_port,
-            password=redis_password,
-            db=0,  # Cannot be changed
-        )
+        self.dimension = embedding_provider.dimension
+        self.redis = redis.Redis(connection_pool=get_connection_pool(cfg))
         self.cfg = cfg
 
         # Check redis connection
@@ -60,43 +139,179 @@ class RedisMemory(MemoryProviderSingleton):
             )
             exit(1)
 
+        # Seconds until entries expire; 0 keeps them forever
+        self.ttl = int(getattr(cfg, "redis_ttl_seconds", 0))
+        self.ef_runtime = int(getattr(cfg, "redis_hnsw_ef_runtime", 10))
+
         if cfg.wipe_redis_on_start:
             self.redis.flushall()
+        index = self.redis.ft(f"{cfg.memory_index}")
         try:
-            self.redis.ft(f"{cfg.memory_index}").create_index(
-                fields=SCHEMA,
+            index.create_index(
+                fields=build_schema(cfg),
                 definition=IndexDefinition(
                     prefix=[f"{cfg.memory_index}:"], index_type=IndexType.HASH
                 ),
             )
+        except redis.ResponseError as e:
+            if "already exists" not in str(e).lower():
+                print("Error creating Redis search index: ", e)
+            # Indexes from before the filter fields get them added; the
+            # vector field, and so its HNSW settings, stay as created.
+            for field in FILTER_FIELDS:
+                try:
+                    index.alter_schema_add([field])
+                except redis.ResponseError:
+                    pass  # Already there
         except Exception as e:
             print("Error creating Redis search index: ", e)
-        existing_vec_num = self.redis.get(f"{cfg.memory_index}-vec_num")
-        self.vec_num = int(existing_vec_num.decode("utf-8")) if existing_vec_num else 0
 
-    def add(self, data: str) -> str:
+    def _reserve_ids(self, count: int) -> int:
+        """
+        Claim `count` consecutive entry ids and return the first.
+
+        The counter lives in Redis and INCRBY is atomic, so agents sharing an
+        index never hand out the same id twice.
+        """
+        return self.redis.incrby(f"{self.cfg.memory_index}-vec_num", count) - count
+
+    def add(
+        self,
+        text: str,
+        tags: List[str] = None,
+        task_id: str = None,
+        touch: bool = False,
+    ) -> str:
         """
         Adds a data point to the memory.
 
         Args:
-            data: The data to add.
+            text: The data to add.
+            tags: Tags to filter the data point by.
+            task_id: Identifier of the task the data point belongs to.
+            touch: Accepted for compatibility with the local backend; Redis
+                doesn't dedupe, so a repeated text is stored again.
 
         Returns: Message indicating that the data has been added.
         """
-        if "Command Error:" in data:
-            return ""
-        vector = get_ada_embedding(data)
-        vector = np.array(vector).astype(np.float32).tobytes()
-        data_dict = {b"data": data, "embedding": vector}
-        pipe = self.redis.pipeline()
-        pipe.hset(f"{self.cfg.memory_index}:{self.vec_num}", mapping=data_dict)
-        _text = (
-            f"Inserting data into memory at index: {self.vec_num}:\n" f"data: {data}"
+        return self.add_many([text], tags, task_id=task_id)[0]
+
+    def add_many(
+        self,
+        texts: List[str],
+        tags: List[str] = None,
+        touch: bool = False,
+        task_id: str = None,
+    ) -> List[str]:
+        """
+        Adds several data points with one embedding request, one id
+        reservation and one pipeline per PIPELINE_CHUNK of them.
+
+        Args:
+            texts: The data to add.
+            tags: Tags stored with every data point.
+            touch: See `add`.
+            task_id: Task identifier stored with every data point.
+
+        Returns: A message per data point; empty for skipped ones.
+        """
+        keep = [i for i, text in enumerate(texts) if "Command Error:" not in text]
+        messages = [""] * len(texts)
+        if not keep:
+            return messages
+        if len(keep) == 1:
+            vectors = [get_ada_embedding(texts[keep[0]])]
+        else:
+            vectors = get_ada_embeddings([texts[i] for i in keep])
+        now = time.time()
+        first = self._write(
+            [
+                {
+                    "text": texts[i],
+                    "vector": vector,
+                    "tags": tags,
+                    "task_id": task_id,
+                    "timestamp": now,
+                }
+                for i, vector in zip(keep, vectors)
+            ]
         )
-        self.vec_num += 1
-        pipe.set(f"{self.cfg.memory_index}-vec_num", self.vec_num)
+        for n, i in enumerate(keep):
+            messages[i] = (
+                f"Inserting data into memory at index: {first + n}:\n"
+                f"data: {texts[i]}"
+            )
+        return messages
+
+    def _write(self, records: List[dict]) -> int:
+        """
+        Store records shaped like those of `export_records` under freshly
+        reserved ids, one pipeline per PIPELINE_CHUNK of them, and return the
+        first id.
+        """
+        first = self._reserve_ids(len(records))
+        pipe = self.redis.pipeline(transaction=False)
+        for n, record in enumerate(records):
+            data_dict = {
+                b"data": record["text"],
+                "embedding": np.array(record["vector"]).astype(np.float32).tobytes(),
+                "timestamp": record["timestamp"],
+            }
+            if record.get("tags"):
+                data_dict["tags"] = ",".join(record["tags"])
+            if record.get("task_id"):
+                data_dict["task_id"] = record["task_id"]
+            key = f"{self.cfg.memory_index}:{first + n}"
+            pipe.hset(key, mapping=data_dict)
+            if self.ttl > 0:
+                pipe.expire(key, self.ttl)
+            if (n + 1) % PIPELINE_CHUNK == 0:
+                pipe.execute()
         pipe.execute()
-        return _text
+        return first
+
+    def export_records(self, cursor=None, batch_size: int = EXPORT_BATCH_SIZE):
+        """
+        Stream the index's entries, see `MemoryProviderSingleton.export_records`.
+
+        The cursor is a SCAN cursor: entries present for the whole export
+        come out at least once, in no particular order.
+        """
+        cursor = int(cursor or 0)
+        while True:
+            keys = []
+            while len(keys) < batch_size:
+                cursor, found = self.redis.scan(
+                    cursor, match=f"{self.cfg.memory_index}:*", count=batch_size
+                )
+                keys.extend(found)
+                if cursor == 0:
+                    break
+            pipe = self.redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+            records = [self._record(fields) for fields in pipe.execute() if fields]
+            if records or cursor == 0:
+                yield records, cursor
+            if cursor == 0:
+                return
+
+    @staticmethod
+    def _record(fields: dict) -> dict:
+        tags = fields.get(b"tags", b"").decode()
+        return {
+            "text": fields[b"data"].decode(),
+            "vector": np.frombuffer(fields[b"embedding"], dtype=np.float32).tolist(),
+            "tags": tags.split(",") if tags else [],
+            "task_id": fields.get(b"task_id", b"").decode() or None,
+            "timestamp": float(fields.get(b"timestamp", 0)),
+        }
+
+    def import_records(self, records: List[dict]) -> int:
+        """Store exported records with their vectors, under new ids."""
+        if records:
+            self._write(records)
+        return len(records)
 
     def get(self, data: str) -> Optional[List[Any]]:
         """
@@ -118,34 +333,104 @@ class RedisMemory(MemoryProviderSingleton):
         self.redis.flushall()
         return "Obliviated"
 
-    def get_relevant(self, data: str, num_relevant: int = 5) -> Optional[List[Any]]:
+    def get_relevant(
+        self,
+        data: str,
+        num_relevant: int = 5,
+        tags: List[str] = None,
+        match_all: bool = False,
+        since: float = None,
+    ) -> Optional[List[Any]]:
         """
         Returns all the data in the memory that is relevant to the given data.
+
+        The tag and time filters run inside the KNN query, so the result
+        still holds `num_relevant` entries when few of them match.
+
         Args:
             data: The data to compare to.
             num_relevant: The number of relevant data to return.
+            tags: Only rank data points carrying any of these tags.
+            match_all: Require every tag instead of any.
+            since: Only rank data points added at or after this UNIX time.
 
         Returns: A list of the most relevant data.
         """
-        query_embedding = get_ada_embedding(data)
-        base_query = f"*=>[KNN {num_relevant} @embedding $vector AS vector_score]"
+        query_embedding = get_query_embedding(data)
+        base_query = (
+            f"{filter_clause(tags, match_all, since)}"
+            f"=>[KNN {num_relevant} @embedding $vector EF_RUNTIME $ef AS vector_score]"
+        )
         query = (
             Query(base_query)
             .return_fields("data", "vector_score")
             .sort_by("vector_score")
+            .paging(0, num_relevant)
             .dialect(2)
         )
         query_vector = np.array(query_embedding).astype(np.float32).tobytes()
 
         try:
             results = self.redis.ft(f"{self.cfg.memory_index}").search(
-                query, query_params={"vector": query_vector}
+                query, query_params={"vector": query_vector, "ef": self.ef_runtime}
             )
         except Exception as e:
             print("Error calling Redis search: ", e)
             return None
         return [result.data for result in results.docs]
 
+    def search(
+        self, query_tags: List[str], match_all: bool = False, since: float = None
+    ):
+        """
+        Return every entry carrying any (or, with match_all, every one) of the
+        tags, oldest first, shaped like the local backend's entries.
+        """
+        index = self.redis.ft(f"{self.cfg.memory_index}")
+        clause = filter_clause(query_tags, match_all, since)
+        entries, offset = [], 0
+        while True:
+            query = (
+                Query(clause)
+                .return_fields("data", "tags", "task_id", "timestamp")
+                .sort_by("timestamp")
+                .paging(offset, SEARCH_PAGE)
+                .dialect(2)
+            )
+            try:
+                results = index.search(query)
+            except Exception as e:
+                print("Error calling Redis search: ", e)
+                return entries
+            entries.extend(self._entry(doc) for doc in results.docs)
+            offset += SEARCH_PAGE
+            if offset >= results.total or not results.docs:
+                return entries
+
+    @staticmethod
+    def _entry(doc) -> dict:
+        timestamp = float(getattr(doc, "timestamp", 0) or 0)
+        tags = getattr(doc, "tags", "") or ""
+        return {
+            "id": getattr(doc, "task_id", None) or doc.id,
+            "key": doc.id,
+            "tags": tags.split(",") if tags else [],
+            "timestamp": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+            "content": doc.data,
+        }
+
+    def mark_done(self, task_tags: List[str] = None) -> int:
+        """Mark all matching tasks as done by replacing 'in-progress' with 'done'."""
+        entries = self.search(task_tags or ["in-progress"])
+        pipe = self.redis.pipeline(transaction=False)
+        for entry in entries:
+            tags = [tag for tag in entry["tags"] if tag != "in-progress"]
+            if "done" not in tags:
+                tags.append("done")
+            pipe.hset(entry["key"], "tags", ",".join(tags))
+        pipe.execute()
+        return len(entries)
+
     def get_stats(self):
         """
         Returns: The stats of the memory index.
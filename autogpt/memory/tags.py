@@ -0,0 +1,65 @@
+"""Inverted tag index for the local memory backend."""
+
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+class TagIndex:
+    """
+    Maps each tag to a boolean bitset over embedding slots.
+
+    Tagging or untagging a slot flips one bit per tag, and tag queries
+    combine whole bitsets with vectorized AND/OR instead of scanning every
+    entry's tag list.
+    """
+
+    def __init__(self) -> None:
+        self._bits: Dict[str, np.ndarray] = {}
+        self._capacity = 16
+
+    def _bitset(self, tag: str, slot: int) -> np.ndarray:
+        if slot >= self._capacity:
+            self._capacity = max(slot + 1, 2 * self._capacity)
+            for name, bits in self._bits.items():
+                grown = np.zeros(self._capacity, dtype=bool)
+                grown[: len(bits)] = bits
+                self._bits[name] = grown
+        if tag not in self._bits:
+            self._bits[tag] = np.zeros(self._capacity, dtype=bool)
+        return self._bits[tag]
+
+    def add(self, slot: int, tags: Iterable[str]):
+        for tag in tags:
+            self._bitset(tag, slot)[slot] = True
+
+    def discard(self, slot: int, tags: Iterable[str]):
+        for tag in tags:
+            bits = self._bits.get(tag)
+            if bits is not None and slot < len(bits):
+                bits[slot] = False
+
+    def match(
+        self, tags: Iterable[str], size: int, match_all: bool = False
+    ) -> np.ndarray:
+        """
+        Return a mask over slots [0, size) of entries carrying the tags.
+
+        By default an entry matches if it has any of the tags (OR); with
+        `match_all` it must have every one of them (AND).
+        """
+        tags = list(tags)
+        mask = np.full(size, match_all and bool(tags), dtype=bool)
+        for tag in tags:
+            bits = self._bits.get(tag)
+            if bits is None:
+                if match_all:
+                    return np.zeros(size, dtype=bool)
+                continue
+            bits = bits[:size]
+            if match_all:
+                mask[: len(bits)] &= bits
+                mask[len(bits) :] = False
+            else:
+                mask[: len(bits)] |= bits
+        return mask
@@ -2,6 +2,7 @@
 from typing import Generator, Optional, Dict
 from selenium.webdriver.remote.webdriver import WebDriver
 from autogpt.memory import get_memory
+from autogpt.memory.base import memory_executor
 from autogpt.config import Config
 from autogpt.llm_utils import create_chat_completion
 
@@ -63,14 +64,21 @@ def summarize_text(
     chunks = list(split_text(text))
     scroll_ratio = 1 / len(chunks)
 
+    print(f"Adding {len(chunks)} chunks to memory")
+    # Embed and store the chunks while they are being summarized
+    stored = [
+        memory_executor.submit(
+            MEMORY.add_many,
+            [
+                f"Source: {url}\n" f"Raw content part#{i + 1}: {chunk}"
+                for i, chunk in enumerate(chunks)
+            ],
+        )
+    ]
+
     for i, chunk in enumerate(chunks):
         if driver:
             scroll_to_percentage(driver, scroll_ratio * i)
-        print(f"Adding chunk {i + 1} / {len(chunks)} to memory")
-
-        memory_to_add = f"Source: {url}\n" f"Raw content part#{i + 1}: {chunk}"
-
-        MEMORY.add(memory_to_add)
 
         print(f"Summarizing chunk {i + 1} / {len(chunks)}")
         messages = [create_message(chunk, question)]
@@ -81,22 +89,29 @@ def summarize_text(
             max_tokens=CFG.browse_summary_max_token,
         )
         summaries.append(summary)
-        print(f"Added chunk {i + 1} summary to memory")
-
-        memory_to_add = f"Source: {url}\n" f"Content summary part#{i + 1}: {summary}"
-
-        MEMORY.add(memory_to_add)
 
+    stored.append(
+        memory_executor.submit(
+            MEMORY.add_many,
+            [
+                f"Source: {url}\n" f"Content summary part#{i + 1}: {summary}"
+                for i, summary in enumerate(summaries)
+            ],
+        )
+    )
     print(f"Summarized {len(chunks)} chunks.")
 
     combined_summary = "\n".join(summaries)
     messages = [create_message(combined_summary, question)]
 
-    return create_chat_completion(
+    answer = create_chat_completion(
         model=CFG.fast_llm_model,
         messages=messages,
         max_tokens=CFG.browse_summary_max_token,
     )
+    for future in stored:
+        future.result()
+    return answer
 
 
 def scroll_to_percentage(driver: WebDriver, ratio: float) -> None:
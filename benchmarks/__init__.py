@@ -0,0 +1 @@
+"""Micro-benchmarks for Auto-GPT's memory backends. Run modules with `python -m`."""
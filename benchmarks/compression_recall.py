@@ -0,0 +1,107 @@
+"""
+Report memory, snapshot size, recall@k and query latency of compressed
+embedding storage and the PQ index against exact float32 search.
+
+    python -m benchmarks.compression_recall --count 100000 --rerank 10 50 100 400
+"""
+
+import argparse
+import io
+import time
+
+import numpy as np
+
+from autogpt.memory.matrix import EmbeddingMatrix, top_k
+from autogpt.memory.pq import PQIndex
+from benchmarks.ivf_recall import clustered_corpus
+
+
+def snapshot_bytes(matrix: EmbeddingMatrix) -> int:
+    """Size of the `.npy` snapshot the matrix would be saved as."""
+    buffer = io.BytesIO()
+    np.save(buffer, matrix.state()[0])
+    return buffer.tell()
+
+
+def measure(search, queries, truth, k):
+    hits, latencies = 0, []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = search(query)
+        latencies.append((time.perf_counter() - start) * 1e3)
+        hits += len(expected.intersection(found.tolist()))
+    return (
+        hits / (k * len(queries)),
+        np.percentile(latencies, 50),
+        np.percentile(latencies, 99),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--subspaces", type=int, default=96)
+    parser.add_argument("--rerank", type=int, nargs="+", default=[10, 50, 100, 400])
+    args = parser.parse_args()
+
+    vectors = clustered_corpus(args.count, args.dim, args.clusters)
+    rng = np.random.default_rng(1)
+    picks = rng.choice(args.count, size=args.queries, replace=False)
+    noise = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    queries = vectors[picks] + (0.5 / np.sqrt(args.dim)) * noise
+
+    matrices = {}
+    for dtype in (np.float32, np.float16, np.int8):
+        matrix = EmbeddingMatrix(args.dim, dtype=dtype)
+        matrix.extend(vectors)
+        matrices[np.dtype(dtype).name] = matrix
+    exact = matrices["float32"]
+    truth = [set(top_k(exact.cosine(query), args.k).tolist()) for query in queries]
+
+    header = (
+        f"{'method':<24}{'bytes/row':>10}{'file MB':>10}{'recall@' + str(args.k):>12}"
+    )
+    print(f"{args.count} rows x {args.dim} dims")
+    print(f"{header}{'p50 ms':>10}{'p99 ms':>10}")
+
+    def report(name, row_bytes, file_bytes, search):
+        recall, p50, p99 = measure(search, queries, truth, args.k)
+        print(
+            f"{name:<24}{row_bytes:>10}{file_bytes / 2**20:>10.1f}{recall:>12.3f}"
+            f"{p50:>10.2f}{p99:>10.2f}"
+        )
+
+    for name, matrix in matrices.items():
+        report(
+            name,
+            matrix.row_bytes,
+            snapshot_bytes(matrix),
+            lambda query, m=matrix: top_k(m.cosine(query), args.k),
+        )
+
+    start = time.perf_counter()
+    pq = PQIndex(subspaces=args.subspaces)
+    pq.train(matrices["int8"])
+    print(f"pq trained in {time.perf_counter() - start:.2f}s")
+    for rerank in args.rerank:
+        for name in ("float32", "int8"):
+            matrix = matrices[name]
+
+            def search(query, m=matrix, count=rerank):
+                slots = pq.candidates(query, count)
+                return slots[top_k(m.cosine(query, slots), args.k)]
+
+            report(
+                f"pq rerank={rerank} {name}",
+                pq.code_bytes + matrix.row_bytes,
+                snapshot_bytes(matrix),
+                search,
+            )
+
+
+if __name__ == "__main__":
+    main()
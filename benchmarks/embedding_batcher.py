@@ -0,0 +1,65 @@
+"""
+Measure embedding throughput of concurrent callers with and without the
+micro-batching EmbeddingBatcher, against a simulated embeddings API that
+serves a limited number of requests at a time, as rate limits do.
+
+    python -m benchmarks.embedding_batcher --threads 256 --texts 2048
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from autogpt.memory.batcher import EmbeddingBatcher
+
+
+def fake_api(latency: float, per_input: float, concurrency: int):
+    """An embeddings endpoint: fixed round trip plus a small cost per input."""
+    slots = threading.Semaphore(concurrency)
+
+    def embed_many(texts):
+        with slots:
+            time.sleep(latency + per_input * len(texts))
+        return [[0.0] * 8 for _ in texts]
+
+    return embed_many
+
+
+def bench(embed, threads: int, texts: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(embed, [f"text {i}" for i in range(texts)]))
+    return texts / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=256)
+    parser.add_argument("--texts", type=int, default=2048)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--api-concurrency", type=int, default=4)
+    parser.add_argument("--wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    api = fake_api(args.latency_ms / 1000, 0.0001, args.api_concurrency)
+    direct = bench(lambda text: api([text])[0], args.threads, args.texts)
+    print(f"one request per text: {direct:9.1f} texts/s")
+    for max_batch in (8, 32, 256):
+        batcher = EmbeddingBatcher(
+            api,
+            max_batch=max_batch,
+            max_wait=args.wait_ms / 1000,
+            concurrency=args.api_concurrency,
+        )
+        rate = bench(batcher.embed, args.threads, args.texts)
+        stats = batcher.stats()
+        batcher.close()
+        print(
+            f"batched, max {max_batch:3d}:    {rate:9.1f} texts/s "
+            f"({stats['requests'] / stats['batches']:.1f} texts per request)"
+        )
+
+
+if __name__ == "__main__":
+    main()
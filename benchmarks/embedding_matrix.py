@@ -0,0 +1,75 @@
+"""
+Compare appending embeddings one at a time to the growable EmbeddingMatrix
+against the previous np.concatenate-per-add approach.
+
+    python -m benchmarks.embedding_matrix --count 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from autogpt.memory.matrix import EmbeddingMatrix
+
+
+def bench_concatenate(vectors: np.ndarray) -> float:
+    matrix = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+    start = time.perf_counter()
+    for vector in vectors:
+        matrix = np.concatenate([matrix, vector[np.newaxis, :]], axis=0)
+    return time.perf_counter() - start
+
+
+def bench_append(vectors: np.ndarray, max_rows=None) -> float:
+    matrix = EmbeddingMatrix(vectors.shape[1], max_rows=max_rows)
+    start = time.perf_counter()
+    for vector in vectors:
+        matrix.append(vector)
+    return time.perf_counter() - start
+
+
+def bench_extend(vectors: np.ndarray, batch: int) -> float:
+    matrix = EmbeddingMatrix(vectors.shape[1])
+    start = time.perf_counter()
+    for i in range(0, len(vectors), batch):
+        matrix.extend(vectors[i : i + batch])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument(
+        "--baseline-count",
+        type=int,
+        default=5_000,
+        help="np.concatenate is O(n^2), so it only runs on a prefix (default: 5000)",
+    )
+    parser.add_argument("--ring", type=int, default=200, help="ring-buffer size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Reuse a small block of random rows; the content does not affect timing.
+    block = rng.standard_normal((1024, args.dim)).astype(np.float32)
+    vectors = np.resize(block, (args.count, args.dim))
+    baseline = vectors[: args.baseline_count]
+
+    rows = [
+        ("np.concatenate per add", len(baseline), bench_concatenate(baseline)),
+        ("EmbeddingMatrix.append", args.count, bench_append(vectors)),
+        ("EmbeddingMatrix.extend(256)", args.count, bench_extend(vectors, 256)),
+        (
+            f"ring buffer ({args.ring} rows)",
+            args.count,
+            bench_append(vectors, args.ring),
+        ),
+    ]
+    print(f"{'method':<32}{'rows':>10}{'total s':>12}{'us/add':>10}")
+    for name, count, seconds in rows:
+        print(f"{name:<32}{count:>10}{seconds:>12.3f}{seconds / count * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
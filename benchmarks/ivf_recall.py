@@ -0,0 +1,89 @@
+"""
+Report recall@k and query latency of the IVF index against brute force.
+
+    python -m benchmarks.ivf_recall --count 100000 --nprobe 4 8 16 32
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from autogpt.memory.ivf import IVFIndex
+from autogpt.memory.matrix import EmbeddingMatrix, top_k
+
+
+def clustered_corpus(count: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """Unit vectors scattered around random centres, like topical memories."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(clusters, size=count)
+    vectors = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 16384):
+        stop = min(count, start + 16384)
+        noise = rng.standard_normal((stop - start, dim)).astype(np.float32)
+        vectors[start:stop] = centres[labels[start:stop]] + 2.0 * noise
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    vectors = clustered_corpus(args.count, args.dim, args.clusters)
+    matrix = EmbeddingMatrix(args.dim)
+    matrix.extend(vectors)
+    rng = np.random.default_rng(1)
+    picks = rng.choice(args.count, size=args.queries, replace=False)
+    noise = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    queries = vectors[picks] + (0.5 / np.sqrt(args.dim)) * noise
+
+    start = time.perf_counter()
+    ivf = IVFIndex()
+    ivf.train(matrix)
+    train_seconds = time.perf_counter() - start
+    print(
+        f"{args.count} rows x {args.dim} dims, {ivf.nlist} lists,"
+        f" trained in {train_seconds:.2f}s"
+    )
+
+    truth, brute_ms = [], []
+    for query in queries:
+        start = time.perf_counter()
+        truth.append(set(top_k(matrix.cosine(query), args.k).tolist()))
+        brute_ms.append((time.perf_counter() - start) * 1e3)
+
+    print(
+        f"{'method':<20}{'recall@' + str(args.k):>12}"
+        f"{'p50 ms':>10}{'p99 ms':>10}{'scanned':>10}"
+    )
+    print(
+        f"{'brute force':<20}{1.0:>12.3f}{np.percentile(brute_ms, 50):>10.2f}"
+        f"{np.percentile(brute_ms, 99):>10.2f}{args.count:>10}"
+    )
+    for nprobe in args.nprobe:
+        hits, latencies, scanned = 0, [], 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            slots = ivf.candidates(query, nprobe)
+            found = slots[top_k(matrix.cosine(query, slots), args.k)]
+            latencies.append((time.perf_counter() - start) * 1e3)
+            hits += len(expected.intersection(found.tolist()))
+            scanned += len(slots)
+        print(
+            f"{'ivf nprobe=' + str(nprobe):<20}{hits / (args.k * len(queries)):>12.3f}"
+            f"{np.percentile(latencies, 50):>10.2f}"
+            f"{np.percentile(latencies, 99):>10.2f}"
+            f"{scanned // len(queries):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""
+Compare memory backends on a synthetic corpus: add throughput, get_relevant
+latency, recall@k against exact search, process RSS and on-disk size.
+
+    python -m benchmarks.memory_backends --sizes 1000 10000 100000
+    python -m benchmarks.memory_backends --backends local local-pq milvus \
+        --sizes 1000000
+
+The corpus is clustered unit vectors with the embedding provider's
+dimension (1536 for ada-002), generated chunk by chunk from a seed, and
+the backends' embedding functions are stubbed to look vectors up in it,
+so no API key is used and the timings cover the backend alone. Exact
+search streams over the same chunks, so the corpus is never held whole;
+the local backend still keeps every row in memory, so 10^6 entries need
+about 6 GB of RAM there (or 1.5 GB with --local-compression int8).
+
+Every backend and size runs in a fresh process; peak_rss_mb is how far
+that process's peak RSS rose above its level before the store was opened.
+Redis servers and the Milvus Lite server run in processes of their own, so
+their memory is not part of that figure.
+
+Each backend gets `<report-dir>/<backend>.json` and `<backend>.md` with
+one row per corpus size. Redis needs a redis-stack server (see
+benchmarks/redis_throughput.py) and is skipped when none answers; Milvus
+runs on Milvus Lite unless --milvus-addr names a server.
+"""
+
+import argparse
+import functools
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+from contextlib import ExitStack
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+import numpy as np
+import orjson
+
+from autogpt.config.singleton import Singleton
+from autogpt.memory.base import embedding_provider
+
+# Rows generated per corpus chunk; two chunks are cached at a time
+CHUNK_ROWS = 4096
+
+
+class SyntheticCorpus:
+    """
+    Unit vectors scattered around random centres, like topical memories.
+
+    Row i is the text `doc {i}`; query j, a perturbed copy of a random row,
+    is the text `query {j}`. Rows are regenerated chunk by chunk from the
+    seed, so memory stays bounded whatever the size.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        dim: int,
+        clusters: int = 256,
+        spread: float = 2.0,
+        seed: int = 0,
+    ):
+        self.size, self.dim, self.spread, self.seed = size, dim, spread, seed
+        rng = np.random.default_rng(seed)
+        self.centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+        self.queries = np.empty((0, dim), dtype=np.float32)
+
+    @functools.lru_cache(maxsize=2)
+    def chunk(self, index: int) -> np.ndarray:
+        rows = min(CHUNK_ROWS, self.size - index * CHUNK_ROWS)
+        rng = np.random.default_rng([self.seed, index])
+        labels = rng.integers(len(self.centres), size=rows)
+        noise = rng.standard_normal((rows, self.dim)).astype(np.float32)
+        vectors = self.centres[labels] + self.spread * noise
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+    def chunks(self):
+        for index in range(0, (self.size + CHUNK_ROWS - 1) // CHUNK_ROWS):
+            yield index * CHUNK_ROWS, self.chunk(index)
+
+    def texts(self, start: int, stop: int) -> List[str]:
+        return [f"doc {i}" for i in range(start, stop)]
+
+    def make_queries(self, count: int, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        picks = np.sort(rng.choice(self.size, size=count, replace=False))
+        rows = np.stack([self.chunk(i // CHUNK_ROWS)[i % CHUNK_ROWS] for i in picks])
+        noise = rng.standard_normal(rows.shape).astype(np.float32)
+        self.queries = rows + (0.5 / np.sqrt(self.dim)) * noise
+
+    def embed(self, text: str) -> List[float]:
+        kind, number = text.split()
+        if kind == "query":
+            return self.queries[int(number)].tolist()
+        i = int(number)
+        return self.chunk(i // CHUNK_ROWS)[i % CHUNK_ROWS].tolist()
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed(text) for text in texts]
+
+    def exact_top_k(self, k: int) -> List[set]:
+        """The texts of each query's k nearest rows, by a streaming exact scan."""
+        best_scores = np.full((len(self.queries), k), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(self.queries), k), dtype=np.int64)
+        for start, vectors in self.chunks():
+            scores = np.concatenate([best_scores, self.queries @ vectors.T], axis=1)
+            ids = np.broadcast_to(
+                np.arange(start, start + len(vectors)), scores[:, k:].shape
+            )
+            rows = np.concatenate([best_rows, ids], axis=1)
+            keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, keep, axis=1)
+            best_rows = np.take_along_axis(rows, keep, axis=1)
+        return [{f"doc {i}" for i in row} for row in best_rows]
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process now, or its peak where /proc is missing."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def directory_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+class LocalBackend:
+    module = "autogpt.memory.local"
+
+    def __init__(self, args, ann: str = "none"):
+        self.args, self.ann = args, ann
+
+    def unavailable(self) -> Optional[str]:
+        return None
+
+    def open(self, workdir: str, size: int):
+        from autogpt.memory.local import LocalCache
+
+        Singleton._instances.pop(LocalCache, None)
+        cfg = SimpleNamespace(
+            memory_index=os.path.join(workdir, "memory"),
+            memory_max_items=size,
+            memory_max_bytes=2**62,
+            memory_search_mode="vector",
+            memory_ann_index=self.ann,
+            memory_compression=self.args.local_compression,
+            memory_settings={"auto_tag_in_progress": False},
+        )
+        return LocalCache(cfg)
+
+    def finish(self, memory):
+        """Persist everything, so the files measured are the ones a restart reads."""
+        memory.compact()
+        memory.close()
+
+    def store_bytes(self, memory, workdir: str) -> Optional[int]:
+        return directory_bytes(workdir)
+
+    def drop(self, memory):
+        pass
+
+
+class RedisBackend:
+    module = "autogpt.memory.redismem"
+
+    def __init__(self, args):
+        self.args = args
+
+    def unavailable(self) -> Optional[str]:
+        try:
+            import redis
+
+            redis.Redis(
+                host=self.args.redis_host, port=int(self.args.redis_port)
+            ).ping()
+        except Exception as e:  # ImportError or any connection failure
+            return str(e)
+        return None
+
+    def open(self, workdir: str, size: int):
+        from autogpt.memory.redismem import RedisMemory
+
+        Singleton._instances.pop(RedisMemory, None)
+        cfg = SimpleNamespace(
+            redis_host=self.args.redis_host,
+            redis_port=self.args.redis_port,
+            redis_password="",
+            wipe_redis_on_start=False,
+            memory_index=f"bench-{size}",
+        )
+        return RedisMemory(cfg)
+
+    def finish(self, memory):
+        pass
+
+    def store_bytes(self, memory, workdir: str) -> Optional[int]:
+        """Server memory used by the whole instance, not only the benchmark index."""
+        return int(memory.redis.info("memory")["used_memory"])
+
+    def drop(self, memory):
+        memory.redis.ft(memory.cfg.memory_index).dropindex(delete_documents=True)
+        memory.redis.delete(f"{memory.cfg.memory_index}-vec_num")
+
+
+class MilvusBackend:
+    module = "autogpt.memory.milvus"
+
+    def __init__(self, args):
+        self.args = args
+
+    def unavailable(self) -> Optional[str]:
+        try:
+            import pymilvus  # noqa: F401
+        except ImportError as e:
+            return str(e)
+        return None
+
+    def open(self, workdir: str, size: int):
+        from autogpt.memory.milvus import MilvusMemory
+
+        Singleton._instances.pop(MilvusMemory, None)
+        cfg = SimpleNamespace(
+            milvus_addr=self.args.milvus_addr or os.path.join(workdir, "milvus.db"),
+            milvus_collection=f"bench_{size}",
+            milvus_index_type=self.args.milvus_index,
+            milvus_consistency="Bounded",
+        )
+        return MilvusMemory(cfg)
+
+    def finish(self, memory):
+        memory.collection.flush()
+
+    def store_bytes(self, memory, workdir: str) -> Optional[int]:
+        return None if self.args.milvus_addr else directory_bytes(workdir)
+
+    def drop(self, memory):
+        memory.collection.drop()
+        if not self.args.milvus_addr:
+            from pymilvus import connections
+
+            connections.disconnect("default")
+
+
+BACKENDS = {
+    "local": lambda args: LocalBackend(args),
+    "local-ivf": lambda args: LocalBackend(args, ann="ivf"),
+    "local-pq": lambda args: LocalBackend(args, ann="pq"),
+    "redis": RedisBackend,
+    "milvus": MilvusBackend,
+}
+
+
+def corpus_for(size: int, args) -> SyntheticCorpus:
+    corpus = SyntheticCorpus(
+        size, embedding_provider.dimension, args.clusters, args.spread
+    )
+    corpus.make_queries(min(args.queries, size))
+    return corpus
+
+
+def run(name: str, size: int, truth: List[set], args) -> dict:
+    """
+    Load a corpus of `size` entries into a fresh store of the backend and
+    measure it. Runs in a process of its own, so its peak RSS belongs to
+    this backend alone.
+    """
+    backend = BACKENDS[name](args)
+    corpus = corpus_for(size, args)
+    workdir = tempfile.mkdtemp(prefix="memory-bench-")
+    with ExitStack() as stack:
+        # Plain functions rather than mocks, which would keep every call's arguments
+        stack.enter_context(patch(f"{backend.module}.get_ada_embedding", corpus.embed))
+        stack.enter_context(
+            patch(f"{backend.module}.get_ada_embeddings", corpus.embed_many)
+        )
+        stack.enter_context(
+            patch(
+                f"{backend.module}.get_query_embedding",
+                lambda text, embed=None: corpus.embed(text),
+            )
+        )
+        baseline = rss_bytes()
+        memory = backend.open(workdir, corpus.size)
+        try:
+            start = time.perf_counter()
+            for first in range(0, corpus.size, args.batch):
+                memory.add_many(
+                    corpus.texts(first, min(corpus.size, first + args.batch))
+                )
+            add_seconds = time.perf_counter() - start
+
+            hits, latencies = 0, []
+            for j, expected in enumerate(truth):
+                start = time.perf_counter()
+                found = memory.get_relevant(f"query {j}", args.k) or []
+                latencies.append((time.perf_counter() - start) * 1e3)
+                texts = {
+                    item["content"] if isinstance(item, dict) else str(item)
+                    for item in found
+                }
+                hits += len(expected & texts)
+            backend.finish(memory)
+            store = backend.store_bytes(memory, workdir)
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        finally:
+            backend.drop(memory)
+            shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "entries": corpus.size,
+        "dim": corpus.dim,
+        "add_per_s": round(corpus.size / add_seconds, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        f"recall@{args.k}": round(hits / (args.k * len(truth)), 4),
+        "peak_rss_mb": round(max(peak - baseline, 0) / 2**20, 1),
+        "store_mb": None if store is None else round(store / 2**20, 1),
+    }
+
+
+def markdown(name: str, rows: List[Dict]) -> str:
+    columns = list(rows[0])
+    lines = [f"### {name}", "", "| " + " | ".join(columns) + " |"]
+    lines.append("|" + "---:|" * len(columns))
+    for row in rows:
+        cells = ["-" if row[column] is None else str(row[column]) for column in columns]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["local", "local-ivf", "milvus", "redis"],
+        choices=sorted(BACKENDS),
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument(
+        "--spread", type=float, default=2.0, help="noise around the cluster centres"
+    )
+    parser.add_argument("--report-dir", default="benchmark-reports")
+    parser.add_argument(
+        "--local-compression", default="none", choices=["none", "float16", "int8"]
+    )
+    parser.add_argument("--milvus-addr", default="")
+    parser.add_argument("--milvus-index", default="HNSW")
+    parser.add_argument("--redis-host", default="localhost")
+    parser.add_argument("--redis-port", default="6379")
+    args = parser.parse_args()
+    os.makedirs(args.report_dir, exist_ok=True)
+
+    available = []
+    for name in args.backends:
+        reason = BACKENDS[name](args).unavailable()
+        if reason:
+            print(f"{name}: skipped ({reason})")
+        else:
+            available.append(name)
+
+    reports: Dict[str, List[dict]] = {}
+    spawn = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        truth = corpus_for(size, args).exact_top_k(args.k)
+        for name in available:
+            with spawn.Pool(1) as pool:
+                row = pool.apply(run, (name, size, truth, args))
+            print(f"{name}: {row}")
+            reports.setdefault(name, []).append(row)
+
+    for name, rows in reports.items():
+        with open(os.path.join(args.report_dir, f"{name}.json"), "wb") as f:
+            f.write(
+                orjson.dumps(
+                    {"backend": name, "results": rows}, option=orjson.OPT_INDENT_2
+                )
+            )
+        with open(os.path.join(args.report_dir, f"{name}.md"), "w") as f:
+            f.write(markdown(name, rows))
+        print()
+        print(markdown(name, rows))
+
+
+if __name__ == "__main__":
+    main()
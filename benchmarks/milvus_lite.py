@@ -0,0 +1,139 @@
+"""
+Measure MilvusMemory insert throughput, search latency and recall@k on
+Milvus Lite, which runs in-process on a local file; no server is needed.
+
+    python -m benchmarks.milvus_lite --count 20000 --nprobe 8 32
+
+Embeddings are precomputed clustered unit vectors, so the timings cover
+Milvus alone. Pass --address host:port to run against a server instead,
+where --index-types can include HNSW and IVF_PQ as well.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from autogpt.config.singleton import Singleton
+from autogpt.memory import milvus
+from benchmarks.ivf_recall import clustered_corpus
+
+
+def new_memory(args, index_type: str, nprobe: int = 8) -> milvus.MilvusMemory:
+    Singleton._instances.pop(milvus.MilvusMemory, None)
+    cfg = SimpleNamespace(
+        milvus_addr=args.address,
+        milvus_collection="benchmark",
+        milvus_index_type=index_type,
+        milvus_hnsw_m=16,
+        milvus_hnsw_ef=args.ef,
+        milvus_nlist=args.nlist,
+        milvus_nprobe=nprobe,
+        milvus_consistency="Bounded",
+        milvus_flush_every=args.flush_every,
+    )
+    return milvus.MilvusMemory(cfg)
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:9.1f} entries/s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument(
+        "--single", type=int, default=500, help="entries added one by one"
+    )
+    parser.add_argument("--flush-every", type=int, default=0)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=128)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--ef", type=int, default=64)
+    parser.add_argument("--index-types", nargs="+", default=["FLAT", "IVF_FLAT"])
+    parser.add_argument("--address", default="")
+    args = parser.parse_args()
+    directory = tempfile.TemporaryDirectory()
+    args.address = args.address or os.path.join(directory.name, "benchmark.db")
+
+    vectors = clustered_corpus(args.count, args.dim, clusters=64)
+    texts = [f"doc {i}" for i in range(args.count)]
+    rng = np.random.default_rng(1)
+    picks = rng.choice(args.count, size=args.queries, replace=False)
+    noise = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    queries = vectors[picks] + (0.5 / np.sqrt(args.dim)) * noise
+    query_vectors = {f"query {i}": query for i, query in enumerate(queries)}
+    truth = [
+        {f"doc {i}" for i in np.argsort(-(vectors @ query))[: args.k]}
+        for query in queries
+    ]
+
+    def lookup(text):
+        if text in query_vectors:
+            return query_vectors[text]
+        return vectors[int(text.split()[1])]
+
+    with (
+        patch.object(milvus, "embedding_provider", SimpleNamespace(dimension=args.dim)),
+        patch.object(milvus, "get_ada_embedding", side_effect=lookup),
+        patch.object(milvus, "get_query_embedding", side_effect=lookup),
+        patch.object(
+            milvus,
+            "get_ada_embeddings",
+            side_effect=lambda batch: [lookup(t) for t in batch],
+        ),
+    ):
+        memory = new_memory(args, args.index_types[0])
+        memory.clear()
+        single = min(args.single, args.count)
+        start = time.perf_counter()
+        for text in texts[:single]:
+            memory.add(text)
+        print(
+            f"add, one per entry:         {rate(single, time.perf_counter() - start)}"
+        )
+        start = time.perf_counter()
+        for i in range(single, args.count, args.batch):
+            memory.add_many(texts[i : i + args.batch])
+        elapsed = time.perf_counter() - start
+        print(
+            f"add_many, {args.batch} per call:   {rate(args.count - single, elapsed)}"
+        )
+        start = time.perf_counter()
+        memory.collection.flush()
+        print(f"final flush:                {time.perf_counter() - start:9.2f} s")
+
+        print(f"{'index':<22}{'recall@' + str(args.k):>12}{'p50 ms':>10}{'p99 ms':>10}")
+        for index_type in args.index_types:
+            for nprobe in args.nprobe if index_type.startswith("IVF") else [0]:
+                memory = new_memory(args, index_type, nprobe)
+                hits, latencies = 0, []
+                for i, expected in enumerate(truth):
+                    start = time.perf_counter()
+                    found = memory.get_relevant(f"query {i}", args.k)
+                    latencies.append((time.perf_counter() - start) * 1e3)
+                    hits += len(expected.intersection(found))
+                label = (
+                    f"{memory.index_type} nprobe={nprobe}"
+                    if nprobe
+                    else memory.index_type
+                )
+                print(
+                    f"{label:<22}{hits / (args.k * args.queries):>12.3f}"
+                    f"{np.percentile(latencies, 50):>10.2f}"
+                    f"{np.percentile(latencies, 99):>10.2f}"
+                )
+        memory.collection.drop()
+    milvus.connections.disconnect("default")
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Measure RedisMemory write throughput against a local redis-stack server:
+one add per entry versus pipelined add_many, plus concurrent agents sharing
+an index.
+
+    docker run -d -p 6379:6379 redis/redis-stack-server:latest
+    python -m benchmarks.redis_throughput --count 5000
+
+Embeddings come from the offline local provider, so no API key is needed
+and the timings are dominated by Redis round trips. The benchmark index is
+dropped afterwards; the server is not flushed.
+"""
+
+import os
+
+os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+os.environ["WIPE_REDIS_ON_START"] = "False"
+
+import argparse  # noqa: E402
+import time  # noqa: E402
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+from types import SimpleNamespace  # noqa: E402
+
+from autogpt.config.singleton import Singleton  # noqa: E402
+from autogpt.memory.redismem import RedisMemory  # noqa: E402
+
+
+def new_memory(args, index: str) -> RedisMemory:
+    Singleton._instances.pop(RedisMemory, None)
+    cfg = SimpleNamespace(
+        redis_host=args.host,
+        redis_port=args.port,
+        redis_password=args.password,
+        wipe_redis_on_start=False,
+        memory_index=index,
+    )
+    return RedisMemory(cfg)
+
+
+def drop(memory: RedisMemory):
+    memory.redis.ft(memory.cfg.memory_index).dropindex(delete_documents=True)
+    memory.redis.delete(f"{memory.cfg.memory_index}-vec_num")
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:9.1f} entries/s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--agents", type=int, default=4)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="6379")
+    parser.add_argument("--password", default="")
+    args = parser.parse_args()
+    texts = [f"benchmark entry {i} " + "lorem ipsum " * 20 for i in range(args.count)]
+
+    memory = new_memory(args, "bench-single")
+    start = time.perf_counter()
+    for text in texts:
+        memory.add(text)
+    print(f"add, one per entry:       {rate(args.count, time.perf_counter() - start)}")
+    drop(memory)
+
+    memory = new_memory(args, "bench-bulk")
+    start = time.perf_counter()
+    for i in range(0, args.count, args.batch):
+        memory.add_many(texts[i : i + args.batch])
+    elapsed = time.perf_counter() - start
+    print(f"add_many, {args.batch} per call:   {rate(args.count, elapsed)}")
+    drop(memory)
+
+    # Each agent is its own RedisMemory, as in separate processes
+    agents = [new_memory(args, "bench-shared") for _ in range(args.agents)]
+    share = args.count // args.agents
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.agents) as pool:
+        list(
+            pool.map(
+                lambda n: [
+                    agents[n].add_many(texts[i : i + args.batch])
+                    for i in range(n * share, (n + 1) * share, args.batch)
+                ],
+                range(args.agents),
+            )
+        )
+    elapsed = time.perf_counter() - start
+    keys = sum(1 for _ in agents[0].redis.scan_iter("bench-shared:*", count=1000))
+    print(f"{args.agents} agents, add_many:      {rate(share * args.agents, elapsed)}")
+    print(f"distinct keys written:    {keys} of {share * args.agents}")
+    drop(agents[0])
+
+
+if __name__ == "__main__":
+    main()
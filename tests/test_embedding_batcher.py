@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from unittest import TestCase
+
+from autogpt.memory.batcher import EmbeddingBatcher
+
+
+class RecordingEmbedder:
+    """Embeds a text as [its length] and records the size of every call."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+        if self.fail:
+            raise ValueError("rate limited")
+        return [[float(len(text))] for text in texts]
+
+
+class TestEmbeddingBatcher(TestCase):
+    """
+    Test cases for coalescing embedding requests into batched calls.
+    """
+
+    def run_threads(self, batcher, texts):
+        results = [None] * len(texts)
+        barrier = threading.Barrier(len(texts))
+
+        def worker(i):
+            barrier.wait()
+            results[i] = batcher.embed(texts[i])
+
+        threads = [
+            threading.Thread(target=worker, args=(i,)) for i in range(len(texts))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_threads_share_one_call(self):
+        embedder = RecordingEmbedder()
+        batcher = EmbeddingBatcher(embedder, max_wait=0.2)
+        texts = ["x" * i for i in range(1, 9)]
+        self.assertEqual(
+            self.run_threads(batcher, texts), [[float(i)] for i in range(1, 9)]
+        )
+        self.assertEqual(len(embedder.batches), 1)
+        self.assertEqual(batcher.stats(), {"requests": 8, "batches": 1})
+        batcher.close()
+
+    def test_size_and_token_budgets_split_batches(self):
+        embedder = RecordingEmbedder()
+        batcher = EmbeddingBatcher(embedder, max_batch=3, max_wait=0.2)
+        self.assertEqual(batcher.embed_many(["a"] * 7), [[1.0]] * 7)
+        self.assertEqual([len(batch) for batch in embedder.batches], [3, 3, 1])
+        batcher.close()
+
+        embedder = RecordingEmbedder()
+        # Each 40-char text is 11 estimated tokens
+        batcher = EmbeddingBatcher(embedder, max_tokens=25, max_wait=0.2)
+        batcher.embed_many(["y" * 40] * 5)
+        self.assertEqual([len(batch) for batch in embedder.batches], [2, 2, 1])
+        batcher.close()
+
+    def test_async_tasks_share_one_call(self):
+        embedder = RecordingEmbedder()
+        batcher = EmbeddingBatcher(embedder, max_wait=0.2)
+
+        async def main():
+            return await asyncio.gather(*(batcher.aembed("z" * i) for i in range(1, 5)))
+
+        self.assertEqual(asyncio.run(main()), [[1.0], [2.0], [3.0], [4.0]])
+        self.assertEqual(len(embedder.batches), 1)
+        batcher.close()
+
+    def test_errors_reach_every_caller(self):
+        batcher = EmbeddingBatcher(RecordingEmbedder(fail=True), max_wait=0.05)
+        futures = [batcher.submit("a"), batcher.submit("b")]
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result()
+        batcher.close()
+        with self.assertRaises(RuntimeError):
+            batcher.submit("c")
+
+    def test_zero_wait_calls_through(self):
+        embedder = RecordingEmbedder()
+        batcher = EmbeddingBatcher(embedder, max_wait=0)
+        self.assertEqual(batcher.embed("abc"), [3.0])
+        self.assertEqual(embedder.batches, [["abc"]])
+        self.assertIsNone(batcher._worker)
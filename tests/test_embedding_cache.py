@@ -0,0 +1,93 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from autogpt.memory import base, embeddings
+from autogpt.memory.embedding_cache import EmbeddingCache, embedding_key
+
+
+def fake_create(model, input):
+    """Stand-in for openai.Embedding.create: one small vector per input, shuffled."""
+    data = [
+        {"index": i, "embedding": [float(len(text)), 1.0]}
+        for i, text in enumerate(input)
+    ]
+    return {"data": data[::-1]}
+
+
+class TestEmbeddingCache(TestCase):
+    """
+    Test cases for the persistent embedding cache.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "embeddings.sqlite3")
+        self.cache = EmbeddingCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_vectors_survive_reopening(self):
+        self.cache.put_many([("a", [0.5, 1.5]), ("b", [2.0, 3.0])])
+        self.cache.close()
+        reopened = EmbeddingCache(self.path)
+        self.assertEqual(reopened.get_many(["a", "c"]), {"a": [0.5, 1.5]})
+        self.assertEqual(
+            reopened.stats(), {"hits": 1, "misses": 1, "entries": 2, "bytes": 16}
+        )
+        reopened.close()
+
+    def test_size_cap_evicts_least_recently_used(self):
+        self.cache.max_bytes = 3 * 8
+        for key in ("a", "b", "c"):
+            self.cache.put_many([(key, [1.0, 2.0])])
+        self.cache.get_many(["a"])
+        self.cache.put_many([("d", [1.0, 2.0])])
+        self.assertEqual(sorted(self.cache.get_many("abcd")), ["a", "c", "d"])
+
+    def test_byte_total_follows_writes(self):
+        self.cache.max_bytes = 4 * 8
+        self.cache.put_many([("a", [1.0, 2.0]), ("b", [1.0, 2.0, 3.0])])
+        self.cache.put_many([("a", [1.0, 2.0, 3.0, 4.0])])
+        self.assertEqual(self.cache.stats()["bytes"], 28)
+        self.cache.put_many([("c", [1.0, 2.0])])
+        self.assertEqual(self.cache.stats()["bytes"], 24)
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()["bytes"], 0)
+
+    def test_byte_total_of_an_older_database_is_summed_once(self):
+        self.cache.put_many([("a", [0.5, 1.5]), ("b", [2.0, 3.0])])
+        self.cache.close()
+        db = sqlite3.connect(self.path)
+        db.executescript(
+            "DROP TRIGGER embeddings_insert; DROP TRIGGER embeddings_delete;"
+            " DROP TRIGGER embeddings_update; DROP TABLE meta;"
+        )
+        db.close()
+        reopened = EmbeddingCache(self.path)
+        reopened.get_many(["a"])
+        self.assertEqual(reopened.stats()["bytes"], 16)
+        reopened.close()
+
+    def test_get_ada_embeddings_only_requests_misses(self):
+        with (
+            patch.object(base, "embedding_cache", self.cache),
+            patch.object(
+                base, "embedding_provider", embeddings.OpenAIEmbeddingProvider()
+            ),
+            patch.object(
+                embeddings.openai.Embedding, "create", side_effect=fake_create
+            ) as create,
+        ):
+            self.assertEqual(base.get_ada_embedding("hi\nthere"), [8.0, 1.0])
+            vectors = base.get_ada_embeddings(["hi there", "x", "yy", "x"])
+        self.assertEqual(vectors, [[8.0, 1.0], [1.0, 1.0], [2.0, 1.0], [1.0, 1.0]])
+        self.assertEqual(create.call_count, 2)
+        self.assertEqual(create.call_args.kwargs["input"], ["x", "yy"])
+        key = embedding_key(embeddings.OPENAI_EMBEDDING_MODEL, "yy")
+        self.assertEqual(self.cache.get_many([key]), {key: [2.0, 1.0]})
@@ -0,0 +1,84 @@
+from unittest import TestCase
+
+import numpy as np
+
+from autogpt.memory.matrix import EmbeddingMatrix, top_k
+
+
+class TestEmbeddingMatrix(TestCase):
+    """
+    Test cases for the growable, slot-addressed EmbeddingMatrix.
+    """
+
+    def test_append_grows_capacity_by_doubling(self):
+        matrix = EmbeddingMatrix(4, capacity=2)
+        for i in range(5):
+            slot, evicted = matrix.append(np.full(4, i, dtype=np.float32))
+            self.assertEqual(slot, i)
+            self.assertIsNone(evicted)
+        self.assertEqual(matrix.capacity, 8)
+        self.assertEqual(matrix.shape, (5, 4))
+        np.testing.assert_array_equal(matrix.vectors[:, 0], np.arange(5))
+
+    def test_ring_buffer_recycles_oldest_slot(self):
+        matrix = EmbeddingMatrix(2, max_rows=3)
+        matrix.extend(np.arange(6, dtype=np.float32).reshape(3, 2))
+        slot, evicted = matrix.append(np.array([9, 9], dtype=np.float32))
+        self.assertEqual((slot, evicted), (0, 0))
+        self.assertEqual(matrix.capacity, 3)
+        self.assertEqual(matrix.order().tolist(), [1, 2, 0])
+
+    def test_released_slots_are_reused(self):
+        matrix = EmbeddingMatrix(2)
+        matrix.extend(np.ones((3, 2), dtype=np.float32))
+        matrix.release(1)
+        self.assertEqual(matrix.live.tolist(), [True, False, True])
+        self.assertEqual(matrix.append(np.zeros(2, dtype=np.float32))[0], 1)
+        self.assertEqual(matrix.order().tolist(), [0, 2, 1])
+
+    def test_state_round_trip(self):
+        matrix = EmbeddingMatrix(2)
+        matrix.extend(np.arange(8, dtype=np.float32).reshape(4, 2))
+        matrix.release(2)
+        matrix.touch(0)
+        copy = EmbeddingMatrix.from_state(*matrix.state())
+        self.assertEqual(copy.order().tolist(), [1, 3, 0])
+        np.testing.assert_array_equal(copy.vectors, matrix.vectors)
+        self.assertEqual(copy.append(np.zeros(2, dtype=np.float32))[0], 2)
+
+    def test_cosine_uses_cached_norms_and_masks_free_slots(self):
+        matrix = EmbeddingMatrix(2)
+        matrix.extend(np.array([[3, 0], [0, 2], [1, 1]], dtype=np.float32))
+        matrix.release(1)
+        scores = matrix.cosine(np.array([2, 0], dtype=np.float32))
+        np.testing.assert_allclose(scores[[0, 2]], [1.0, np.sqrt(0.5)], rtol=1e-6)
+        self.assertEqual(scores[1], -np.inf)
+
+    def test_compressed_rows_keep_cosine_scores(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((50, 64)).astype(np.float32)
+        exact = EmbeddingMatrix(64)
+        exact.extend(vectors)
+        query = rng.standard_normal(64).astype(np.float32)
+        for dtype, bytes_per_row in ((np.float16, 128), (np.int8, 64)):
+            matrix = EmbeddingMatrix(64, dtype=dtype)
+            matrix.extend(vectors[:25])
+            for vector in vectors[25:]:
+                matrix.append(vector)
+            self.assertEqual(matrix.vectors.dtype, dtype)
+            self.assertEqual(matrix.row_bytes, bytes_per_row)
+            np.testing.assert_allclose(
+                matrix.cosine(query), exact.cosine(query), atol=0.01
+            )
+
+        matrix = EmbeddingMatrix.from_state(*exact.state())
+        matrix.set_dtype(np.int8)
+        copy = EmbeddingMatrix.from_state(*matrix.state())
+        self.assertEqual(copy.dtype, np.int8)
+        np.testing.assert_allclose(copy.cosine(query), exact.cosine(query), atol=0.01)
+
+    def test_top_k_matches_full_sort(self):
+        scores = np.random.default_rng(0).standard_normal((3, 50))
+        expected = np.argsort(-scores, axis=1)[:, :7]
+        np.testing.assert_array_equal(top_k(scores, 7), expected)
+        np.testing.assert_array_equal(top_k(scores[0], 100), np.argsort(-scores[0]))
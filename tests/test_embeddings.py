@@ -0,0 +1,166 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from autogpt.memory import base, embeddings
+from autogpt.memory.batcher import EmbeddingBatcher
+from autogpt.memory.embeddings import (
+    EmbeddingProvider,
+    HashingEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    get_embedding_provider,
+)
+
+
+class CharEncoding:
+    """Stand-in for a tiktoken encoding: one token per character."""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+class TinyProvider(EmbeddingProvider):
+    """Remote provider with a 4-token input limit; embeds a text as [len, 1]."""
+
+    model = "tiny"
+    dimension = 2
+    max_tokens = 4
+    encoding = "chars"
+
+    def __init__(self):
+        self.requests = []
+
+    def embed_many(self, texts):
+        self.requests.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class TestHashingEmbeddingProvider(TestCase):
+    """
+    Test cases for the offline hashed n-gram embedding provider.
+    """
+
+    def setUp(self):
+        self.provider = HashingEmbeddingProvider(dimension=256)
+
+    def test_vectors_are_deterministic_unit_length(self):
+        vector = self.provider.embed("Write the results to output.txt")
+        self.assertEqual(len(vector), 256)
+        self.assertAlmostEqual(float(np.linalg.norm(vector)), 1.0, places=5)
+        again = HashingEmbeddingProvider(dimension=256).embed(
+            "Write the results to output.txt"
+        )
+        self.assertEqual(vector, again)
+        self.assertAlmostEqual(
+            float(np.linalg.norm(self.provider.embed(""))), 1.0, places=5
+        )
+
+    def test_shared_vocabulary_ranks_higher(self):
+        query, related, unrelated = self.provider.embed_many(
+            [
+                "browse the website for python tutorials",
+                "found three python tutorials on that website",
+                "the weather in paris is sunny today",
+            ]
+        )
+        self.assertGreater(np.dot(query, related), np.dot(query, unrelated) + 0.2)
+
+    def test_model_name_tracks_settings(self):
+        self.assertNotEqual(
+            self.provider.model, HashingEmbeddingProvider(dimension=128).model
+        )
+        self.assertNotEqual(self.provider.model, OpenAIEmbeddingProvider.model)
+
+    def test_config_selects_provider(self):
+        local = get_embedding_provider(
+            SimpleNamespace(embedding_provider="local", embedding_dimension=64)
+        )
+        self.assertIsInstance(local, HashingEmbeddingProvider)
+        self.assertEqual(local.dimension, 64)
+        self.assertIsInstance(
+            get_embedding_provider(SimpleNamespace(embedding_provider="bogus")),
+            OpenAIEmbeddingProvider,
+        )
+
+    def test_local_provider_bypasses_cache_and_batcher(self):
+        cache = Mock()
+        with (
+            patch.object(base, "embedding_provider", self.provider),
+            patch.object(base, "embedding_cache", cache),
+        ):
+            self.assertEqual(base.get_ada_embedding("a\nb"), self.provider.embed("a b"))
+            vectors = base.get_ada_embeddings(["x", "y"])
+        self.assertEqual(vectors, self.provider.embed_many(["x", "y"]))
+        cache.get_many.assert_not_called()
+
+
+class TestLongTexts(TestCase):
+    """
+    Test cases for fitting long texts into the provider's token limit.
+    """
+
+    def setUp(self):
+        self.provider = TinyProvider()
+        patches = [
+            patch.object(embeddings, "get_encoding", return_value=CharEncoding()),
+            patch.object(base, "embedding_provider", self.provider),
+            patch.object(base, "embedding_cache", None),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_split_by_tokens(self):
+        self.assertEqual(
+            self.provider.split("abcdefghij"), (["abcd", "efgh", "ij"], [4, 4, 2])
+        )
+        self.assertEqual(self.provider.split("abcdefghij", pieces=1), (["abcd"], [4]))
+        self.assertEqual(self.provider.split("abc"), (["abc"], [3]))
+
+    def test_split_falls_back_to_characters(self):
+        with patch.object(embeddings, "get_encoding", return_value=None):
+            pieces, sizes = self.provider.split("x" * 30000)
+        self.assertEqual(
+            sizes, [embeddings.MAX_SAFE_CHARS, 30000 - embeddings.MAX_SAFE_CHARS]
+        )
+
+    def test_long_texts_are_truncated_by_default(self):
+        with patch.object(base, "pool_chunks", False):
+            vectors = base.get_ada_embeddings(["abcdefghij", "ab"])
+        self.assertEqual(vectors, [[4.0, 1.0], [2.0, 1.0]])
+        self.assertEqual(self.provider.requests, [["abcd", "ab"]])
+
+    def test_pooled_windows_share_one_request(self):
+        with patch.object(base, "pool_chunks", True):
+            vectors = base.get_ada_embeddings(["abcdefghij", "ab"])
+        self.assertEqual(self.provider.requests, [["abcd", "efgh", "ij", "ab"]])
+        # Token-weighted mean of [4, 1], [4, 1] and [2, 1], normalized
+        mean = np.array([(4 * 4 + 4 * 4 + 2 * 2) / 10, 1.0])
+        np.testing.assert_allclose(vectors[0], mean / np.linalg.norm(mean), rtol=1e-6)
+        self.assertEqual(vectors[1], [2.0, 1.0])
+
+    def test_async_callers_share_requests(self):
+        batcher = EmbeddingBatcher(base._request_embeddings, max_wait=0.1)
+        self.addCleanup(batcher.close)
+
+        async def main():
+            return await asyncio.gather(
+                base.aget_ada_embedding("ab"),
+                base.aget_ada_embeddings(["abc", "a"]),
+            )
+
+        with (
+            patch.object(base, "embedding_batcher", batcher),
+            patch.object(base, "pool_chunks", False),
+        ):
+            single, many = asyncio.run(main())
+        self.assertEqual(single, [2.0, 1.0])
+        self.assertEqual(many, [[3.0, 1.0], [1.0, 1.0]])
+        self.assertEqual(len(self.provider.requests), 1)
+        self.assertEqual(sorted(self.provider.requests[0]), ["a", "ab", "abc"])
@@ -0,0 +1,64 @@
+import time
+from types import SimpleNamespace
+from unittest import TestCase
+
+import numpy as np
+
+from autogpt.memory.eviction import (
+    AccessStats,
+    DecayPolicy,
+    FIFOPolicy,
+    get_eviction_policy,
+)
+from autogpt.memory.matrix import EmbeddingMatrix
+from autogpt.memory.tags import TagIndex
+
+
+def make_cache(count):
+    """The parts of CacheContent the policies look at."""
+    matrix = EmbeddingMatrix(2)
+    matrix.extend(np.ones((count, 2), dtype=np.float32))
+    access = AccessStats()
+    for slot in range(count):
+        access.reset(slot, time.time())
+    return SimpleNamespace(
+        embeddings=matrix, access=access, tags=TagIndex(), sizes=[10] * count
+    )
+
+
+class TestEvictionPolicies(TestCase):
+    """
+    Test cases for the LocalCache eviction policies.
+    """
+
+    def test_ranked_yields_every_slot_once_in_priority_order(self):
+        cache = make_cache(100)
+        cache.embeddings.touch(5)
+        order = list(FIFOPolicy().ranked(cache, np.arange(100)))
+        self.assertEqual(order, [s for s in range(100) if s != 5] + [5])
+
+    def test_victims_respect_count_bytes_and_pins(self):
+        cache = make_cache(6)
+        cache.tags.add(0, ["in-progress"])
+        policy = FIFOPolicy()
+        self.assertEqual(
+            policy.victims(cache, count=2, pinned_tags=["in-progress"]), [1, 2]
+        )
+        self.assertEqual(policy.victims(cache, nbytes=25), [0, 1, 2])
+        self.assertEqual(
+            policy.victims(cache, count=6, pinned_tags=["in-progress"]),
+            [1, 2, 3, 4, 5, 0],
+        )
+
+    def test_decay_weighs_hits_against_age(self):
+        cache = make_cache(3)
+        now = time.time()
+        cache.access.record([0, 0, 0], now - 3 * 3600)  # popular but stale
+        cache.access.record([1], now)  # retrieved once, just now
+        cache.access.last[2] = now - 600  # never retrieved
+        policy = DecayPolicy(half_life=3600)
+        self.assertEqual(list(policy.ranked(cache, np.arange(3))), [0, 2, 1])
+
+    def test_unknown_policy_falls_back_to_fifo(self):
+        self.assertIsInstance(get_eviction_policy("random"), FIFOPolicy)
+        self.assertEqual(get_eviction_policy("decay", 60).half_life, 60)
@@ -0,0 +1,72 @@
+from unittest import TestCase
+
+import numpy as np
+
+from autogpt.memory.ivf import IVFIndex, spherical_kmeans
+from autogpt.memory.matrix import EmbeddingMatrix, top_k
+
+
+def clustered(count, dim=16, clusters=4, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)) * 5
+    labels = rng.integers(clusters, size=count)
+    vectors = centres[labels] + rng.standard_normal((count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+class TestIVFIndex(TestCase):
+    """
+    Test cases for the inverted-file approximate nearest neighbour index.
+    """
+
+    def setUp(self):
+        self.matrix = EmbeddingMatrix(16)
+        self.matrix.extend(clustered(400))
+        self.ivf = IVFIndex(nprobe=4, min_train_rows=100)
+
+    def members(self):
+        return sorted(
+            int(slot)
+            for posting, count in zip(self.ivf._lists, self.ivf._counts)
+            for slot in posting[:count]
+        )
+
+    def test_kmeans_returns_unit_centroids(self):
+        centroids = spherical_kmeans(clustered(200), 4)
+        self.assertEqual(centroids.shape, (4, 16))
+        np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1, rtol=1e-5)
+
+    def test_training_threshold_and_retrain(self):
+        self.assertFalse(IVFIndex(min_train_rows=1000).needs_training(400))
+        self.assertTrue(self.ivf.needs_training(400))
+        self.ivf.train(self.matrix)
+        self.assertEqual(self.ivf.nlist, 20)
+        self.assertFalse(self.ivf.needs_training(799))
+        self.assertTrue(self.ivf.needs_training(800))
+
+    def test_every_live_slot_is_in_one_list(self):
+        self.ivf.train(self.matrix)
+        self.assertEqual(self.members(), list(range(400)))
+
+        self.matrix.release(7)
+        self.ivf.remove(7)
+        slot, _ = self.matrix.append(clustered(1, seed=5)[0])
+        self.ivf.add(slot, self.matrix.vectors[slot])
+        self.assertEqual(slot, 7)
+        self.assertEqual(self.members(), list(range(400)))
+
+        self.matrix.release(3)
+        self.ivf.remove(3)
+        self.assertNotIn(3, self.members())
+
+    def test_probing_finds_nearest_neighbours(self):
+        self.ivf.train(self.matrix)
+        query = self.matrix.vectors[42]
+        slots = self.ivf.candidates(query)
+        found = slots[top_k(self.matrix.cosine(query, slots), 5)]
+        self.assertEqual(found[0], 42)
+        exact = top_k(self.matrix.cosine(query), 5)
+        self.assertGreaterEqual(len(set(found) & set(exact)), 4)
+
+        everything = self.ivf.candidates(query, nprobe=self.ivf.nlist)
+        self.assertEqual(sorted(everything.tolist()), list(range(400)))
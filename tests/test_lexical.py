@@ -0,0 +1,52 @@
+from unittest import TestCase
+
+import numpy as np
+
+from autogpt.memory.lexical import BM25Index, tokenize
+
+
+class TestBM25Index(TestCase):
+    """
+    Test cases for the BM25 keyword index of the local memory backend.
+    """
+
+    def test_tokenize_keeps_identifiers_whole_and_split(self):
+        self.assertEqual(
+            tokenize("Wrote src/main.py, see https://x.io"),
+            [
+                "wrote",
+                "src/main.py",
+                "src",
+                "main",
+                "py",
+                "see",
+                "https://x.io",
+                "https",
+                "x",
+                "io",
+            ],
+        )
+
+    def test_tokenize_drops_stopwords_but_not_identifiers(self):
+        self.assertEqual(tokenize("What is in the to-do list?"), ["to-do", "list"])
+
+    def test_exact_identifier_ranks_first(self):
+        index = BM25Index()
+        index.add(0, "Ran tests for utils.py, all green")
+        index.add(1, "Edited main.py and added a main loop")
+        index.add(2, "Read the README of the project")
+        scores = index.scores("error in main.py", 3)
+        self.assertEqual(int(np.argmax(scores)), 1)
+        self.assertEqual(scores[2], 0)
+
+    def test_remove_and_replace_update_postings(self):
+        index = BM25Index()
+        index.add(0, "alpha beta")
+        index.add(1, "alpha")
+        index.remove(0)
+        self.assertEqual(len(index), 1)
+        self.assertNotIn("beta", index._postings)
+        index.add(1, "gamma")
+        self.assertEqual(index.scores("alpha", 2).tolist(), [0, 0])
+        self.assertGreater(index.scores("gamma", 2)[1], 0)
+        self.assertEqual(index._total, 1)
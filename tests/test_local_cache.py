@@ -0,0 +1,668 @@
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import orjson
+
+from autogpt.config.singleton import Singleton
+from autogpt.memory import local
+from autogpt.memory.base import query_embedding_cache
+from autogpt.memory.local import EMBED_DIM, LocalCache, _entry_bytes
+
+
+def fake_embedding(text):
+    """Deterministic unit vector derived from the text, no network needed."""
+    seed = int.from_bytes(local._hash_text(text)[:8].encode(), "little") % 2**32
+    vector = np.random.default_rng(seed).standard_normal(EMBED_DIM)
+    return (vector / np.linalg.norm(vector)).astype(np.float32).tolist()
+
+
+def MockConfig(memory_index):
+    return type(
+        "MockConfig",
+        (object,),
+        {
+            "debug_mode": False,
+            "continuous_mode": False,
+            "speak_mode": False,
+            "memory_index": memory_index,
+        },
+    )
+
+
+def shared_writer(index, name, count):
+    """Add entries to a shared index from a separate process."""
+    Singleton._instances.pop(LocalCache, None)
+    with patch.object(local, "get_ada_embedding", side_effect=fake_embedding):
+        cfg = MockConfig(index)
+        cfg.memory_shared = True
+        cfg.memory_max_items = 1000
+        cfg.memory_max_bytes = 10**9
+        cache = LocalCache(cfg)
+        for i in range(count):
+            cache.add(f"{name} note {i}")
+        cache.close()
+
+
+class TestLocalCache(unittest.TestCase):
+    """
+    Test cases for the LocalCache memory backend and its on-disk format.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.index = os.path.join(self.tmpdir, "auto-gpt")
+        patcher = patch.object(local, "get_ada_embedding", side_effect=fake_embedding)
+        self.embed = patcher.start()
+        self.addCleanup(patcher.stop)
+        query_embedding_cache.clear()
+        self.cache = self.new_cache()
+
+    def tearDown(self):
+        self.close(self.cache)
+        Singleton._instances.pop(LocalCache, None)
+        shutil.rmtree(self.tmpdir)
+
+    @staticmethod
+    def close(cache):
+        cache.close()
+
+    def new_cache(self, **settings):
+        """LocalCache is a singleton, so drop the cached instance first."""
+        Singleton._instances.pop(LocalCache, None)
+        cfg = MockConfig(self.index)
+        for name, value in settings.items():
+            setattr(cfg, name, value)
+        return LocalCache(cfg)
+
+    def test_add_and_get_relevant(self):
+        self.cache.add("The quick brown fox")
+        self.cache.add("Machine learning notes")
+        result = self.cache.get_relevant("Machine learning notes", 1)
+        self.assertEqual(result[0]["content"], "Machine learning notes")
+
+    def test_get_relevant_many_matches_single_queries(self):
+        texts = [f"note number {i}" for i in range(20)]
+        for text in texts:
+            self.cache.add(text)
+        queries = ["note number 3", "note number 17"]
+        self.assertEqual(
+            self.cache.get_relevant_many(queries, 4),
+            [self.cache.get_relevant(query, 4) for query in queries],
+        )
+        self.assertEqual(
+            self.cache.get_relevant_many(queries, 1)[1][0]["content"], queries[1]
+        )
+
+    def test_hybrid_search_finds_exact_identifiers(self):
+        self.cache.add(
+            "Command execute_python_file returned: wrote report to out/summary.md"
+        )
+        for i in range(30):
+            self.cache.add(f"Thought about the plan, step {i}")
+        result = self.cache.get_relevant(
+            "did I already write out/summary.md", 1, mode="hybrid"
+        )
+        self.assertIn("out/summary.md", result[0]["content"])
+        vector = self.cache.get_relevant(
+            "did I already write out/summary.md", 1, mode="vector"
+        )
+        self.assertNotIn("out/summary.md", vector[0]["content"])
+
+    def test_hybrid_search_prefers_exact_filename_over_near_duplicate(self):
+        rng = np.random.default_rng(0)
+        query, *noise = rng.standard_normal((3, EMBED_DIM))
+
+        def unit(vector):
+            return (vector / np.linalg.norm(vector)).tolist()
+
+        vectors = {
+            "out/report_v2.md": unit(query),
+            "Saved the quarterly report to out/report_v1.md": unit(
+                query + 0.3 * noise[0]
+            ),
+            "Saved the quarterly report to out/report_v2.md": unit(
+                query + 0.8 * noise[1]
+            ),
+        }
+        self.embed.side_effect = lambda text: vectors.get(text) or fake_embedding(text)
+        for text in list(vectors)[1:]:
+            self.cache.add(text)
+        for i in range(10):
+            self.cache.add(f"Thought about the plan, step {i}")
+        vector = self.cache.get_relevant("out/report_v2.md", 1, mode="vector")
+        self.assertIn("report_v1", vector[0]["content"])
+        hybrid = self.cache.get_relevant("out/report_v2.md", 1, mode="hybrid")
+        self.assertIn("report_v2", hybrid[0]["content"])
+
+    def test_weak_keyword_matches_are_not_scaled_up(self):
+        self.close(self.cache)
+        self.cache = self.new_cache(memory_search_mode="hybrid")
+        for text in ("Read the plan", "Wrote the plan down", "Listed the files"):
+            self.cache.add(text)
+        self.assertEqual(self.cache._lexical_scores("what is the").max(), 0)
+        weak = self.cache._lexical_scores("the plan for today")
+        self.assertGreater(weak.max(), 0)
+        self.assertLess(weak.max(), 0.5)
+
+    def test_lexical_mode_skips_embedding_and_tracks_evictions(self):
+        self.close(self.cache)
+        self.cache = self.new_cache(memory_search_mode="lexical", memory_max_items=2)
+        self.cache.add("fetched https://example.com/a")
+        self.cache.add("unrelated note")
+        calls = self.embed.call_count
+        result = self.cache.get_relevant("https://example.com/a", 5)
+        self.assertEqual(
+            [e["content"] for e in result], ["fetched https://example.com/a"]
+        )
+        self.assertEqual(self.embed.call_count, calls)
+        self.cache.add("another note")
+        self.assertEqual(self.cache.get_relevant("https://example.com/a", 5), [])
+        self.assertEqual(
+            len(self.new_cache(memory_search_mode="lexical").data.lexical), 2
+        )
+
+    def test_repeated_queries_are_embedded_once(self):
+        self.cache.add("alpha")
+        calls = self.embed.call_count
+        self.cache.get_relevant("what about\nalpha", 1)
+        self.cache.get_relevant("what about alpha", 1)
+        self.cache.get_relevant_many(["what about alpha", "beta"], 1)
+        self.assertEqual(self.embed.call_count, calls + 2)
+        self.assertEqual(query_embedding_cache.stats()["hits"], 2)
+
+    def test_search_by_tags(self):
+        self.cache.add("research notes", tags=["action", "research"])
+        self.cache.add("code change", tags=["action", "code"])
+        self.cache.add("plain note")
+        self.assertEqual(
+            [e["content"] for e in self.cache.search(["code", "research"])],
+            ["research notes", "code change"],
+        )
+        self.assertEqual(
+            [
+                e["content"]
+                for e in self.cache.search(["action", "code"], match_all=True)
+            ],
+            ["code change"],
+        )
+        self.assertEqual(self.cache.search(["missing"]), [])
+
+    def test_get_relevant_filters_by_tags(self):
+        self.cache.add("alpha", tags=["research"])
+        self.cache.add("beta", tags=["code"])
+        result = self.cache.get_relevant("alpha", 5, tags=["code"])
+        self.assertEqual([e["content"] for e in result], ["beta"])
+
+    def test_tag_index_survives_mark_done_eviction_and_reload(self):
+        self.close(self.cache)
+        with patch.object(local, "MAX_MEMORY_ITEMS", 2):
+            cache = self.new_cache()
+            cache.add("first", tags=["in-progress"])
+            cache.add("second", tags=["in-progress"])
+            self.assertEqual(cache.mark_done(), 2)
+            cache.add("third", tags=["in-progress"])
+            self.assertEqual([e["content"] for e in cache.search(["done"])], ["second"])
+            self.assertEqual(
+                [e["content"] for e in cache.search(["in-progress"])], ["third"]
+            )
+
+            reloaded = self.new_cache()
+            self.assertEqual(
+                [e["content"] for e in reloaded.search(["done"])], ["second"]
+            )
+            self.assertEqual(reloaded.search(["in-progress"])[0]["content"], "third")
+        self.cache = cache
+
+    def test_duplicates_skip_embedding_across_whole_store(self):
+        for i in range(60):
+            self.cache.add(f"entry {i}")
+        calls = self.embed.call_count
+        first = self.cache.data.entries()[0]
+        self.assertIs(self.cache.add("entry 0"), first)
+        self.assertEqual(self.embed.call_count, calls)
+        self.assertEqual(len(self.cache.data.embeddings), 60)
+        self.assertIn(first["hash"], self.new_cache().data.hashes)
+
+    def test_async_adds_and_searches(self):
+        async def main():
+            added = await asyncio.gather(
+                *(self.cache.aadd(f"note {i}") for i in range(4))
+            )
+            found = await self.cache.aget_relevant("note 2", 1)
+            return added, found
+
+        added, found = asyncio.run(main())
+        contents = sorted(entry["content"] for entry in added)
+        self.assertEqual(contents, [f"note {i}" for i in range(4)])
+        self.assertEqual(found[0]["content"], "note 2")
+        self.assertEqual(len(self.cache.data.texts), 4)
+
+    def test_add_many_embeds_once_and_dedupes(self):
+        self.cache.add("known")
+        with patch.object(
+            local,
+            "get_ada_embeddings",
+            side_effect=lambda texts: [fake_embedding(t) for t in texts],
+        ) as batch:
+            entries = self.cache.add_many(
+                ["known", "new a", "Command Error: boom", "new b", "new a"],
+                tags=["ingest"],
+            )
+        self.assertEqual(batch.call_count, 1)
+        self.assertEqual(batch.call_args[0][0], ["new a", "new b"])
+        self.assertEqual(entries[2], "")
+        self.assertIs(entries[1], entries[4])
+        self.assertEqual(
+            [e["content"] for e in self.cache.search(["ingest"])], ["new a", "new b"]
+        )
+        reloaded = self.new_cache()
+        self.assertEqual(
+            [e["content"] for e in reloaded.data.entries()], ["known", "new a", "new b"]
+        )
+
+    def test_touch_refreshes_recency(self):
+        self.close(self.cache)
+        with patch.object(local, "MAX_MEMORY_ITEMS", 2):
+            cache = self.new_cache()
+            cache.add("keep me")
+            cache.add("other")
+            cache.add("keep me", touch=True)
+            cache.add("newest")
+            contents = [e["content"] for e in cache.data.entries()]
+            self.assertEqual(contents, ["keep me", "newest"])
+            self.assertEqual(
+                [e["content"] for e in self.new_cache().data.entries()], contents
+            )
+        self.cache = cache
+
+    def test_save_writes_binary_snapshot(self):
+        self.cache.add("first entry", tags=["action"])
+        self.cache.add("second entry")
+        self.cache.compact()
+        self.assertTrue(os.path.exists(f"{self.index}.npy"))
+        self.assertTrue(os.path.exists(f"{self.index}.jsonl"))
+
+        reloaded = self.new_cache()
+        self.assertEqual(
+            [e["content"] for e in reloaded.data.entries()],
+            ["first entry", "second entry"],
+        )
+        self.assertEqual(reloaded.data.embeddings.shape, (2, EMBED_DIM))
+        np.testing.assert_allclose(
+            reloaded.data.embeddings.vectors, self.cache.data.embeddings.vectors
+        )
+
+    def test_legacy_json_is_migrated(self):
+        entry = {"id": "a", "tags": [], "content": "legacy", "hash": "h"}
+        legacy = {
+            "texts": [entry],
+            "embeddings": np.ones((1, EMBED_DIM), dtype=np.float32),
+        }
+        with open(f"{self.index}.json", "wb") as f:
+            f.write(orjson.dumps(legacy, option=orjson.OPT_SERIALIZE_NUMPY))
+
+        cache = self.new_cache()
+        self.assertEqual(cache.data.entries(), [entry])
+        self.assertEqual(cache.data.embeddings.shape, (1, EMBED_DIM))
+        self.assertFalse(os.path.exists(f"{self.index}.json"))
+        self.assertTrue(os.path.exists(f"{self.index}.npy"))
+        self.assertEqual(local.read_cache_entries(self.index), [entry])
+
+    def test_read_cache_entries_matches_a_full_load(self):
+        self.close(self.cache)
+        cache = self.new_cache(memory_max_items=4, memory_eviction_policy="lru")
+        for i in range(3):
+            cache.add(f"note {i}", tags=["in-progress"])
+        cache.compact()
+        cache.add("note 0", touch=True)
+        for i in range(4):
+            cache.add(f"later {i}")
+        cache.mark_done()
+        cache.close()
+        self.assertEqual(
+            local.read_cache_entries(self.index),
+            local.load_cache_content(self.index).entries(),
+        )
+        cache = self.new_cache(memory_max_items=6, memory_eviction_policy="lru")
+        for text in ("after the limit", "note 1"):
+            cache.add(text)
+        cache.close()
+        entries = local.read_cache_entries(self.index)
+        self.assertEqual(entries, local.load_cache_content(self.index).entries())
+        self.assertEqual(entries[-1]["content"], "after the limit")
+        cache = self.new_cache(memory_max_items=6)
+        cache.clear()
+        for text in ("after the clear", "one more"):
+            cache.add(text)
+        cache.close()
+        cache = self.new_cache(memory_max_items=1)
+        self.cache = cache
+        with patch.object(local, "EmbeddingMatrix", side_effect=AssertionError):
+            entries = local.read_cache_entries(self.index)
+        self.assertEqual(entries, local.load_cache_content(self.index).entries())
+        self.assertEqual([e["content"] for e in entries], ["one more"])
+
+    def test_read_cache_entries_leaves_legacy_json_alone(self):
+        entry = {"id": "a", "tags": ["in-progress"], "content": "legacy", "hash": "h"}
+        with open(f"{self.index}.json", "wb") as f:
+            f.write(orjson.dumps({"texts": [entry], "embeddings": [[1.0] * EMBED_DIM]}))
+        self.assertEqual(local.read_cache_entries(self.index), [entry])
+        self.assertTrue(os.path.exists(f"{self.index}.json"))
+        self.assertFalse(os.path.exists(f"{self.index}.npy"))
+
+    def test_journal_is_replayed_on_load(self):
+        self.cache.add("essay draft", tags=["action"])
+        self.cache.add("unrelated note")
+        self.cache.mark_done(["action"])
+        self.assertFalse(os.path.exists(f"{self.index}.npy"))
+
+        reloaded = self.new_cache()
+        self.assertEqual(len(reloaded.data.embeddings), 2)
+        self.assertEqual(reloaded.data.entries()[0]["tags"], ["action", "done"])
+        np.testing.assert_allclose(
+            reloaded.data.embeddings.vectors, self.cache.data.embeddings.vectors
+        )
+
+    def switch_provider(self):
+        """Patch in a provider of another model and dimension, as a changed
+        EMBEDDING_PROVIDER would leave it."""
+        provider = SimpleNamespace(model="local-hashing-8", dimension=8)
+        switched = contextlib.ExitStack()
+        self.addCleanup(switched.close)
+        switched.enter_context(patch.object(local, "embedding_provider", provider))
+        switched.enter_context(patch.object(local, "EMBED_DIM", 8))
+        switched.enter_context(
+            patch.object(local, "get_ada_embedding", side_effect=lambda text: [1.0] * 8)
+        )
+        return switched
+
+    def assert_set_aside(self, contents):
+        """The old memory sits untouched under a new index; return its name."""
+        prefix = f"{os.path.basename(self.index)}-"
+        moved = {
+            name.split(".")[0]
+            for name in os.listdir(self.tmpdir)
+            if name.startswith(prefix)
+        }
+        self.assertEqual(len(moved), 1)
+        aside = os.path.join(self.tmpdir, moved.pop())
+        self.assertEqual(
+            [e["content"] for e in local.read_cache_entries(aside)], contents
+        )
+        return aside
+
+    def test_switching_provider_sets_a_journal_aside(self):
+        self.cache.add("embedded by the old provider")
+        self.close(self.cache)
+        self.switch_provider()
+        self.cache = self.new_cache()
+        self.assertEqual(len(self.cache.data.embeddings), 0)
+        self.cache.add("embedded by the new one")
+        self.assertEqual(self.cache.data.embeddings.shape, (1, 8))
+        self.assert_set_aside(["embedded by the old provider"])
+
+    def test_switching_provider_sets_a_snapshot_aside(self):
+        self.cache.add("in the snapshot")
+        self.cache.compact()
+        self.cache.add("in the journal")
+        self.close(self.cache)
+        with open(f"{self.index}.jsonl", "rb") as f:
+            header = orjson.loads(f.readline())["__snapshot__"]
+        self.assertEqual(
+            (header["model"], header["dim"]),
+            (local.embedding_provider.model, EMBED_DIM),
+        )
+        switched = self.switch_provider()
+        self.cache = self.new_cache()
+        self.assertEqual(len(self.cache.data.embeddings), 0)
+        self.cache.add("embedded by the new one")
+        self.cache.compact()
+        self.assertEqual(
+            [e["content"] for e in local.read_cache_entries(self.index)],
+            ["embedded by the new one"],
+        )
+        aside = self.assert_set_aside(["in the snapshot", "in the journal"])
+        # Back on the old provider, the set-aside index opens as it was.
+        self.close(self.cache)
+        switched.close()
+        self.index = aside
+        cache = self.cache = self.new_cache()
+        self.assertEqual(cache.data.embeddings.shape, (2, EMBED_DIM))
+
+    def test_torn_journal_tail_is_dropped(self):
+        self.cache.add("complete record")
+        self.close(self.cache)
+        with open(f"{self.index}.wal", "ab") as f:
+            f.write(b'{"op": "add", "seq": 2, "entry"')
+
+        reloaded = self.new_cache()
+        self.assertEqual(
+            [e["content"] for e in reloaded.data.entries()], ["complete record"]
+        )
+        reloaded.add("after recovery")
+        self.close(reloaded)
+        self.assertEqual(len(self.new_cache().data.embeddings), 2)
+
+    def test_compaction_truncates_journal(self):
+        for i in range(5):
+            self.cache.add(f"entry {i}")
+        self.cache.compact()
+        self.assertEqual(os.path.getsize(f"{self.index}.wal"), 0)
+        self.cache.add("entry after snapshot")
+
+        reloaded = self.new_cache()
+        self.assertEqual(len(reloaded.data.embeddings), 6)
+        self.assertEqual(reloaded.data.seq, self.cache.data.seq)
+
+    def test_item_cap_recycles_oldest_slot(self):
+        self.close(self.cache)
+        with patch.object(local, "MAX_MEMORY_ITEMS", 3):
+            cache = self.new_cache()
+            for i in range(5):
+                cache.add(f"entry {i}")
+            contents = [e["content"] for e in cache.data.entries()]
+            self.assertEqual(contents, ["entry 2", "entry 3", "entry 4"])
+            self.assertEqual(cache.data.embeddings.capacity, 3)
+            # Replay recycles the same slots the writer did.
+            reloaded = self.new_cache()
+            self.assertEqual(reloaded.data.texts, cache.data.texts)
+            cache.compact()
+            self.assertEqual(self.new_cache().data.texts, cache.data.texts)
+        self.cache = cache
+
+    def test_ivf_index_tracks_adds_evictions_and_clear(self):
+        self.close(self.cache)
+        cache = self.new_cache(memory_max_items=50, memory_ann_index="ivf")
+        cache.data.ann.min_train_rows = 16
+        for i in range(60):
+            cache.add(f"memory {i}")
+        self.assertTrue(cache.data.ann.trained)
+        self.assertEqual(cache.get_relevant("memory 42", 1)[0]["content"], "memory 42")
+        self.assertEqual(len(cache.get_relevant("memory 42", 5)), 5)
+        # Entries recycled by the item cap left the index along with the store.
+        self.assertEqual(int(cache.data.ann._counts.sum()), 50)
+        contents = [e["content"] for e in cache.get_relevant("memory 3", 50)]
+        self.assertNotIn("memory 3", contents)
+
+        cache.clear()
+        self.assertFalse(cache.data.ann.trained)
+        self.assertEqual(cache.get_relevant("memory 42", 1), [])
+        self.cache = cache
+
+    def test_compressed_storage_shrinks_snapshot_and_converts_on_load(self):
+        self.close(self.cache)
+        cache = self.new_cache(memory_compression="int8")
+        for i in range(20):
+            cache.add(f"memory {i}")
+        self.assertEqual(
+            cache.data.sizes[0], _entry_bytes(cache.data.texts[0], EMBED_DIM)
+        )
+        cache.compact()
+        self.assertEqual(np.load(f"{self.index}.npy").dtype, np.int8)
+        self.close(cache)
+
+        cache = self.new_cache(memory_compression="float16")
+        self.assertEqual(cache.data.embeddings.dtype, np.float16)
+        self.assertEqual(cache.get_relevant("memory 7", 1)[0]["content"], "memory 7")
+        self.cache = cache
+
+    def test_pq_index_reranks_candidates(self):
+        self.close(self.cache)
+        cache = self.new_cache(
+            memory_ann_index="pq",
+            memory_pq_rerank=8,
+            memory_search_mode="vector",
+            memory_max_items=300,
+            memory_max_bytes=10**9,
+        )
+        cache.data.ann.min_train_rows = 300
+        for i in range(300):
+            cache.add(f"memory {i}")
+        self.assertTrue(cache.data.ann.trained)
+        self.assertEqual(cache.data.ann.code_bytes, 96)
+        self.assertEqual(cache.get_relevant("memory 42", 1)[0]["content"], "memory 42")
+        self.assertEqual(len(cache.get_relevant("memory 42", 20)), 20)
+        self.cache = cache
+
+    def test_pinned_tags_are_evicted_last(self):
+        self.close(self.cache)
+        cache = self.new_cache(memory_max_items=3)
+        cache.add("essay outline", tags=["in-progress"])
+        cache.add("note a")
+        cache.add("note b")
+        cache.add("note c")
+        contents = [e["content"] for e in cache.data.entries()]
+        self.assertEqual(contents, ["essay outline", "note b", "note c"])
+        self.assertEqual(
+            [e["content"] for e in self.new_cache(memory_max_items=3).data.entries()],
+            contents,
+        )
+        self.cache = cache
+
+    def test_lru_policy_keeps_retrieved_entries(self):
+        self.close(self.cache)
+        cache = self.new_cache(memory_max_items=3, memory_eviction_policy="lru")
+        for name in ("a", "b", "c"):
+            cache.add(f"note {name}")
+        cache.get_relevant("note a", 1)
+        cache.add("note d")
+        contents = {e["content"] for e in cache.data.entries()}
+        self.assertEqual(contents, {"note a", "note c", "note d"})
+        self.cache = cache
+
+    def test_lfu_policy_and_access_stats_survive_compaction(self):
+        self.close(self.cache)
+        cache = self.new_cache(memory_max_items=3, memory_eviction_policy="lfu")
+        for name in ("a", "b", "c"):
+            cache.add(f"note {name}")
+        for _ in range(2):
+            cache.get_relevant("note a", 1)
+        cache.get_relevant("note b", 1)
+        cache.compact()
+        self.close(cache)
+
+        cache = self.new_cache(memory_max_items=3, memory_eviction_policy="lfu")
+        cache.add("note d")
+        cache.add("note e")
+        contents = {e["content"] for e in cache.data.entries()}
+        self.assertEqual(contents, {"note a", "note b", "note e"})
+        self.cache = cache
+
+    def test_byte_cap_uses_tracked_sizes(self):
+        self.close(self.cache)
+        cache = self.new_cache(memory_max_bytes=3 * local.ROW_BYTES + 1000)
+        for i in range(5):
+            cache.add(f"entry {i}")
+        self.assertEqual(len(cache.data.embeddings), 3)
+        self.assertEqual(
+            cache.data.nbytes, sum(local._entry_bytes(e) for e in cache.data.entries())
+        )
+        self.assertLessEqual(cache.data.nbytes, cache.max_bytes)
+        self.cache = cache
+
+    def test_background_writer_batches_journal_writes(self):
+        self.close(self.cache)
+        cache = self.new_cache(memory_flush_interval_ms=60_000, memory_flush_batch=3)
+        cache.add("first")
+        cache.add("second")
+        self.assertEqual(len(cache._pending), 2)
+        cache.add("third")
+        # The third record fills a batch, so the writer journals all three.
+        for _ in range(100):
+            if not cache._pending:
+                break
+            time.sleep(0.01)
+        self.assertEqual(cache._pending, [])
+        cache.add("fourth")
+        cache.close()
+        self.assertIsNone(cache._writer)
+        self.cache = self.new_cache()
+        self.assertEqual(len(self.cache.data.embeddings), 4)
+
+    def test_background_writer_flushes_after_interval(self):
+        self.close(self.cache)
+        cache = self.new_cache(memory_flush_interval_ms=20)
+        cache.add("only entry")
+        for _ in range(100):
+            if os.path.exists(f"{self.index}.wal") and not cache._pending:
+                break
+            time.sleep(0.01)
+        self.assertEqual(
+            [e["content"] for e in local.read_cache_entries(self.index)], ["only entry"]
+        )
+        self.cache = cache
+
+    def test_shared_index_merges_other_writers(self):
+        self.close(self.cache)
+        first = self.new_cache(memory_shared=True)
+        second = self.new_cache(memory_shared=True)
+        first.add("written by first", tags=["action"])
+        self.assertEqual(
+            second.get_relevant("written by first", 1)[0]["content"], "written by first"
+        )
+        second.add("written by second", tags=["action"])
+        first.mark_done(["action"])
+        self.assertEqual(len(second.search(["done"])), 2)
+
+        first.compact()
+        second.add("after compaction")
+        self.assertEqual(first.get_stats()[0], 3)
+        self.assertEqual(
+            [e["content"] for e in first.data.entries()],
+            ["written by first", "written by second", "after compaction"],
+        )
+        self.assertEqual(first.data.texts, second.data.texts)
+        self.close(second)
+        self.cache = first
+
+    def test_shared_index_survives_concurrent_processes(self):
+        self.close(self.cache)
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=shared_writer, args=(self.index, name, 25))
+            for name in ("alpha", "beta", "gamma")
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual([worker.exitcode for worker in workers], [0, 0, 0])
+        self.cache = self.new_cache(memory_shared=True, memory_max_items=1000)
+        self.assertEqual(len(self.cache.data.embeddings), 75)
+
+    def test_get_stats(self):
+        self.cache.add("Sample text")
+        self.assertEqual(self.cache.get_stats(), (1, (1, EMBED_DIM)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from autogpt.config.singleton import Singleton
+from autogpt.memory import local, migrate
+from autogpt.memory.local import EMBED_DIM, LocalCache
+
+
+def fake_embeddings(texts):
+    vectors = []
+    for text in texts:
+        vector = np.random.default_rng(sum(map(ord, text))).standard_normal(EMBED_DIM)
+        vectors.append((vector / np.linalg.norm(vector)).tolist())
+    return vectors
+
+
+class FlakyTarget:
+    """Accepts `batches` batches, then fails like a lost connection would."""
+
+    def __init__(self, target, batches):
+        self.target, self.batches = target, batches
+
+    def import_records(self, records):
+        if not self.batches:
+            raise ConnectionError("lost")
+        self.batches -= 1
+        return self.target.import_records(records)
+
+
+class TestMigrate(unittest.TestCase):
+    """
+    Test cases for streaming memories between backends.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.checkpoint = os.path.join(self.tmpdir, "checkpoint.json")
+        patchers = [
+            patch.object(local, "get_ada_embeddings", side_effect=fake_embeddings),
+            patch.object(
+                local,
+                "get_ada_embedding",
+                side_effect=lambda text: fake_embeddings([text])[0],
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.source = self.open("source")
+        self.source.add_many([f"note {i}" for i in range(25)], tags=["notes"])
+        self.source.add("Write the essay", task_id="task_1")
+
+    def open(self, name, max_items=1000):
+        cfg = SimpleNamespace(
+            memory_index=os.path.join(self.tmpdir, name),
+            memory_max_items=max_items,
+            memory_max_bytes=10**9,
+            memory_settings={"auto_tag_in_progress": False},
+        )
+        memory = migrate.open_backend("local", migrate.backend_config(cfg, "local"))
+        self.addCleanup(memory.close)
+        self.addCleanup(Singleton._instances.pop, LocalCache, None)
+        return memory
+
+    def test_records_keep_vectors_and_metadata(self):
+        target = self.open("target")
+        with (
+            patch.object(local, "get_ada_embeddings", side_effect=AssertionError),
+            patch.object(local, "get_ada_embedding", side_effect=AssertionError),
+        ):
+            copied = migrate.migrate(
+                self.source, target, batch_size=10, log=lambda line: None
+            )
+        self.assertEqual(copied, 26)
+        source_entries, target_entries = (
+            self.source.data.entries(),
+            target.data.entries(),
+        )
+        self.assertEqual(
+            [(e["content"], e["tags"], e["id"]) for e in source_entries],
+            [(e["content"], e["tags"], e["id"]) for e in target_entries],
+        )
+        self.assertEqual(target_entries[0]["timestamp"], source_entries[0]["timestamp"])
+        np.testing.assert_allclose(
+            target.data.embeddings.rows(target.data.embeddings.order()),
+            self.source.data.embeddings.rows(self.source.data.embeddings.order()),
+            atol=1e-6,
+        )
+
+    def test_interrupted_migration_resumes_from_checkpoint(self):
+        target = self.open("target")
+        lines = []
+        with self.assertRaises(ConnectionError):
+            migrate.migrate(
+                self.source, FlakyTarget(target, 2), 10, self.checkpoint, lines.append
+            )
+        self.assertEqual(
+            migrate.read_checkpoint(self.checkpoint), {"cursor": 20, "migrated": 20}
+        )
+        self.assertEqual(
+            migrate.migrate(self.source, target, 10, self.checkpoint, lines.append), 26
+        )
+        self.assertEqual(len(target.data.entries()), 26)
+        self.assertIn("Resuming after 20 records.", lines)
+        self.assertTrue(lines[-1].startswith("26 records migrated ("))
+        self.assertEqual(
+            migrate.migrate(self.source, target, 10, self.checkpoint, lines.append), 26
+        )
+        self.assertTrue(lines[-1].endswith("nothing to do."))
+
+    def test_dimension_mismatch_is_refused(self):
+        source = SimpleNamespace(
+            export_records=lambda cursor, size: iter([([{"vector": [0.0] * 3}], 1)])
+        )
+        with self.assertRaises(ValueError):
+            migrate.migrate(source, self.open("target"), log=lambda line: None)
+
+    def test_target_smaller_than_the_source_is_refused(self):
+        target = self.open("target", max_items=15)
+        with self.assertRaises(ValueError):
+            migrate.migrate(
+                self.source, target, 10, self.checkpoint, log=lambda line: None
+            )
+        self.assertEqual(len(target.data.entries()), 10)
+        self.assertEqual(
+            migrate.read_checkpoint(self.checkpoint), {"cursor": 10, "migrated": 10}
+        )
+        target.close()
+        target = self.open("target", max_items=30)
+        copied = migrate.migrate(
+            self.source, target, 10, self.checkpoint, log=lambda line: None
+        )
+        self.assertEqual(copied, 26)
+        self.assertEqual(len(target.data.entries()), 26)
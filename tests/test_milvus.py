@@ -0,0 +1,136 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from autogpt.config.singleton import Singleton
+
+try:
+    import milvus_lite  # noqa: F401
+
+    from autogpt.memory import milvus
+except ImportError:
+    milvus = None
+
+
+def fake_embedding(text):
+    vector = np.random.default_rng(sum(map(ord, text))).standard_normal(8)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class TestMilvusExpressions(unittest.TestCase):
+    """
+    Test cases for the index, search and filter parameters of the Milvus backend.
+    """
+
+    @unittest.skipIf(milvus is None, "pymilvus is not installed")
+    def test_parameters(self):
+        cfg = SimpleNamespace(milvus_hnsw_ef=16, milvus_nprobe=32)
+        self.assertEqual(milvus.search_params("HNSW", cfg, 50)["params"], {"ef": 50})
+        self.assertEqual(
+            milvus.search_params("IVF_PQ", cfg, 5)["params"], {"nprobe": 32}
+        )
+        self.assertEqual(milvus.pq_segments(1536), 192)
+        self.assertEqual(milvus.pq_segments(6), 3)
+        self.assertEqual(
+            milvus.filter_expr(["a", 'b"c'], match_all=True, since=5),
+            'array_contains_all(tags, ["a", "b\\"c"]) and timestamp >= 5.0',
+        )
+        self.assertEqual(milvus.filter_expr(), "")
+
+
+@unittest.skipIf(milvus is None, "pymilvus or milvus-lite is not installed")
+class TestMilvusMemory(unittest.TestCase):
+    """
+    Test cases for the Milvus backend against Milvus Lite.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.address = os.path.join(cls.directory.name, "memory.db")
+
+    @classmethod
+    def tearDownClass(cls):
+        milvus.connections.disconnect("default")
+        cls.directory.cleanup()
+
+    def setUp(self):
+        patchers = [
+            patch.object(milvus, "embedding_provider", SimpleNamespace(dimension=8)),
+            patch.object(milvus, "get_ada_embedding", side_effect=fake_embedding),
+            patch.object(
+                milvus,
+                "get_ada_embeddings",
+                side_effect=lambda texts: [fake_embedding(text) for text in texts],
+            ),
+            patch.object(milvus, "get_query_embedding", side_effect=fake_embedding),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def new_memory(self, **settings):
+        Singleton._instances.pop(milvus.MilvusMemory, None)
+        self.addCleanup(Singleton._instances.pop, milvus.MilvusMemory, None)
+        settings.setdefault("milvus_index_type", "IVF_FLAT")
+        cfg = SimpleNamespace(
+            milvus_addr=self.address,
+            milvus_collection=self.id().rsplit(".", 1)[-1],
+            milvus_consistency="Strong",
+            **settings,
+        )
+        memory = milvus.MilvusMemory(cfg)
+        self.addCleanup(memory.collection.drop)
+        return memory
+
+    def test_bulk_adds_insert_in_batches(self):
+        memory = self.new_memory(milvus_flush_every=10)
+        with (
+            patch.object(milvus, "INSERT_BATCH", 4),
+            patch.object(
+                memory.collection, "insert", wraps=memory.collection.insert
+            ) as insert,
+            patch.object(
+                memory.collection, "flush", wraps=memory.collection.flush
+            ) as flush,
+        ):
+            messages = memory.add_many([f"text {i}" for i in range(10)])
+        self.assertEqual(insert.call_count, 3)
+        self.assertEqual(flush.call_count, 1)
+        self.assertEqual(len(messages), 10)
+        self.assertEqual(memory.get_stats(), "Entities num: 10")
+        self.assertEqual(memory.get("text 3"), ["text 3"])
+
+    def test_searches_filter_by_tags_and_time(self):
+        memory = self.new_memory()
+        memory.add("search result", tags=["search", "action"], task_id="task_1")
+        memory.add("essay draft", tags=["essay"])
+        self.assertEqual(
+            memory.get_relevant("search result", 5, tags=["essay"]), ["essay draft"]
+        )
+        self.assertEqual(
+            memory.get_relevant("x", 5, tags=["search", "essay"], match_all=True), []
+        )
+        self.assertEqual(
+            memory.get_relevant("x", 5, tags=["search", "action"], match_all=True),
+            ["search result"],
+        )
+        self.assertEqual(memory.get_relevant("x", 5, since=2**40), [])
+
+    def test_clear_leaves_an_empty_usable_collection(self):
+        memory = self.new_memory()
+        memory.add("old")
+        memory.clear()
+        memory.add("new")
+        self.assertEqual(memory.get_relevant("old", 5), ["new"])
+
+    def test_index_follows_the_configured_type(self):
+        memory = self.new_memory(milvus_index_type="HNSW")
+        self.assertEqual(memory.index_type, "FLAT")
+        self.assertEqual(memory.collection.index().params["index_type"], "FLAT")
+        memory = self.new_memory(milvus_index_type="IVF_FLAT", milvus_nlist=16)
+        self.assertEqual(memory.collection.index().params["index_type"], "IVF_FLAT")
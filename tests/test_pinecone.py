@@ -0,0 +1,166 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from autogpt.config.singleton import Singleton
+
+try:
+    from autogpt.memory import pinecone as pinecone_memory
+except ImportError:
+    pinecone_memory = None
+
+
+def matches(metadata, condition):
+    """The subset of Pinecone's metadata filter language the backend uses."""
+    if "$and" in condition:
+        return all(matches(metadata, clause) for clause in condition["$and"])
+    field, spec = next(iter(condition.items()))
+    op, value = next(iter(spec.items()))
+    stored = metadata.get(field)
+    if op == "$in":
+        stored = stored if isinstance(stored, list) else [stored]
+        return any(item in value for item in stored)
+    if op == "$gte":
+        return stored is not None and stored >= value
+    raise ValueError(op)
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Serves the data plane endpoints from the server's `namespaces` dict."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        server.requests.append((self.path, body))
+        vectors = server.namespaces.setdefault(body.get("namespace", ""), {})
+        if self.path == "/vectors/upsert":
+            for vector in body["vectors"]:
+                vectors[vector["id"]] = vector
+            reply = {"upsertedCount": len(body["vectors"])}
+        elif self.path == "/query":
+            query = np.asarray(body["vector"])
+            found = [
+                {
+                    "id": v["id"],
+                    "score": float(np.dot(query, v["values"])),
+                    "metadata": v["metadata"],
+                }
+                for v in vectors.values()
+                if not body.get("filter") or matches(v["metadata"], body["filter"])
+            ]
+            found.sort(key=lambda match: -match["score"])
+            reply = {"matches": found[: body["topK"]]}
+        elif self.path == "/vectors/delete":
+            vectors.clear()
+            reply = {}
+        else:
+            reply = {"totalVectorCount": sum(map(len, server.namespaces.values()))}
+        payload = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def fake_embedding(text):
+    vector = np.random.default_rng(sum(map(ord, text))).standard_normal(8)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+@unittest.skipIf(pinecone_memory is None, "pinecone-client is not installed")
+class TestPineconeMemory(unittest.TestCase):
+    """
+    Test cases for the Pinecone backend against a local stand-in of its API.
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+        self.server.namespaces, self.server.requests = {}, []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        patchers = [
+            patch.object(
+                pinecone_memory, "get_ada_embedding", side_effect=fake_embedding
+            ),
+            patch.object(
+                pinecone_memory,
+                "get_ada_embeddings",
+                side_effect=lambda texts: [fake_embedding(text) for text in texts],
+            ),
+            patch.object(
+                pinecone_memory, "get_query_embedding", side_effect=fake_embedding
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def new_memory(self, namespace=""):
+        Singleton._instances.pop(pinecone_memory.PineconeMemory, None)
+        self.addCleanup(Singleton._instances.pop, pinecone_memory.PineconeMemory, None)
+        cfg = SimpleNamespace(
+            pinecone_api_key="key",
+            pinecone_region="local",
+            pinecone_host=f"http://127.0.0.1:{self.server.server_port}",
+            pinecone_namespace=namespace,
+        )
+        memory = pinecone_memory.PineconeMemory(cfg)
+        self.addCleanup(memory.index.close)
+        return memory
+
+    def test_ids_are_content_hashes_that_survive_restarts(self):
+        self.new_memory().add("first")
+        memory = self.new_memory()
+        memory.add("second")
+        memory.add("first")
+        self.assertEqual(len(self.server.namespaces[""]), 2)
+        self.assertEqual(memory.get_stats(), {"totalVectorCount": 2})
+
+    def test_bulk_adds_upsert_in_batches_of_100(self):
+        memory = self.new_memory()
+        memory.add_many([f"text {i}" for i in range(250)], tags=["ingest"])
+        sizes = sorted(
+            len(body["vectors"])
+            for path, body in self.server.requests
+            if path == "/vectors/upsert"
+        )
+        self.assertEqual(sizes, [50, 100, 100])
+        self.assertEqual(len(self.server.namespaces[""]), 250)
+
+    def test_queries_filter_by_tags_and_time(self):
+        memory = self.new_memory()
+        memory.add("search result", tags=["search", "action"])
+        memory.add("essay draft", tags=["essay"])
+        self.assertEqual(
+            memory.get_relevant("search result", 5, tags=["essay"]), ["essay draft"]
+        )
+        self.assertEqual(
+            memory.get_relevant("x", 5, tags=["search", "action"], match_all=True),
+            ["search result"],
+        )
+        self.assertEqual(memory.get_relevant("x", 5, since=2**40), [])
+        both = memory.get_relevant_many(["search result", "essay draft"], 1)
+        self.assertEqual(both, [["search result"], ["essay draft"]])
+
+    def test_session_namespaces_are_isolated(self):
+        with patch.object(pinecone_memory, "datetime") as clock:
+            clock.utcnow.return_value.strftime.return_value = "run1"
+            first = self.new_memory("agent-{session}")
+        first.add("from run 1")
+        second = self.new_memory("agent-2")
+        second.add("from run 2")
+        second.clear()
+        self.assertEqual(first.namespace, "agent-run1")
+        self.assertEqual(len(self.server.namespaces["agent-run1"]), 1)
+        self.assertEqual(self.server.namespaces["agent-2"], {})
+        self.assertEqual(first.get_relevant("x", 5), ["from run 1"])
@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+import numpy as np
+
+from autogpt.memory.matrix import EmbeddingMatrix, top_k
+from autogpt.memory.pq import PQIndex
+from tests.test_ivf import clustered
+
+
+class TestPQIndex(TestCase):
+    """
+    Test cases for the product quantization index.
+    """
+
+    def setUp(self):
+        self.matrix = EmbeddingMatrix(16)
+        self.matrix.extend(clustered(400))
+        self.pq = PQIndex(subspaces=5, rerank=20, min_train_rows=100)
+
+    def test_training_picks_an_even_split_and_codes_every_row(self):
+        self.assertFalse(PQIndex(min_train_rows=1000).needs_training(400))
+        self.pq.train(self.matrix)
+        self.assertEqual(self.pq.code_bytes, 4)
+        self.assertEqual(self.pq.codebooks.shape, (4, 256, 4))
+        self.assertEqual(int(self.pq._coded.sum()), 400)
+
+    def test_table_scores_approximate_cosine(self):
+        self.pq.train(self.matrix)
+        query = self.matrix.vectors[42]
+        approx = self.pq.scores(query)[:400]
+        exact = self.matrix.cosine(query)
+        self.assertGreater(np.corrcoef(approx, exact)[0, 1], 0.9)
+
+    def test_reranked_candidates_find_nearest_neighbours(self):
+        self.pq.train(self.matrix)
+        query = self.matrix.vectors[42]
+        slots = self.pq.candidates(query)
+        self.assertEqual(len(slots), 20)
+        found = slots[top_k(self.matrix.cosine(query, slots), 5)]
+        self.assertEqual(found[0], 42)
+        exact = top_k(self.matrix.cosine(query), 5)
+        self.assertGreaterEqual(len(set(found) & set(exact)), 4)
+
+    def test_add_and_remove_follow_the_matrix(self):
+        self.pq.train(self.matrix)
+        self.matrix.release(7)
+        self.pq.remove(7)
+        self.assertNotIn(7, self.pq.candidates(self.matrix.vectors[8], 400).tolist())
+        slot, _ = self.matrix.append(self.matrix.vectors[8].copy())
+        self.pq.add(slot, self.matrix.vectors[slot])
+        self.assertEqual(
+            self.pq.candidates(self.matrix.vectors[8], 2).tolist().count(7), 1
+        )
@@ -0,0 +1,40 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from autogpt.memory.query_cache import QueryEmbeddingCache
+
+
+class TestQueryEmbeddingCache(TestCase):
+    """
+    Test cases for the in-process query embedding cache.
+    """
+
+    def test_repeats_are_served_from_the_cache(self):
+        cache = QueryEmbeddingCache(max_entries=2)
+        embed = Mock(side_effect=lambda text: [float(len(text))])
+        self.assertEqual(cache.get("m", "abc", embed), [3.0])
+        self.assertEqual(cache.get("m", "abc", embed), [3.0])
+        self.assertEqual(embed.call_count, 1)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "entries": 1})
+        cache.get("other-model", "abc", embed)
+        self.assertEqual(embed.call_count, 2)
+
+    def test_least_recently_used_query_is_evicted(self):
+        cache = QueryEmbeddingCache(max_entries=2)
+        embed = Mock(side_effect=lambda text: [0.0])
+        for text in ("a", "b", "a", "c", "a", "b"):
+            cache.get("m", text, embed)
+        self.assertEqual(
+            [call.args[0] for call in embed.call_args_list], ["a", "b", "c", "b"]
+        )
+
+    def test_returned_vectors_are_copies_and_size_zero_disables(self):
+        cache = QueryEmbeddingCache(max_entries=1)
+        cache.get("m", "a", lambda text: [1.0]).append(2.0)
+        self.assertEqual(cache.get("m", "a", lambda text: [9.0]), [1.0])
+        disabled = QueryEmbeddingCache(max_entries=0)
+        embed = Mock(return_value=[1.0])
+        disabled.get("m", "a", embed)
+        disabled.get("m", "a", embed)
+        self.assertEqual(embed.call_count, 2)
+        self.assertEqual(disabled.stats()["entries"], 0)
@@ -0,0 +1,150 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from autogpt.config.singleton import Singleton
+
+try:
+    from autogpt.memory import redismem
+except ImportError:
+    redismem = None
+
+
+class FakeRedis(MagicMock):
+    """Records pipelined writes and keeps INCRBY counters like a server would."""
+
+    counters = {}
+    written = []
+    fields = {}
+    expiring = []
+
+    def incrby(self, key, amount):
+        self.counters[key] = self.counters.get(key, 0) + amount
+        return self.counters[key]
+
+    def pipeline(self, transaction=True):
+        pipe = MagicMock()
+        pipe.hset.side_effect = self._hset
+        pipe.expire.side_effect = lambda key, ttl: self.expiring.append((key, ttl))
+        return pipe
+
+    def _hset(self, key, field=None, value=None, mapping=None):
+        self.written.append(key)
+        self.fields.setdefault(key, {}).update(mapping or {field: value})
+
+
+def redis_config(index="auto-gpt", **settings):
+    return SimpleNamespace(
+        redis_host="localhost",
+        redis_port="6379",
+        redis_password="",
+        wipe_redis_on_start=False,
+        memory_index=index,
+        **settings,
+    )
+
+
+@unittest.skipIf(redismem is None, "redis is not installed")
+class TestRedisMemory(unittest.TestCase):
+    """
+    Test cases for id allocation and bulk writes of the Redis backend.
+    """
+
+    def setUp(self):
+        FakeRedis.counters = {}
+        FakeRedis.written = []
+        FakeRedis.fields = {}
+        FakeRedis.expiring = []
+        patchers = [
+            patch.object(
+                redismem.redis, "Redis", side_effect=lambda **kwargs: FakeRedis()
+            ),
+            patch.object(redismem, "get_ada_embedding", return_value=[0.0]),
+            patch.object(
+                redismem,
+                "get_ada_embeddings",
+                side_effect=lambda texts: [[0.0]] * len(texts),
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def new_memory(self, **settings):
+        Singleton._instances.pop(redismem.RedisMemory, None)
+        self.addCleanup(Singleton._instances.pop, redismem.RedisMemory, None)
+        return redismem.RedisMemory(redis_config(**settings))
+
+    def test_agents_sharing_an_index_get_distinct_ids(self):
+        first, second = self.new_memory(), self.new_memory()
+        self.assertIsNot(first, second)
+        messages = first.add_many(["a", "Command Error: x", "b"])
+        second.add("c")
+        first.add("d")
+        self.assertEqual(messages[1], "")
+        self.assertEqual(
+            FakeRedis.written,
+            ["auto-gpt:0", "auto-gpt:1", "auto-gpt:2", "auto-gpt:3"],
+        )
+        self.assertEqual(FakeRedis.counters, {"auto-gpt-vec_num": 4})
+
+    def test_clients_share_a_connection_pool(self):
+        cfg = redis_config()
+        self.assertIs(
+            redismem.get_connection_pool(cfg), redismem.get_connection_pool(cfg)
+        )
+        other = redis_config()
+        other.redis_port = "6380"
+        self.assertIsNot(
+            redismem.get_connection_pool(cfg), redismem.get_connection_pool(other)
+        )
+
+    def test_entries_carry_tags_task_and_ttl(self):
+        memory = self.new_memory(redis_ttl_seconds=60)
+        memory.add(text="note", tags=["action", "in-progress"], task_id="action_1")
+        fields = FakeRedis.fields["auto-gpt:0"]
+        self.assertEqual(fields["tags"], "action,in-progress")
+        self.assertEqual(fields["task_id"], "action_1")
+        self.assertIsInstance(fields["timestamp"], float)
+        self.assertEqual(FakeRedis.expiring, [("auto-gpt:0", 60)])
+
+    def test_filter_clause(self):
+        self.assertEqual(redismem.filter_clause(), "*")
+        self.assertEqual(
+            redismem.filter_clause(["in-progress", "web"], since=5.0),
+            "(@tags:{in\\-progress | web} @timestamp:[5.0 +inf])",
+        )
+        self.assertEqual(
+            redismem.filter_clause(["a", "b"], match_all=True), "(@tags:{a} @tags:{b})"
+        )
+
+    def test_knn_is_prefiltered_by_tags(self):
+        memory = self.new_memory(redis_hnsw_ef_runtime=50)
+        with patch.object(redismem, "get_query_embedding", return_value=[0.0]):
+            memory.get_relevant("query", 3, tags=["search"])
+        query, params = memory.redis.ft.return_value.search.call_args
+        self.assertEqual(
+            query[0].query_string(),
+            "(@tags:{search})"
+            "=>[KNN 3 @embedding $vector EF_RUNTIME $ef AS vector_score]",
+        )
+        self.assertEqual(params["query_params"]["ef"], 50)
+
+    def test_search_and_mark_done(self):
+        memory = self.new_memory()
+        doc = SimpleNamespace(
+            id="auto-gpt:4",
+            data="draft",
+            tags="essay,in-progress",
+            task_id="",
+            timestamp="0",
+        )
+        memory.redis.ft.return_value.search.return_value = SimpleNamespace(
+            total=1, docs=[doc]
+        )
+        [entry] = memory.search(["in-progress"])
+        self.assertEqual(entry["content"], "draft")
+        self.assertEqual(entry["tags"], ["essay", "in-progress"])
+        self.assertEqual(entry["id"], "auto-gpt:4")
+        self.assertEqual(memory.mark_done(), 1)
+        self.assertEqual(FakeRedis.fields["auto-gpt:4"], {"tags": "essay,done"})